@@ -0,0 +1,7 @@
+#!/bin/bash
+# prism-worker: run queued generation jobs outside the API process
+# Usage: ./scripts/prism-worker.sh --processes 4 --concurrency 4
+set -e
+
+cd "$(dirname "$0")/.."
+exec python -m src.worker "$@"
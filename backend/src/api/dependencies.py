@@ -0,0 +1,46 @@
+"""
+API Dependencies - Resolve shared services from the app's ServiceContainer
+"""
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.core.llm_orchestrator import FeedbackParser
+from src.core.validator import Validator
+from src.services.asset_storage import AssetStorage
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.container import ServiceContainer
+from src.services.job_manager import JobManager
+
+
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
+
+
+def get_job_manager(services: ServiceContainer = Depends(get_services)) -> JobManager:
+    return services.job_manager
+
+
+def get_feedback_parser(services: ServiceContainer = Depends(get_services)) -> FeedbackParser:
+    return services.feedback_parser
+
+
+def get_storage(services: ServiceContainer = Depends(get_services)) -> AssetStorage:
+    return services.storage
+
+
+def get_validator(services: ServiceContainer = Depends(get_services)) -> Validator:
+    return services.validator
+
+
+def dependency_unavailable(error: CircuitOpenError) -> HTTPException:
+    """503 for a request rejected because an upstream breaker is open"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error": {
+                "code": "DEPENDENCY_UNAVAILABLE",
+                "message": str(error),
+            }
+        },
+        headers={"Retry-After": str(max(1, int(error.retry_after_s)))},
+    )
@@ -2,12 +2,62 @@
 Main API Entrypoint
 """
 
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from src.config.settings import settings
-from src.api.routes import generation, jobs, revise, finalize
+from src.api.routes import generation, jobs, revise, finalize, assets
+from src.models import init_db
+from src.services.asset_gc import AssetGarbageCollector
+from src.services.circuit_breaker import PROCESS_ID, adependency_states
+from src.services.container import ServiceContainer
+from src.services.metrics_publisher import fleet_metrics
+from src.services.job_watchdog import JobWatchdog
+from src.worker import Worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services once per process and tear them down on exit"""
+    # Create tables
+    init_db()
+
+    services = ServiceContainer()
+    services.warm()
+    app.state.services = services
+
+    # Development convenience: process queued jobs inside the API process
+    worker = None
+    worker_task = None
+    if settings.inline_worker:
+        worker = Worker(f"inline:{os.getpid()}", job_queue=services.job_queue, job_manager=services.job_manager)
+        worker_task = asyncio.create_task(worker.run())
+
+    # Fail jobs stuck in a stage (e.g. their worker died) so clients stop polling them
+    watchdog_task = None
+    if settings.job_watchdog_enabled:
+        watchdog_task = asyncio.create_task(JobWatchdog(job_queue=services.job_queue).run())
+
+    # Enforce asset retention and the disk quota
+    gc_task = None
+    if settings.asset_gc_enabled:
+        collector = AssetGarbageCollector(storage=services.storage, result_cache=services.result_cache)
+        gc_task = asyncio.create_task(collector.run())
+
+    yield
+
+    for task in (watchdog_task, gc_task):
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if worker is not None:
+        worker.stop()
+        await worker_task
+    await services.close()
 
 app = FastAPI(
     title="Prism Health AI Agent API",
@@ -15,6 +65,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -26,22 +77,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory=settings.static_root), name="static")
+# Mount static files: only the published asset directories, so in-progress
+# downloads and the shot cache under the same root are never served
+for subdir, directory in (
+    (settings.static_video_subdir, settings.static_video_dir),
+    (settings.static_audio_subdir, settings.static_audio_dir),
+    (settings.static_metadata_subdir, settings.static_metadata_dir),
+    (settings.static_blob_subdir, settings.static_blob_dir),
+):
+    # Directories are created by AssetStorage during startup
+    app.mount(
+        f"{settings.static_url_prefix}/{subdir}",
+        StaticFiles(directory=directory, check_dir=False),
+        name=f"static_{subdir}",
+    )
 
 # Include Routers
 app.include_router(generation.router, prefix="/v1/t2v", tags=["Text-to-Video"])
 app.include_router(jobs.router, prefix="/v1/t2v", tags=["Jobs"])
 app.include_router(revise.router, prefix="/v1/t2v", tags=["Revision"])
 app.include_router(finalize.router, prefix="/v1/t2v", tags=["Finalization"])
-
-@app.on_event("startup")
-def on_startup():
-    from src.models import Base, engine
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+app.include_router(assets.router, prefix="/v1/t2v", tags=["Assets"])
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "version": "1.0.0"}
+    """Health check endpoint, with circuit breaker state per upstream dependency"""
+    dependencies = await adependency_states()
+    degraded = any(d["state"] != "closed" for d in dependencies.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "version": "1.0.0",
+        "dependencies": dependencies,
+    }
+
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    """Metrics of this API process merged with those published by every live worker"""
+    local = {PROCESS_ID: request.app.state.services.metrics_snapshot()}
+    return await asyncio.to_thread(fleet_metrics, local)
@@ -0,0 +1,65 @@
+"""
+API Responses - File responses that avoid copying bytes through Python
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class SendfileResponse(Response):
+    """
+    Send `count` bytes of a file starting at `offset`
+
+    Status, Content-Range and caching headers are decided by the caller.
+    When the server offers the ASGI `http.response.zerocopysend` extension
+    the file descriptor is handed to it (sendfile, no copy through Python);
+    otherwise the range is read off the event loop in chunks.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: str = "video/mp4",
+    ):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or not self.count:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with open(self.path, "rb") as f:
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({"type": ZEROCOPY_EXTENSION, "file": f, "offset": self.offset, "count": self.count})
+                return
+
+            position = self.offset
+            remaining = self.count
+            while remaining:
+                chunk = await asyncio.to_thread(os.pread, f.fileno(), min(self.chunk_size, remaining), position)
+                if not chunk:
+                    # File shrank under us; the declared length can no longer be met
+                    raise RuntimeError(f"Unexpected end of file: {self.path}")
+                position += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
@@ -0,0 +1,136 @@
+"""
+Asset API Routes
+"""
+
+import asyncio
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse
+
+from src.api.dependencies import get_storage
+from src.api.responses import SendfileResponse
+from src.config.settings import settings
+from src.services.asset_storage import AssetStorage, LocalBlobBackend
+
+router = APIRouter()
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into an inclusive (start, end)
+
+    Returns None when the whole file should be sent: no header, a malformed
+    one, or several ranges (players only ever ask for one). Raises
+    RangeNotSatisfiable when the range lies past the end of the file.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        if last and int(last) < start:
+            return None
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    if "*" in candidates:
+        return True
+    return any((value[2:] if value.startswith("W/") else value) == etag for value in candidates)
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.asset_cache_max_age_s}, immutable",
+    }
+
+
+@router.api_route("/assets/{digest}.mp4", methods=["GET", "HEAD"])
+async def get_asset(
+    digest: str,
+    request: Request,
+    storage: AssetStorage = Depends(get_storage),
+):
+    """
+    Serve a content-addressed video
+
+    The URL is the sha256 of the bytes, so the ETag is strong and the
+    response can be cached forever. Local blobs are served with byte-range
+    support (or handed to nginx via X-Accel-Redirect); for a bucket the
+    client is redirected to a freshly pre-signed URL.
+    """
+    if not DIGEST_RE.match(digest):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    etag = f'"{digest}"'
+    headers = _cache_headers(etag)
+    # Same URL, same bytes: a client holding this ETag already has the content
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if not isinstance(storage.backend, LocalBlobBackend):
+        if not await asyncio.to_thread(storage.blob_exists, digest):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+        url = await asyncio.to_thread(storage.blob_download_url, digest)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    path = storage.blob_path(digest)
+    try:
+        size = (await asyncio.to_thread(os.stat, path)).st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    if settings.asset_x_accel_redirect_prefix:
+        # nginx sends the file itself (sendfile, Range) from an internal location
+        headers["X-Accel-Redirect"] = settings.asset_x_accel_redirect_prefix + storage.blob_key(digest)
+        return Response(headers=headers, media_type="video/mp4")
+
+    headers["Accept-Ranges"] = "bytes"
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = _parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+
+    if byte_range is None:
+        return SendfileResponse(path, 0, size, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return SendfileResponse(
+        path,
+        start,
+        end - start + 1,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+    )
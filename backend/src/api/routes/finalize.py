@@ -4,10 +4,12 @@ Finalize API Routes - High-quality rendering workflow
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from src.models import get_db
+from src.api.dependencies import dependency_unavailable, get_job_manager
+from src.services.circuit_breaker import CircuitOpenError
 from src.services.storage import JobDB
 from src.services.job_manager import JobManager
 from src.services.observability import logger
@@ -42,11 +44,33 @@ class FinalizeResponse(BaseModel):
 router = APIRouter()
 
 
+def _invalid_seed_selections(job, selected_seeds: Dict[int, int], require_rendered: bool) -> List[str]:
+    """
+    Shots whose selected seed is not one of their completed preview variants
+
+    Assets without `variants` predate seed fan-out and are not checked,
+    unless the preview is still running and the seed has to exist already.
+    """
+    assets = {str(a.get("shot_id")): a for a in (job.assets or [])}
+    invalid = []
+    for shot_id, seed in selected_seeds.items():
+        asset = assets.get(str(shot_id))
+        if asset is None or "variants" not in asset:
+            if require_rendered:
+                invalid.append(str(shot_id))
+            continue
+        rendered = {v.get("seed") for v in asset["variants"] if v.get("status") == "completed"}
+        if seed not in rendered:
+            invalid.append(str(shot_id))
+    return invalid
+
+
 @router.post("/jobs/{job_id}/finalize", response_model=FinalizeResponse, status_code=status.HTTP_202_ACCEPTED)
 async def finalize_job(
     job_id: str,
     request: FinalizeRequest,
     db: Session = Depends(get_db),
+    job_manager: JobManager = Depends(get_job_manager),
 ):
     """
     Finalize video generation (High Quality Render)
@@ -77,8 +101,10 @@ async def finalize_job(
                 }
             )
 
-        # Validate job state
-        if job.state != "SUCCEEDED":
+        # Validate job state: a preview still rendering other seeds can be
+        # finalized as soon as the selected seeds are available
+        previewing = job.state == "RUNNING" and job.stage in ("preview", "revision")
+        if job.state != "SUCCEEDED" and not previewing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -89,6 +115,18 @@ async def finalize_job(
                 }
             )
 
+        invalid_shots = _invalid_seed_selections(job, request.selected_seeds, require_rendered=previewing)
+        if invalid_shots:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": {
+                        "code": "INVALID_SEEDS",
+                        "message": f"Selected seeds do not match a rendered preview for shots: {invalid_shots}",
+                    }
+                }
+            )
+
         logger.info(
             "finalize_request",
             job_id=job_id,
@@ -96,9 +134,6 @@ async def finalize_job(
             resolution=request.resolution,
         )
 
-        # Create job manager and execute finalization workflow
-        job_manager = JobManager()
-
         # Execute finalization workflow
         finalized_job = await job_manager.execute_finalization_workflow(
             db=db,
@@ -115,6 +150,19 @@ async def finalize_job(
 
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        raise dependency_unavailable(e)
+    except ValueError as e:
+        # Concurrent job limit
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e),
+                }
+            }
+        )
     except Exception as e:
         logger.error(
             "finalize_error",
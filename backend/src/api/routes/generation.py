@@ -8,6 +8,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from src.models import get_db
+from src.api.dependencies import dependency_unavailable, get_job_manager
+from src.services.circuit_breaker import CircuitOpenError
 from src.services.job_manager import JobManager
 from src.services.observability import logger
 
@@ -28,6 +30,7 @@ async def generate_video(
     request: GenerateRequest,
     req: Request,
     db: Session = Depends(get_db),
+    job_manager: JobManager = Depends(get_job_manager),
 ):
     """
     Submit a new video generation job
@@ -35,7 +38,6 @@ async def generate_video(
     try:
         client_ip = req.client.host if req.client else "unknown"
         
-        job_manager = JobManager()
         job = await job_manager.execute_generation_workflow(
             db=db,
             user_input=request.user_prompt,
@@ -50,6 +52,8 @@ async def generate_video(
             message="Job submitted successfully"
         )
         
+    except CircuitOpenError as e:
+        raise dependency_unavailable(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
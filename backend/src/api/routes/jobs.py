@@ -8,7 +8,10 @@ from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 
 from src.models import get_db
+from src.api.dependencies import get_job_manager
 from src.services.storage import JobDB
+from src.services.job_manager import JobManager
+from src.services.job_state import is_terminal_state
 from src.services.observability import logger
 
 class JobResponse(BaseModel):
@@ -19,9 +22,32 @@ class JobResponse(BaseModel):
     assets: List[Dict[str, Any]] = []
     shot_plan: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
+    cache_hit: bool = False
+    cache_source_job_id: Optional[str] = None
+
+class CancelResponse(BaseModel):
+    job_id: str
+    status: str
+    message: str
 
 router = APIRouter()
 
+
+def _shot_progress(job) -> int:
+    """Percentage of shots finished in the running stage"""
+    assets = job.assets or []
+    finals = [a for a in assets if "final_status" in a]
+    if finals:
+        done = sum(1 for a in finals if a["final_status"] in ("completed", "failed", "skipped"))
+        total = len(finals)
+    else:
+        done = sum(1 for a in assets if a.get("status") in ("completed", "failed"))
+        total = len((job.shot_plan or {}).get("shots", [])) or len(assets)
+    if not total:
+        return 0
+    # Keep 100 for SUCCEEDED
+    return min(99, int(done * 100 / total))
+
 @router.get("/jobs/{job_id}", response_model=JobResponse)
 async def get_job_status(
     job_id: str,
@@ -44,7 +70,7 @@ async def get_job_status(
     elif job.state == "FAILED":
         progress = 0
     elif job.state == "RUNNING":
-        progress = 50  # TODO: More granular progress
+        progress = _shot_progress(job)
     
     # Extract script from IR or Shot Plan if not explicitly stored
     script_content = ""
@@ -69,5 +95,47 @@ async def get_job_status(
         script=script_content,
         assets=job.assets or [],
         shot_plan=job.shot_plan,
-        error=job.error_details
+        error=job.error_details,
+        cache_hit=job.cache_source_job_id is not None,
+        cache_source_job_id=job.cache_source_job_id,
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=CancelResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    job_manager: JobManager = Depends(get_job_manager),
+):
+    """
+    Cancel a pending or running job
+
+    Stops its queued and in-flight work and best-effort cancels the
+    upstream generation tasks. Cancelling a cancelled job is a no-op.
+    """
+    job = JobDB.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    if is_terminal_state(job.state) and job.state != "CANCELLED":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "INVALID_JOB_STATE",
+                    "message": f"Job already finished, current state: {job.state}",
+                }
+            }
+        )
+
+    job = job_manager.cancel_job(db, job_id)
+    logger.info("cancel_request", job_id=job_id)
+
+    return CancelResponse(
+        job_id=job.job_id,
+        status=job.state,
+        message="Job cancelled. In-flight generation tasks are being stopped.",
     )
@@ -2,12 +2,14 @@
 Revise API Routes - Iterative refinement workflow
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from src.models import get_db
+from src.api.dependencies import dependency_unavailable, get_job_manager, get_feedback_parser, get_validator
+from src.services.circuit_breaker import CircuitOpenError
 from src.services.storage import JobDB
 from src.services.job_manager import JobManager
 from src.services.observability import logger
@@ -48,7 +50,11 @@ router = APIRouter()
 async def revise_job(
     job_id: str,
     request: ReviseRequest,
+    req: Request,
     db: Session = Depends(get_db),
+    job_manager: JobManager = Depends(get_job_manager),
+    feedback_parser: FeedbackParser = Depends(get_feedback_parser),
+    validator: Validator = Depends(get_validator),
 ):
     """
     Revise video based on user feedback
@@ -99,8 +105,7 @@ async def revise_job(
         )
 
         # Parse feedback to identify targeted fields
-        feedback_parser = FeedbackParser()
-        feedback_result = feedback_parser.parse_feedback(
+        feedback_result = await feedback_parser.aparse_feedback(
             feedback=request.feedback,
             previous_ir=parent_job.ir,
         )
@@ -116,7 +121,6 @@ async def revise_job(
         )
 
         # Validate refinement
-        validator = Validator()
         is_valid, error_msg = validator.validate_refinement(
             feedback=request.feedback,
             targeted_fields=targeted_fields,
@@ -133,9 +137,6 @@ async def revise_job(
                 }
             )
 
-        # Create job manager and execute revision workflow
-        job_manager = JobManager()
-
         # Execute revision workflow
         revised_job = await job_manager.execute_revision_workflow(
             db=db,
@@ -143,7 +144,7 @@ async def revise_job(
             feedback=request.feedback,
             targeted_fields=targeted_fields,
             suggested_modifications=suggested_modifications,
-            client_ip=None,  # TODO: Extract from request
+            client_ip=req.client.host if req.client else "unknown",
         )
 
         return ReviseResponse(
@@ -156,6 +157,19 @@ async def revise_job(
 
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        raise dependency_unavailable(e)
+    except ValueError as e:
+        # Rate / concurrent job limits
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e),
+                }
+            }
+        )
     except Exception as e:
         logger.error(
             "revise_error",
@@ -12,6 +12,14 @@ FFMPEG_AUDIO_BITRATE = "192k"
 JOB_TIMEOUT_MINUTES = 30
 MAX_RETRY_ATTEMPTS = 3
 
+# Job Queue Priorities (higher is claimed first)
+QUEUE_PRIORITY_PREVIEW = 0
+QUEUE_PRIORITY_REVISION = 5
+QUEUE_PRIORITY_FINALIZE = 10
+
+# Seed offset between preview variants of the same shot
+PREVIEW_SEED_STRIDE = 1000
+
 # Quality Modes
 QUALITY_MODES = {
     "fast": {
@@ -4,9 +4,11 @@ Application Settings Configuration
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Literal
+from typing import Dict, Literal
 import os
 
+from src.config.constants import JOB_TIMEOUT_MINUTES
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
@@ -30,6 +32,9 @@ class Settings(BaseSettings):
         env="QWEN_MODEL"
     )
 
+    # Max in-flight async LLM calls per process
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+
     # Embeddings
     embedding_model: str = Field(
         default="text-embedding-v2",
@@ -47,16 +52,67 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
 
+    # Rate Limiting (per client IP)
+    rate_limit_backend: str = Field(default="memory", env="RATE_LIMIT_BACKEND")  # memory | redis
+    rate_limit_per_min: int = Field(default=10, env="RATE_LIMIT_PER_MIN")
+    rate_limit_burst: int = Field(default=10, env="RATE_LIMIT_BURST")
+    rate_limit_window_s: float = Field(default=60.0, env="RATE_LIMIT_WINDOW_S")
+    max_concurrent_jobs_per_ip: int = Field(default=5, env="MAX_CONCURRENT_JOBS_PER_IP")
+    rate_limit_idle_ttl_s: float = Field(default=300.0, env="RATE_LIMIT_IDLE_TTL_S")
+    rate_limit_max_clients: int = Field(default=100000, env="RATE_LIMIT_MAX_CLIENTS")
+    rate_limit_jobs_ttl_s: int = Field(default=7200, env="RATE_LIMIT_JOBS_TTL_S")
+
     # Static Storage
     static_root: str = Field(default="./data/static", env="STATIC_ROOT")
     static_video_subdir: str = Field(default="vedios", env="STATIC_VIDEO_SUBDIR")
     static_audio_subdir: str = Field(default="audio", env="STATIC_AUDIO_SUBDIR")
     static_metadata_subdir: str = Field(default="metadata", env="STATIC_METADATA_SUBDIR")
+    # Content-addressed video blobs (blobs/ab/cd/<sha256>.mp4), shared between jobs
+    static_blob_subdir: str = Field(default="blobs", env="STATIC_BLOB_SUBDIR")
+    asset_content_addressed: bool = Field(default=True, env="ASSET_CONTENT_ADDRESSED")
+    # Where blobs live: local static volume or an S3-compatible bucket (needs boto3)
+    asset_storage_backend: Literal["local", "s3"] = Field(default="local", env="ASSET_STORAGE_BACKEND")
+    s3_bucket: str = Field(default="", env="S3_BUCKET")
+    s3_prefix: str = Field(default="blobs", env="S3_PREFIX")
+    s3_endpoint_url: str = Field(default="", env="S3_ENDPOINT_URL")
+    s3_region: str = Field(default="", env="S3_REGION")
+    s3_access_key_id: str = Field(default="", env="S3_ACCESS_KEY_ID")
+    s3_secret_access_key: str = Field(default="", env="S3_SECRET_ACCESS_KEY")
+    s3_multipart_chunk_mb: int = Field(default=8, env="S3_MULTIPART_CHUNK_MB")
+    s3_max_connections: int = Field(default=20, env="S3_MAX_CONNECTIONS")
+    s3_presign_expiry_s: int = Field(default=3600, env="S3_PRESIGN_EXPIRY_S")
+    # Public (e.g. CDN) base URL of the bucket; empty = private bucket, pre-signed URLs
+    s3_public_base_url: str = Field(default="", env="S3_PUBLIC_BASE_URL")
+    # Browser cache lifetime of content-addressed videos (served immutable)
+    asset_cache_max_age_s: int = Field(default=31536000, env="ASSET_CACHE_MAX_AGE_S")
+    # Behind nginx: hand local blob transfers to it (internal location prefix, e.g. /_blobs/)
+    asset_x_accel_redirect_prefix: str = Field(default="", env="ASSET_X_ACCEL_REDIRECT_PREFIX")
+    # Asset GC: retention per job kind (days, 0 = keep) and a disk quota (0 = none)
+    asset_gc_enabled: bool = Field(default=True, env="ASSET_GC_ENABLED")
+    asset_gc_interval_s: float = Field(default=3600.0, env="ASSET_GC_INTERVAL_S")
+    asset_disk_quota_gb: float = Field(default=0.0, env="ASSET_DISK_QUOTA_GB")
+    asset_gc_target_ratio: float = Field(default=0.9, env="ASSET_GC_TARGET_RATIO")
+    asset_retention_failed_days: float = Field(default=3.0, env="ASSET_RETENTION_FAILED_DAYS")
+    asset_retention_superseded_days: float = Field(default=7.0, env="ASSET_RETENTION_SUPERSEDED_DAYS")
+    asset_retention_preview_days: float = Field(default=7.0, env="ASSET_RETENTION_PREVIEW_DAYS")
+    job_retention_days: float = Field(default=30.0, env="JOB_RETENTION_DAYS")
+    # Partial / temp files and unreferenced blobs younger than this are left alone
+    asset_gc_orphan_grace_s: float = Field(default=3600.0, env="ASSET_GC_ORPHAN_GRACE_S")
+    # In-progress downloads; on the static volume so they can be renamed into place, never served
+    static_partial_subdir: str = Field(default=".partial", env="STATIC_PARTIAL_SUBDIR")
     static_video_dir: str = ""
     static_audio_dir: str = ""
     static_metadata_dir: str = ""
+    static_partial_dir: str = ""
+    static_blob_dir: str = ""
     static_url_prefix: str = "/static"
 
+    # Shot cache (rendered shots keyed by request hash; lives on the static volume)
+    shot_cache_enabled: bool = Field(default=True, env="SHOT_CACHE_ENABLED")
+    shot_cache_subdir: str = Field(default="shot_cache", env="SHOT_CACHE_SUBDIR")
+    shot_cache_max_bytes: int = Field(default=20 * 1024 ** 3, env="SHOT_CACHE_MAX_BYTES")
+    shot_cache_dir: str = ""
+
     # FFmpeg
     ffmpeg_path: str = Field(default="ffmpeg", env="FFMPEG_PATH")
 
@@ -64,6 +120,128 @@ class Settings(BaseSettings):
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = Field(
         default="INFO", env="LOG_LEVEL"
     )
+    # Worker processes publish their metrics for GET /metrics this often
+    metrics_publish_interval_s: float = Field(default=15.0, env="METRICS_PUBLISH_INTERVAL_S")
+
+    # DashScope REST transport ("http" = pooled async client, "sdk" = VideoSynthesis SDK)
+    dashscope_transport: Literal["http", "sdk"] = Field(default="http", env="DASHSCOPE_TRANSPORT")
+    dashscope_base_url: str = Field(
+        default="https://dashscope.aliyuncs.com/api/v1",
+        env="DASHSCOPE_BASE_URL"
+    )
+    # One multiplexed HTTP/2 connection serves a burst of submissions (needs httpx[http2])
+    dashscope_http2: bool = Field(default=True, env="DASHSCOPE_HTTP2")
+    dashscope_http_max_connections: int = Field(default=20, env="DASHSCOPE_HTTP_MAX_CONNECTIONS")
+    dashscope_http_max_keepalive: int = Field(default=10, env="DASHSCOPE_HTTP_MAX_KEEPALIVE")
+    dashscope_http_keepalive_expiry_s: float = Field(default=60.0, env="DASHSCOPE_HTTP_KEEPALIVE_EXPIRY_S")
+    dashscope_http_timeout_s: float = Field(default=30.0, env="DASHSCOPE_HTTP_TIMEOUT_S")
+    dashscope_http_connect_timeout_s: float = Field(default=10.0, env="DASHSCOPE_HTTP_CONNECT_TIMEOUT_S")
+
+    # Pooled HTTP client for downloading generated videos
+    download_http2: bool = Field(default=True, env="DOWNLOAD_HTTP2")
+    download_http_max_connections: int = Field(default=20, env="DOWNLOAD_HTTP_MAX_CONNECTIONS")
+    download_http_max_keepalive: int = Field(default=10, env="DOWNLOAD_HTTP_MAX_KEEPALIVE")
+    download_http_keepalive_expiry_s: float = Field(default=60.0, env="DOWNLOAD_HTTP_KEEPALIVE_EXPIRY_S")
+    download_http_max_per_host: int = Field(default=8, env="DOWNLOAD_HTTP_MAX_PER_HOST")
+    download_http_connect_timeout_s: float = Field(default=10.0, env="DOWNLOAD_HTTP_CONNECT_TIMEOUT_S")
+    download_http_read_timeout_s: float = Field(default=60.0, env="DOWNLOAD_HTTP_READ_TIMEOUT_S")
+    download_http_max_redirects: int = Field(default=5, env="DOWNLOAD_HTTP_MAX_REDIRECTS")
+    download_chunk_size_mb: int = Field(default=8, env="DOWNLOAD_CHUNK_SIZE_MB")
+    download_parallel_chunks: int = Field(default=4, env="DOWNLOAD_PARALLEL_CHUNKS")
+    download_max_retries: int = Field(default=3, env="DOWNLOAD_MAX_RETRIES")
+    download_retry_backoff_s: float = Field(default=0.5, env="DOWNLOAD_RETRY_BACKOFF_S")
+
+    # Adaptive (AIMD) limit on in-flight DashScope tasks
+    dashscope_concurrency_initial: float = Field(default=4, env="DASHSCOPE_CONCURRENCY_INITIAL")
+    dashscope_concurrency_min: float = Field(default=1, env="DASHSCOPE_CONCURRENCY_MIN")
+    dashscope_concurrency_max: float = Field(default=32, env="DASHSCOPE_CONCURRENCY_MAX")
+    dashscope_concurrency_increase: float = Field(default=1.0, env="DASHSCOPE_CONCURRENCY_INCREASE")
+    dashscope_concurrency_decrease_factor: float = Field(default=0.7, env="DASHSCOPE_CONCURRENCY_DECREASE_FACTOR")
+    dashscope_concurrency_cooldown_s: float = Field(default=10.0, env="DASHSCOPE_CONCURRENCY_COOLDOWN_S")
+    dashscope_latency_target_s: float = Field(default=5.0, env="DASHSCOPE_LATENCY_TARGET_S")
+    dashscope_throttle_retries: int = Field(default=3, env="DASHSCOPE_THROTTLE_RETRIES")
+
+    # Weighted fair share of DashScope slots across clients
+    fair_share_enabled: bool = Field(default=True, env="FAIR_SHARE_ENABLED")
+    fair_share_default_tier: str = Field(default="standard", env="FAIR_SHARE_DEFAULT_TIER")
+    # JSON maps, e.g. FAIR_SHARE_TIER_WEIGHTS='{"standard": 1, "pro": 4}'
+    fair_share_tier_weights: Dict[str, float] = Field(
+        default={"free": 0.5, "standard": 1.0, "pro": 4.0},
+        env="FAIR_SHARE_TIER_WEIGHTS"
+    )
+    fair_share_quality_weights: Dict[str, float] = Field(
+        default={"fast": 2.0, "balanced": 1.0, "high": 1.0},
+        env="FAIR_SHARE_QUALITY_WEIGHTS"
+    )
+    # Client key (IP or API key) -> tier
+    fair_share_client_tiers: Dict[str, str] = Field(default={}, env="FAIR_SHARE_CLIENT_TIERS")
+    fair_share_idle_ttl_s: float = Field(default=600.0, env="FAIR_SHARE_IDLE_TTL_S")
+
+    # Circuit breakers around DashScope and the LLM endpoint
+    circuit_breaker_enabled: bool = Field(default=True, env="CIRCUIT_BREAKER_ENABLED")
+    circuit_breaker_window_s: float = Field(default=60.0, env="CIRCUIT_BREAKER_WINDOW_S")
+    circuit_breaker_min_calls: int = Field(default=10, env="CIRCUIT_BREAKER_MIN_CALLS")
+    circuit_breaker_failure_rate: float = Field(default=0.5, env="CIRCUIT_BREAKER_FAILURE_RATE")
+    circuit_breaker_slow_call_rate: float = Field(default=0.8, env="CIRCUIT_BREAKER_SLOW_CALL_RATE")
+    circuit_breaker_open_s: float = Field(default=30.0, env="CIRCUIT_BREAKER_OPEN_S")
+    circuit_breaker_half_open_calls: int = Field(default=2, env="CIRCUIT_BREAKER_HALF_OPEN_CALLS")
+    # fail_fast: reject new jobs/calls while open; wait: queue them up to CIRCUIT_BREAKER_WAIT_S
+    circuit_breaker_open_mode: str = Field(default="fail_fast", env="CIRCUIT_BREAKER_OPEN_MODE")
+    circuit_breaker_wait_s: float = Field(default=60.0, env="CIRCUIT_BREAKER_WAIT_S")
+    # How long other processes' published breaker states are reused before re-reading the DB
+    circuit_breaker_state_ttl_s: float = Field(default=1.0, env="CIRCUIT_BREAKER_STATE_TTL_S")
+    dashscope_slow_call_s: float = Field(default=10.0, env="DASHSCOPE_SLOW_CALL_S")
+    llm_slow_call_s: float = Field(default=60.0, env="LLM_SLOW_CALL_S")
+
+    # Shared DashScope task poller
+    task_poller_expected_s: float = Field(default=120.0, env="TASK_POLLER_EXPECTED_S")
+    task_poller_near_ratio: float = Field(default=0.7, env="TASK_POLLER_NEAR_RATIO")
+    task_poller_slow_interval_s: float = Field(default=15.0, env="TASK_POLLER_SLOW_INTERVAL_S")
+    task_poller_fast_interval_s: float = Field(default=3.0, env="TASK_POLLER_FAST_INTERVAL_S")
+    task_poller_timeout_s: float = Field(default=1800.0, env="TASK_POLLER_TIMEOUT_S")
+    task_poller_max_concurrent_fetches: int = Field(default=16, env="TASK_POLLER_MAX_CONCURRENT_FETCHES")
+
+    # Result cache (reuse recent jobs with identical prompt/quality/resolution)
+    result_cache_enabled: bool = Field(default=True, env="RESULT_CACHE_ENABLED")
+    result_cache_ttl_s: int = Field(default=600, env="RESULT_CACHE_TTL_S")
+    result_cache_max_age_s: int = Field(default=86400, env="RESULT_CACHE_MAX_AGE_S")
+
+    # Preview seed fan-out
+    # Seconds of video a job may render across extra seed variants
+    preview_variant_budget_s: int = Field(default=120, env="PREVIEW_VARIANT_BUDGET_S")
+    # Once every shot has a variant, cancel the rest after this long
+    preview_variant_deadline_s: int = Field(default=180, env="PREVIEW_VARIANT_DEADLINE_S")
+    preview_watch_interval_s: float = Field(default=2.0, env="PREVIEW_WATCH_INTERVAL_S")
+
+    # Stuck-job watchdog
+    job_watchdog_enabled: bool = Field(default=True, env="JOB_WATCHDOG_ENABLED")
+    job_watchdog_interval_s: float = Field(default=60.0, env="JOB_WATCHDOG_INTERVAL_S")
+    # Default time a job may spend in one stage
+    job_timeout_minutes: float = Field(default=JOB_TIMEOUT_MINUTES, env="JOB_TIMEOUT_MINUTES")
+    # Per-stage overrides (queued | preview | revision | finalize), e.g. '{"queued": 60, "finalize": 45}'
+    job_stage_timeouts_minutes: Dict[str, float] = Field(default={}, env="JOB_STAGE_TIMEOUTS_MINUTES")
+
+    # Job Queue
+    job_queue_backend: str = Field(default="sqlite", env="JOB_QUEUE_BACKEND")
+    job_queue_lease_s: int = Field(default=60, env="JOB_QUEUE_LEASE_S")
+    job_queue_heartbeat_s: int = Field(default=15, env="JOB_QUEUE_HEARTBEAT_S")
+    job_queue_poll_interval_s: float = Field(default=1.0, env="JOB_QUEUE_POLL_INTERVAL_S")
+    # How often a worker checks whether a running job was cancelled
+    job_cancel_poll_interval_s: float = Field(default=2.0, env="JOB_CANCEL_POLL_INTERVAL_S")
+
+    # Worker
+    worker_processes: int = Field(default=2, env="WORKER_PROCESSES")
+    # Hosts running WORKER_PROCESSES workers each against the same DashScope account;
+    # DASHSCOPE_CONCURRENCY_MAX is split across every submitting process
+    worker_hosts: int = Field(default=1, env="WORKER_HOSTS")
+    worker_concurrency: int = Field(default=4, env="WORKER_CONCURRENCY")
+    # Slots per worker held back for finalize entries, so they never wait behind previews
+    worker_priority_slots: int = Field(default=1, env="WORKER_PRIORITY_SLOTS")
+    # On shutdown, running jobs get this long to finish before they are handed
+    # back to the queue (upstream tasks keep rendering; the next worker re-attaches)
+    worker_drain_timeout_s: float = Field(default=20.0, env="WORKER_DRAIN_TIMEOUT_S")
+    # Run a worker inside the API process (local development only)
+    inline_worker: bool = Field(default=False, env="INLINE_WORKER")
 
     # Mock Mode (Avoid Token Consumption)
     mock_mode: bool = Field(default=False, env="MOCK_MODE")
@@ -74,6 +252,9 @@ class Settings(BaseSettings):
         self.static_video_dir = os.path.join(self.static_root, self.static_video_subdir)
         self.static_audio_dir = os.path.join(self.static_root, self.static_audio_subdir)
         self.static_metadata_dir = os.path.join(self.static_root, self.static_metadata_subdir)
+        self.static_partial_dir = os.path.join(self.static_root, self.static_partial_subdir)
+        self.static_blob_dir = os.path.join(self.static_root, self.static_blob_subdir)
+        self.shot_cache_dir = os.path.join(self.static_root, self.shot_cache_subdir)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,154 @@
+"""
+DashScope Async Client - Native async REST client for video synthesis tasks
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+from src.config.settings import settings
+from src.services.observability import logger
+
+
+class DashScopeAPIError(Exception):
+    """Non-2xx response from DashScope"""
+
+    def __init__(self, status_code: int, code: Optional[str], message: Optional[str]):
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        super().__init__(f'Failed, status_code: {status_code}, code: {code}, message: {message}')
+
+
+class DashScopeAsyncClient:
+    """
+    Async client for the text-to-video submit/fetch/cancel REST endpoints
+
+    All requests share one pooled httpx.AsyncClient, so repeated submissions
+    and status fetches reuse keep-alive connections instead of paying a TLS
+    handshake per call. With HTTP/2 a burst of concurrent submissions is
+    multiplexed over a single connection.
+    """
+
+    SYNTHESIS_PATH = "/services/aigc/video-generation/video-synthesis"
+    TASKS_PATH = "/tasks"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.api_key = api_key if api_key is not None else settings.dashscope_api_key
+        self.base_url = (base_url or settings.dashscope_base_url).rstrip("/")
+        self._client = client
+        self._owns_client = client is None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.http2 = settings.dashscope_http2 and h2 is not None
+        if settings.dashscope_http2 and h2 is None:
+            logger.warning("dashscope_http2_unavailable", reason="h2 package not installed")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._owns_client and (self._client is None or self._loop is not loop):
+            # Connections are bound to the loop that opened them
+            if self._client is not None:
+                loop.create_task(self._close_stale(self._client))
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(
+                    max_connections=settings.dashscope_http_max_connections,
+                    max_keepalive_connections=settings.dashscope_http_max_keepalive,
+                    keepalive_expiry=settings.dashscope_http_keepalive_expiry_s,
+                ),
+                timeout=httpx.Timeout(
+                    settings.dashscope_http_timeout_s,
+                    connect=settings.dashscope_http_connect_timeout_s,
+                ),
+            )
+        return self._client
+
+    @staticmethod
+    async def _close_stale(client: httpx.AsyncClient) -> None:
+        """Close a client left behind by a previous event loop"""
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Its sockets may belong to a loop that is already closed
+            logger.warning("dashscope_client_close_failed", error=str(e))
+
+    async def submit_video_synthesis(
+        self,
+        model: str,
+        input: Dict[str, Any],
+        parameters: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Create an async video synthesis task
+
+        Returns:
+            The response `output` dict (contains task_id and task_status)
+        """
+        response = await self._get_client().post(
+            self.SYNTHESIS_PATH,
+            json={"model": model, "input": input, "parameters": parameters},
+            headers={"X-DashScope-Async": "enable"},
+        )
+        return self._output(response)
+
+    async def fetch_task(self, task_id: str) -> Dict[str, Any]:
+        """
+        Fetch task status once
+
+        Returns:
+            The response `output` dict (task_status, video_url, code, message)
+        """
+        response = await self._get_client().get(f"{self.TASKS_PATH}/{task_id}")
+        return self._output(response)
+
+    async def cancel_task(self, task_id: str) -> None:
+        """Cancel a task that is still PENDING upstream"""
+        response = await self._get_client().post(f"{self.TASKS_PATH}/{task_id}/cancel")
+        self._output(response)
+
+    def _output(self, response: httpx.Response) -> Dict[str, Any]:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+
+        if response.status_code != 200:
+            raise DashScopeAPIError(response.status_code, body.get("code"), body.get("message") or response.text)
+
+        return body.get("output") or {}
+
+    async def close(self) -> None:
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_dashscope_client: Optional[DashScopeAsyncClient] = None
+
+
+def get_dashscope_client() -> DashScopeAsyncClient:
+    """Return the process-wide client (one connection pool per process)"""
+    global _dashscope_client
+    if _dashscope_client is None:
+        _dashscope_client = DashScopeAsyncClient()
+        logger.info(
+            "dashscope_client_created",
+            base_url=_dashscope_client.base_url,
+            max_connections=settings.dashscope_http_max_connections,
+            http2=_dashscope_client.http2,
+        )
+    return _dashscope_client
@@ -2,12 +2,16 @@
 LLM Orchestrator - LangChain chains for IR parsing and template instantiation
 """
 
+import asyncio
+import json
+import time
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 from src.config.settings import settings
+from src.services.circuit_breaker import get_circuit_breaker
 from src.services.observability import logger
 
 
@@ -40,6 +44,29 @@ class ShotPlan(BaseModel):
     global_style: Dict[str, str]
 
 
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+_llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Process-wide cap on in-flight async LLM calls"""
+    global _llm_semaphore, _llm_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _llm_semaphore is None or _llm_semaphore_loop is not loop:
+        # First use, or the previous loop is gone (e.g. a new asyncio.run);
+        # a semaphore's waiters are bound to the loop that created them
+        _llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        _llm_semaphore_loop = loop
+    return _llm_semaphore
+
+
+async def _ainvoke(llm: Any, messages: List[Any]) -> Any:
+    """Invoke the chat model through its native async API (behind the "llm" breaker)"""
+    async with _get_llm_semaphore():
+        async with get_circuit_breaker("llm").guard():
+            return await llm.ainvoke(messages)
+
+
 class LLMOrchestrator:
     """
     Orchestrates LLM chains for IR parsing and template instantiation
@@ -82,11 +109,34 @@ class LLMOrchestrator:
         Returns:
             IR object
         """
-        import time
+        start_time = time.time()
+
+        try:
+            self._ensure_llm()
+            response = self.llm.invoke(self._build_ir_messages(user_input, quality_mode))
+            return self._handle_ir_response(response, start_time)
+
+        except Exception as e:
+            logger.error("ir_parse_error", error=str(e))
+            raise
 
+    async def aparse_ir(self, user_input: str, quality_mode: str = "balanced") -> IR:
+        """
+        Async variant of parse_ir; does not block the event loop
+        """
         start_time = time.time()
 
-        # Build prompt
+        try:
+            self._ensure_llm()
+            response = await _ainvoke(self.llm, self._build_ir_messages(user_input, quality_mode))
+            return self._handle_ir_response(response, start_time)
+
+        except Exception as e:
+            logger.error("ir_parse_error", error=str(e))
+            raise
+
+    def _build_ir_messages(self, user_input: str, quality_mode: str) -> List[Any]:
+        """Build chat messages for IR parsing"""
         prompt = f"""You are a medical video generation assistant. Parse the user's request into a structured Intermediate Representation.
 
 User Request: {user_input}
@@ -108,34 +158,28 @@ Extract the following information:
 
 Ensure all durations are between 2-15 seconds total."""
 
-        try:
-            self._ensure_llm()
-            messages = [
-                SystemMessage(content="You are a medical video generation assistant."),
-                HumanMessage(content=prompt),
-            ]
+        return [
+            SystemMessage(content="You are a medical video generation assistant."),
+            HumanMessage(content=prompt),
+        ]
 
-            response = self.llm.invoke(messages)
+    def _handle_ir_response(self, response: Any, start_time: float) -> IR:
+        """Parse the LLM response into an IR and record metrics"""
+        # Parse structured output
+        ir = self.ir_parser.parse(response.content)
 
-            # Parse structured output
-            ir = self.ir_parser.parse(response.content)
+        duration = time.time() - start_time
+        self.metrics["ir_parse_duration"] = duration
+        # Note: Token usage would be extracted from response if available
 
-            duration = time.time() - start_time
-            self.metrics["ir_parse_duration"] = duration
-            # Note: Token usage would be extracted from response if available
+        logger.info(
+            "ir_parse_success",
+            topic=ir.topic,
+            intent=ir.intent,
+            duration_s=duration,
+        )
 
-            logger.info(
-                "ir_parse_success",
-                topic=ir.topic,
-                intent=ir.intent,
-                duration_s=duration,
-            )
-
-            return ir
-
-        except Exception as e:
-            logger.error("ir_parse_error", error=str(e))
-            raise
+        return ir
 
     def instantiate_template(
         self,
@@ -152,11 +196,38 @@ Ensure all durations are between 2-15 seconds total."""
         Returns:
             ShotPlan object
         """
-        import time
+        start_time = time.time()
+
+        try:
+            self._ensure_llm()
+            response = self.llm.invoke(self._build_instantiate_messages(ir, template))
+            return self._handle_shot_plan_response(response, start_time)
+
+        except Exception as e:
+            logger.error("template_instantiate_error", error=str(e))
+            raise
 
+    async def ainstantiate_template(
+        self,
+        ir: IR,
+        template: Dict[str, Any],
+    ) -> ShotPlan:
+        """
+        Async variant of instantiate_template; does not block the event loop
+        """
         start_time = time.time()
 
-        # Build prompt
+        try:
+            self._ensure_llm()
+            response = await _ainvoke(self.llm, self._build_instantiate_messages(ir, template))
+            return self._handle_shot_plan_response(response, start_time)
+
+        except Exception as e:
+            logger.error("template_instantiate_error", error=str(e))
+            raise
+
+    def _build_instantiate_messages(self, ir: IR, template: Dict[str, Any]) -> List[Any]:
+        """Build chat messages for template instantiation"""
         prompt = f"""You are a medical video director. Instantiate the following template with concrete values based on the user's intent.
 
 **User Intent:**
@@ -186,34 +257,89 @@ Shot Skeletons:
 
 {self.shot_plan_parser.get_format_instructions()}"""
 
-        try:
-            self._ensure_llm()
-            messages = [
-                SystemMessage(content="You are a medical video director."),
-                HumanMessage(content=prompt),
-            ]
+        return [
+            SystemMessage(content="You are a medical video director."),
+            HumanMessage(content=prompt),
+        ]
 
-            response = self.llm.invoke(messages)
+    def _handle_shot_plan_response(self, response: Any, start_time: float) -> ShotPlan:
+        """Parse the LLM response into a ShotPlan and record metrics"""
+        # Parse structured output
+        shot_plan = self.shot_plan_parser.parse(response.content)
 
-            # Parse structured output
-            shot_plan = self.shot_plan_parser.parse(response.content)
+        duration = time.time() - start_time
+        self.metrics["template_instantiate_duration"] = duration
 
-            duration = time.time() - start_time
-            self.metrics["template_instantiate_duration"] = duration
+        logger.info(
+            "template_instantiate_success",
+            template_id=shot_plan.template_id,
+            shot_count=len(shot_plan.shots),
+            duration_s=duration,
+        )
 
-            logger.info(
-                "template_instantiate_success",
-                template_id=shot_plan.template_id,
-                shot_count=len(shot_plan.shots),
-                duration_s=duration,
-            )
+        return shot_plan
+
+    async def arevise_shot_plan(
+        self,
+        shot_plan: Dict[str, Any],
+        targeted_fields: List[str],
+        suggested_modifications: Dict[str, Any],
+    ) -> ShotPlan:
+        """
+        Apply revision feedback to an existing shot plan using LLM
+
+        Args:
+            shot_plan: Parent job's shot plan
+            targeted_fields: Fields identified by FeedbackParser
+            suggested_modifications: Per-field modification hints
+
+        Returns:
+            Revised ShotPlan (same shot ids as the parent)
+        """
+        start_time = time.time()
 
-            return shot_plan
+        try:
+            self._ensure_llm()
+            response = await _ainvoke(
+                self.llm,
+                self._build_revise_messages(shot_plan, targeted_fields, suggested_modifications),
+            )
+            return self._handle_shot_plan_response(response, start_time)
 
         except Exception as e:
-            logger.error("template_instantiate_error", error=str(e))
+            logger.error("shot_plan_revise_error", error=str(e))
             raise
 
+    def _build_revise_messages(
+        self,
+        shot_plan: Dict[str, Any],
+        targeted_fields: List[str],
+        suggested_modifications: Dict[str, Any],
+    ) -> List[Any]:
+        """Build chat messages for shot plan revision"""
+        prompt = f"""You are a medical video director. Revise the existing shot plan according to the user's feedback.
+
+**Current Shot Plan:**
+{json.dumps(shot_plan, ensure_ascii=False, indent=2)}
+
+**Targeted Fields:** {', '.join(targeted_fields)}
+
+**Suggested Modifications:**
+{json.dumps(suggested_modifications, ensure_ascii=False, indent=2)}
+
+**Instructions:**
+1. Only change what the targeted fields and suggested modifications require
+2. Keep every shot_id; do not add, remove or reorder shots
+3. Leave shots the feedback does not concern exactly as they are
+4. Keep template_id, template_version and subtitle_policy unchanged
+
+{self.shot_plan_parser.get_format_instructions()}"""
+
+        return [
+            SystemMessage(content="You are a medical video director."),
+            HumanMessage(content=prompt),
+        ]
+
     def _format_shot_skeletons(self, shot_skeletons: List[Dict[str, Any]]) -> str:
         """Format shot skeletons for prompt"""
         formatted = []
@@ -267,6 +393,32 @@ class FeedbackParser:
         Returns:
             Dict with targeted_fields and suggested_modifications
         """
+        try:
+            self._ensure_llm()
+            response = self.llm.invoke(self._build_feedback_messages(feedback, previous_ir))
+            return self._handle_feedback_response(response)
+
+        except Exception as e:
+            return self._default_feedback_result(feedback, e)
+
+    async def aparse_feedback(
+        self,
+        feedback: str,
+        previous_ir: IR,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of parse_feedback; does not block the event loop
+        """
+        try:
+            self._ensure_llm()
+            response = await _ainvoke(self.llm, self._build_feedback_messages(feedback, previous_ir))
+            return self._handle_feedback_response(response)
+
+        except Exception as e:
+            return self._default_feedback_result(feedback, e)
+
+    def _build_feedback_messages(self, feedback: str, previous_ir: IR) -> List[Any]:
+        """Build chat messages for feedback parsing"""
         def _get_ir_value(key: str, default: Any):
             if isinstance(previous_ir, dict):
                 return previous_ir.get(key, default)
@@ -302,31 +454,26 @@ Return a JSON object with:
   }}
 }}"""
 
-        try:
-            self._ensure_llm()
-            messages = [
-                SystemMessage(content="You are a medical video revision assistant."),
-                HumanMessage(content=prompt),
-            ]
-
-            response = self.llm.invoke(messages)
-
-            # Parse JSON response
-            import json
-            result = json.loads(response.content)
+        return [
+            SystemMessage(content="You are a medical video revision assistant."),
+            HumanMessage(content=prompt),
+        ]
 
-            logger.info(
-                "feedback_parse_success",
-                targeted_fields=result.get("targeted_fields", []),
-            )
+    def _handle_feedback_response(self, response: Any) -> Dict[str, Any]:
+        """Parse the JSON feedback result"""
+        result = json.loads(response.content)
 
-            return result
+        logger.info(
+            "feedback_parse_success",
+            targeted_fields=result.get("targeted_fields", []),
+        )
 
-        except Exception as e:
-            logger.error("feedback_parse_error", error=str(e))
-            # Return default target all fields if parsing fails
-            return {
-                "targeted_fields": ["camera", "narration", "lighting", "emotion", "pacing"],
-                "suggested_modifications": {"feedback": feedback},
-            }
+        return result
 
+    def _default_feedback_result(self, feedback: str, error: Exception) -> Dict[str, Any]:
+        """Return default target all fields if parsing fails"""
+        logger.error("feedback_parse_error", error=str(error))
+        return {
+            "targeted_fields": ["camera", "narration", "lighting", "emotion", "pacing"],
+            "suggested_modifications": {"feedback": feedback},
+        }
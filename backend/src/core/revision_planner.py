@@ -0,0 +1,111 @@
+"""
+Revision Planner - Decide which shots a revision actually invalidates
+"""
+
+from typing import Dict, Any, List, Set
+from pydantic import BaseModel
+
+
+class RevisionPlan(BaseModel):
+    """Result of diffing a revised shot plan against its parent"""
+
+    shots: List[Dict[str, Any]]  # merged revised shots, in order
+    invalidated: List[Any]  # shot_ids that must be regenerated
+    reused: List[Any]  # shot_ids whose parent assets can be reused
+    reasons: Dict[str, str]
+
+
+class RevisionPlanner:
+    """
+    Merge a revised shot plan into its parent and find invalidated shots
+
+    Only the shot keys owned by the targeted fields are taken from the
+    revised plan; everything else is kept from the parent so the LLM cannot
+    drift untouched shots. A shot is invalidated when its compiled request
+    (cache key) differs from the parent's.
+    """
+
+    # Shot plan keys each feedback field is allowed to change
+    FIELD_SHOT_KEYS = {
+        "camera": ["camera"],
+        "lighting": ["lighting"],
+        "emotion": ["visual_prompt", "visual", "emotion"],
+        "pacing": ["duration_s"],
+        "narration": ["narration"],
+    }
+
+    def merge_shots(
+        self,
+        parent_shots: List[Dict[str, Any]],
+        revised_shots: List[Dict[str, Any]],
+        targeted_fields: List[str],
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply targeted keys from the revised shots onto the parent shots
+
+        Args:
+            parent_shots: Parent shot plan shots
+            revised_shots: LLM-revised shots
+            targeted_fields: Fields identified by FeedbackParser
+
+        Returns:
+            Merged shots in parent order
+        """
+        allowed: Set[str] = set()
+        for field in targeted_fields:
+            allowed.update(self.FIELD_SHOT_KEYS.get(field, []))
+
+        revised_by_id = {str(shot.get("shot_id")): shot for shot in revised_shots}
+        merged = []
+        for parent_shot in parent_shots:
+            shot = dict(parent_shot)
+            revised = revised_by_id.get(str(parent_shot.get("shot_id")))
+            if revised:
+                for key in allowed:
+                    if key in revised:
+                        shot[key] = revised[key]
+            merged.append(shot)
+        return merged
+
+    def plan(
+        self,
+        merged_shots: List[Dict[str, Any]],
+        parent_cache_keys: Dict[str, str],
+        revised_cache_keys: Dict[str, str],
+    ) -> RevisionPlan:
+        """
+        Diff compiled request keys shot by shot
+
+        Args:
+            merged_shots: Output of merge_shots
+            parent_cache_keys: shot_id -> cache key of the parent's requests
+            revised_cache_keys: shot_id -> cache key of the revised requests
+
+        Returns:
+            RevisionPlan
+        """
+        invalidated = []
+        reused = []
+        reasons = {}
+
+        for shot in merged_shots:
+            shot_id = shot.get("shot_id")
+            key = str(shot_id)
+            parent_key = parent_cache_keys.get(key)
+
+            if parent_key is None:
+                invalidated.append(shot_id)
+                reasons[key] = "no_parent_render"
+            elif parent_key != revised_cache_keys.get(key):
+                invalidated.append(shot_id)
+                reasons[key] = "request_changed"
+            else:
+                reused.append(shot_id)
+                reasons[key] = "unchanged"
+
+        return RevisionPlan(
+            shots=merged_shots,
+            invalidated=invalidated,
+            reused=reused,
+            reasons=reasons,
+        )
@@ -83,6 +83,12 @@ class TemplateRouter:
                 # Allow metadata-only builds in unit tests without embeddings
                 self.faiss_index = None
 
+    def warm(self, db: Session) -> None:
+        """Build the index ahead of the first match (called at startup)"""
+        if self.faiss_index is None:
+            templates = TemplateDB.list_templates(db)
+            self.build_index([t.to_dict() for t in templates])
+
     def _normalize_tag(self, value: str) -> str:
         """Normalize tags for comparisons."""
         return re.sub(r"[_\s]+", "", value.strip().lower())
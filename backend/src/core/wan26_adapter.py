@@ -3,6 +3,8 @@ Wan2.6-t2v Adapter - DashScope text-to-video API integration
 """
 
 import asyncio
+import time
+import httpx
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 try:
@@ -12,6 +14,8 @@ except Exception:  # pragma: no cover - optional dependency for tests
 from http import HTTPStatus
 
 from src.config.settings import settings
+from src.core.dashscope_client import DashScopeAsyncClient, DashScopeAPIError, get_dashscope_client
+from src.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from src.services.observability import logger
 
 
@@ -39,29 +43,97 @@ class ShotGenerationResponse(BaseModel):
 class Wan26Adapter:
     """
     Adapter for DashScope wan2.6-t2v text-to-video API
-    Uses DashScope VideoSynthesis SDK
+
+    Talks to the REST API through the pooled DashScopeAsyncClient by default;
+    DASHSCOPE_TRANSPORT=sdk falls back to the VideoSynthesis SDK (run in a
+    worker thread so it never blocks the event loop).
+
+    Every task holds a slot of the process-wide adaptive concurrency
+    controller from submission until it finishes or is cancelled. Submits
+    go through the "dashscope" circuit breaker, so an outage fails new
+    shots fast instead of queueing them behind doomed calls.
     """
 
-    def __init__(self):
+    MODEL = "wan2.6-t2v"
+
+    def __init__(self, client: Optional[DashScopeAsyncClient] = None):
         """Initialize wan2.6 adapter"""
         self.api_key = settings.dashscope_api_key
+        self.transport = settings.dashscope_transport
+        self._client = client
+
+    @property
+    def client(self) -> DashScopeAsyncClient:
+        if self._client is None:
+            self._client = get_dashscope_client()
+        return self._client
+
+    @property
+    def concurrency(self):
+        from src.services.concurrency_controller import get_concurrency_controller
+        return get_concurrency_controller()
+
+    @staticmethod
+    def _is_throttling_error(error: Exception) -> bool:
+        if not isinstance(error, DashScopeAPIError):
+            return False
+        return error.status_code == 429 or "throttl" in (error.code or "").lower()
 
     async def submit_shot_request(
         self,
         request: ShotGenerationRequest,
+        priority: int = 0,
+        client: str = "",
+        quality_mode: Optional[str] = None,
     ) -> ShotGenerationResponse:
         """
         Submit single shot generation request to DashScope
 
+        Waits for an in-flight slot first; throttled submissions shrink the
+        limit and are retried through the same queue. Raises CircuitOpenError
+        without queueing while the DashScope breaker is open.
+
         Args:
             request: Shot generation request
+            priority: Queue priority for the in-flight slot (higher first)
+            client: Client key the slot is fair-shared by
+            quality_mode: Job quality mode (weights the client's share)
 
         Returns:
             ShotGenerationResponse with task_id
 
         Raises:
-            Exception: If API request fails
+            DashScopeAPIError: If DashScope rejects the request
+            Exception: If the request cannot be sent
         """
+        controller = self.concurrency
+        breaker = get_circuit_breaker("dashscope")
+        retries = settings.dashscope_throttle_retries
+
+        for attempt in range(retries + 1):
+            await breaker.admit()
+            await controller.acquire(priority, client=client, quality_mode=quality_mode, cost=request.duration)
+            started = time.monotonic()
+            try:
+                async with breaker.guard():
+                    response = await self._submit(request)
+            except Exception as e:
+                controller.release()
+                if self._is_throttling_error(e):
+                    controller.on_throttled()
+                    if attempt < retries:
+                        await asyncio.sleep(min(2 ** attempt, 10))
+                        continue
+                raise
+            except BaseException:
+                controller.release()
+                raise
+
+            controller.on_success(time.monotonic() - started)
+            controller.bind(response.task_id)
+            return response
+
+    async def _submit(self, request: ShotGenerationRequest) -> ShotGenerationResponse:
         try:
             logger.info(
                 "submit_shot_request",
@@ -71,40 +143,34 @@ class Wan26Adapter:
                 seed=request.seed,
             )
 
-            if VideoSynthesis is None:
-                raise ImportError("dashscope VideoSynthesis is not available")
+            if self.transport == "sdk":
+                task_id = await self._submit_via_sdk(request)
+            else:
+                output = await self.client.submit_video_synthesis(
+                    model=self.MODEL,
+                    input={
+                        "prompt": request.prompt,
+                        "negative_prompt": request.negative_prompt,
+                    },
+                    parameters={
+                        "size": request.size,
+                        "duration": request.duration,
+                        "seed": request.seed,
+                        "prompt_extend": request.prompt_extend,
+                        "watermark": request.watermark,
+                    },
+                )
+                task_id = output["task_id"]
 
-            # Use DashScope VideoSynthesis async_call
-            rsp = VideoSynthesis.async_call(
-                api_key=self.api_key,
-                model='wan2.6-t2v',
-                prompt=request.prompt,
-                negative_prompt=request.negative_prompt,
-                size=request.size,
-                duration=request.duration,
-                seed=request.seed,
-                prompt_extend=request.prompt_extend,
-                watermark=request.watermark,
+            logger.info(
+                "shot_request_submitted",
+                task_id=task_id,
             )
 
-            if rsp.status_code == HTTPStatus.OK:
-                task_id = rsp.output.task_id
-                logger.info(
-                    "shot_request_submitted",
-                    task_id=task_id,
-                )
-
-                return ShotGenerationResponse(
-                    task_id=task_id,
-                    status="submitted",
-                )
-            else:
-                error_msg = f'Failed, status_code: {rsp.status_code}, code: {rsp.code}, message: {rsp.message}'
-                logger.error(
-                    "shot_request_failed",
-                    error=error_msg,
-                )
-                raise Exception(error_msg)
+            return ShotGenerationResponse(
+                task_id=task_id,
+                status="submitted",
+            )
 
         except Exception as e:
             logger.error(
@@ -113,76 +179,186 @@ class Wan26Adapter:
             )
             raise
 
-    async def poll_task_status(
+    async def _submit_via_sdk(self, request: ShotGenerationRequest) -> str:
+        if VideoSynthesis is None:
+            raise ImportError("dashscope VideoSynthesis is not available")
+
+        rsp = await asyncio.to_thread(
+            VideoSynthesis.async_call,
+            api_key=self.api_key,
+            model=self.MODEL,
+            prompt=request.prompt,
+            negative_prompt=request.negative_prompt,
+            size=request.size,
+            duration=request.duration,
+            seed=request.seed,
+            prompt_extend=request.prompt_extend,
+            watermark=request.watermark,
+        )
+
+        if rsp.status_code != HTTPStatus.OK:
+            raise DashScopeAPIError(rsp.status_code, rsp.code, rsp.message)
+
+        return rsp.output.task_id
+
+    async def fetch_task_status(
         self,
         task_id: str,
-        max_attempts: int = 60,
-        poll_interval: int = 5,
     ) -> ShotGenerationResponse:
         """
-        Poll task status until completion or timeout using DashScope wait()
+        Fetch the current status of a task once (no waiting)
 
         Args:
             task_id: DashScope task ID
-            max_attempts: Maximum number of polling attempts (not used with wait())
-            poll_interval: Seconds between polls (not used with wait())
 
         Returns:
-            ShotGenerationResponse with status and video_url if successful
+            ShotGenerationResponse with status pending/running/succeeded/failed
 
         Raises:
-            Exception: If task fails or times out
+            Exception: If the status request itself fails
+        """
+        if self.transport != "sdk":
+            output = await self.client.fetch_task(task_id)
+            return self._to_shot_response(
+                task_id,
+                output.get("task_status"),
+                output.get("video_url"),
+                output.get("message"),
+            )
+
+        if VideoSynthesis is None:
+            raise ImportError("dashscope VideoSynthesis is not available")
+
+        # The SDK call is blocking; keep it off the event loop
+        rsp = await asyncio.to_thread(VideoSynthesis.fetch, task=task_id, api_key=self.api_key)
+
+        if rsp.status_code != HTTPStatus.OK:
+            raise DashScopeAPIError(rsp.status_code, rsp.code, rsp.message)
+
+        output = rsp.output
+        return self._to_shot_response(
+            task_id,
+            getattr(output, "task_status", None),
+            getattr(output, "video_url", None),
+            getattr(output, "message", None),
+        )
+
+    def _to_shot_response(
+        self,
+        task_id: str,
+        task_status: Optional[str],
+        video_url: Optional[str],
+        message: Optional[str],
+    ) -> ShotGenerationResponse:
+        """Map a DashScope task_status onto ShotGenerationResponse"""
+        task_status = (task_status or "UNKNOWN").upper()
+        if task_status == "SUCCEEDED":
+            return ShotGenerationResponse(task_id=task_id, status="succeeded", video_url=video_url)
+        if task_status in ("PENDING", "RUNNING"):
+            return ShotGenerationResponse(task_id=task_id, status=task_status.lower())
+        return ShotGenerationResponse(
+            task_id=task_id,
+            status="failed",
+            error=f"task_status: {task_status}, message: {message}",
+        )
+
+    def adopt_task(self, task_id: str) -> None:
+        """
+        Re-attach to a task submitted before a restart
+
+        The task holds an in-flight slot until it finishes, like one
+        submitted by this process.
         """
+        self.concurrency.adopt(task_id)
+
+    async def poll_task_status(
+        self,
+        task_id: str,
+        profile: Optional[str] = None,
+    ) -> ShotGenerationResponse:
+        """
+        Wait for a task to finish via the shared TaskPoller
+
+        Args:
+            task_id: DashScope task ID
+            profile: Render profile (e.g. "1280*720:5") used to learn the
+                expected completion time for adaptive polling
+
+        Returns:
+            ShotGenerationResponse with status and video_url if successful
+        """
+        from src.services.task_poller import get_task_poller
+
+        logger.info(
+            "task_wait_start",
+            task_id=task_id,
+        )
+
         try:
-            if VideoSynthesis is None:
-                raise ImportError("dashscope VideoSynthesis is not available")
+            result = await get_task_poller(self.fetch_task_status).wait(task_id, profile=profile)
+        except asyncio.CancelledError:
+            # Still running upstream; cancel_task decides when the slot frees
+            raise
+        except BaseException:
+            self.concurrency.release_task(task_id)
+            raise
+        self.concurrency.release_task(task_id)
 
-            # Use DashScope VideoSynthesis.wait() for automatic polling
+        if result.status == "succeeded":
             logger.info(
-                "task_wait_start",
+                "task_completed",
+                task_id=task_id,
+                video_url=result.video_url,
+            )
+        else:
+            logger.error(
+                "task_failed",
                 task_id=task_id,
+                error=result.error,
             )
 
-            rsp = VideoSynthesis.wait(task=task_id, api_key=self.api_key)
+        return result
 
-            if rsp.status_code == HTTPStatus.OK:
-                video_url = rsp.output.video_url
-                logger.info(
-                    "task_completed",
-                    task_id=task_id,
-                    video_url=video_url,
-                )
+    async def cancel_task(self, task_id: str) -> None:
+        """
+        Best-effort cancel of an upstream task (only PENDING tasks can be cancelled)
 
-                return ShotGenerationResponse(
-                    task_id=task_id,
-                    status="succeeded",
-                    video_url=video_url,
-                )
-            else:
-                error_msg = f'Failed, status_code: {rsp.status_code}, code: {rsp.code}, message: {rsp.message}'
-                logger.error(
-                    "task_failed",
-                    task_id=task_id,
-                    error=error_msg,
-                )
+        A task that could not be cancelled keeps its in-flight slot until it
+        finishes upstream, so the concurrency limit reflects real load.
+        """
+        try:
+            await self._cancel(task_id)
+        except Exception:
+            asyncio.create_task(self._release_when_done(task_id))
+            raise
+        self.concurrency.release_task(task_id)
 
-                return ShotGenerationResponse(
-                    task_id=task_id,
-                    status="failed",
-                    error=error_msg,
-                )
+    async def _cancel(self, task_id: str) -> None:
+        if self.transport != "sdk":
+            await self.client.cancel_task(task_id)
+            return
 
+        if VideoSynthesis is None:
+            raise ImportError("dashscope VideoSynthesis is not available")
+
+        rsp = await asyncio.to_thread(VideoSynthesis.cancel, task=task_id, api_key=self.api_key)
+        if rsp.status_code != HTTPStatus.OK:
+            raise DashScopeAPIError(rsp.status_code, rsp.code, rsp.message)
+
+    async def _release_when_done(self, task_id: str) -> None:
+        from src.services.task_poller import get_task_poller
+
+        try:
+            await get_task_poller(self.fetch_task_status).wait(task_id)
         except Exception as e:
-            logger.error(
-                "task_poll_error",
-                task_id=task_id,
-                error=str(e),
-            )
-            raise
+            logger.warning("task_release_wait_failed", task_id=task_id, error=str(e))
+        finally:
+            self.concurrency.release_task(task_id)
 
     async def close(self):
-        """Close resources (no-op for DashScope SDK)"""
-        pass
+        """Close the shared HTTP connection pool"""
+        if self._client is not None:
+            await self._client.close()
 
 
 class Wan26RetryAdapter(Wan26Adapter):
@@ -257,6 +433,13 @@ class Wan26RetryAdapter(Wan26Adapter):
         Returns:
             True if error is retryable
         """
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, DashScopeAPIError):
+            return error.status_code == 429 or error.status_code >= 500
+        if isinstance(error, httpx.TransportError):
+            return True
+
         # Network errors and timeout errors are retryable
         error_message = str(error).lower()
         retryable_keywords = [
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.config.settings import settings
 import os
@@ -10,8 +11,19 @@ if db_dir and not os.path.exists(db_dir):
 
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False, "timeout": 30} if "sqlite" in settings.database_url else {}
 )
+
+if "sqlite" in settings.database_url:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        # API and worker processes share the file; WAL lets readers proceed
+        # while a worker holds the write lock.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -22,3 +34,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def init_db():
+    """Create all tables (API and worker processes both call this on startup)"""
+    from src.models import job, job_queue, circuit_breaker, asset_ref, process_metrics, shot_cache  # noqa: F401 - register models
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+def _add_missing_columns():
+    """
+    Bring tables created by an older release up to date
+
+    create_all never alters an existing table, so columns added to a model
+    since (all nullable) are added here with ALTER TABLE. Safe to run from
+    several processes at once: a column another process just added is skipped.
+    """
+    from src.services.observability import logger
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"
+                    ))
+            except OperationalError:
+                if column.name not in {c["name"] for c in inspect(engine).get_columns(table.name)}:
+                    raise
+                continue
+            logger.info("db_column_added", table=table.name, column=column.name)
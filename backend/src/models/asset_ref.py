@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, UniqueConstraint
+from src.models import Base
+
+class AssetRefModel(Base):
+    """A job's reference to a content-addressed video blob"""
+
+    __tablename__ = "asset_refs"
+    __table_args__ = (UniqueConstraint("job_id", "file_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, index=True)
+    file_id = Column(String)  # shot id, plus seed / "final" suffix
+    sha256 = Column(String, index=True)
+    size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
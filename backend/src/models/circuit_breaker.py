@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, UniqueConstraint
+from src.models import Base
+
+class CircuitBreakerStateModel(Base):
+    """Last published breaker state per dependency and process"""
+
+    __tablename__ = "circuit_breakers"
+    __table_args__ = (UniqueConstraint("name", "process_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, index=True)  # dashscope | llm
+    process_id = Column(String)  # host:pid
+    state = Column(String, default="closed")  # closed | open | half_open
+    failure_rate = Column(Float, default=0.0)
+    slow_call_rate = Column(Float, default=0.0)
+    calls = Column(Integer, default=0)
+    opened_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime)
@@ -2,17 +2,23 @@ from sqlalchemy import Column, String, Integer, JSON, DateTime, ForeignKey, Text
 from sqlalchemy.sql import func
 from src.models import Base
 import uuid
+from datetime import datetime
 
 class JobModel(Base):
     __tablename__ = "jobs"
 
     job_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     state = Column(String, index=True, default="PENDING")
+    # Which background pass owns the job while RUNNING: preview | revision | finalize
+    stage = Column(String, nullable=True)
+    # When the job entered its current state; the watchdog times stages from here
+    stage_started_at = Column(DateTime, nullable=True, default=datetime.utcnow)
     
     # Input Data
     user_input_redacted = Column(Text)
     user_input_hash = Column(String, index=True)
     pii_flags = Column(JSON, default=list)
+    client_ip = Column(String, nullable=True)
     
     # Configuration
     template_id = Column(String)
@@ -31,6 +37,9 @@ class JobModel(Base):
     # Revision
     revision_of = Column(String, ForeignKey("jobs.job_id"), nullable=True)
     targeted_fields = Column(JSON, nullable=True)
+
+    # Result cache: job whose outputs were cloned into this one
+    cache_source_job_id = Column(String, nullable=True)
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -38,3 +47,5 @@ class JobModel(Base):
     error_details = Column(JSON, nullable=True)
     state_transitions = Column(JSON, default=list)
     selected_seeds = Column(JSON, nullable=True)
+    # Finalize requested while the preview was still rendering; queued when it ends
+    finalize_request = Column(JSON, nullable=True)
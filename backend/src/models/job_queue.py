@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, JSON, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+from src.models import Base
+
+class JobQueueEntryModel(Base):
+    __tablename__ = "job_queue"
+
+    entry_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.job_id"), index=True)
+    kind = Column(String)  # generate | revise | finalize
+    payload = Column(JSON, default=dict)
+    priority = Column(Integer, index=True, default=0)
+    state = Column(String, index=True, default="QUEUED")
+
+    # Lease
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
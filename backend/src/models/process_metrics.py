@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer, JSON, DateTime
+from src.models import Base
+
+class ProcessMetricsModel(Base):
+    """Last metrics snapshot published by each worker process"""
+
+    __tablename__ = "process_metrics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    process_id = Column(String, unique=True, index=True)  # worker id: host:pid:index
+    role = Column(String)  # worker
+    snapshot = Column(JSON)
+    updated_at = Column(DateTime, index=True)
@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from src.models import Base
+
+class ShotCacheEntryModel(Base):
+    """A rendered shot's content-addressed blob, keyed by its request hash"""
+
+    __tablename__ = "shot_cache"
+
+    cache_key = Column(String, primary_key=True)
+    sha256 = Column(String, index=True)
+    size = Column(Integer)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
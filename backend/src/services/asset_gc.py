@@ -0,0 +1,398 @@
+"""
+Asset GC - Retention rules and disk quota for stored assets
+"""
+
+import asyncio
+import glob
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.config.settings import settings
+from src.models import SessionLocal
+from src.models.asset_ref import AssetRefModel
+from src.models.job import JobModel
+from src.models.shot_cache import ShotCacheEntryModel
+from src.services.asset_storage import AssetStorage, LocalBlobBackend
+from src.services.observability import logger, metrics
+from src.services.result_cache import ResultCache
+from src.services.storage import JobDB
+
+TERMINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELLED")
+
+# Eviction order under quota pressure (lowest first), LRU within a rank
+RANK_DISCARDED = 0  # FAILED / CANCELLED jobs and revisions superseded by a successor
+RANK_FINALIZED_PREVIEW = 1  # preview renders of shots that have a final render
+RANK_LIVE = 2  # everything else
+
+
+class _Candidate:
+    """A job's assets (or only some of its files) that may be deleted"""
+
+    def __init__(
+        self,
+        job: JobModel,
+        reason: str,
+        rank: int,
+        retention_days: float,
+        file_ids: Optional[Set[str]] = None,
+    ):
+        self.job = job
+        self.reason = reason
+        self.rank = rank
+        self.retention_days = retention_days
+        self.file_ids = file_ids  # None = every file of the job
+        last_used = job.updated_at or job.created_at or datetime.utcnow()
+        self.last_used = last_used.replace(tzinfo=None)
+
+    def expired(self, now: datetime) -> bool:
+        return self.retention_days > 0 and now - self.last_used >= timedelta(days=self.retention_days)
+
+
+class AssetGarbageCollector:
+    """
+    Periodically deletes assets nobody needs any more
+
+    Each run:
+    1. sweeps orphans: partial downloads, `.tmp` files, refs of deleted
+       jobs, blobs no job refers to, and shot cache entries of such blobs;
+    2. applies retention: FAILED / CANCELLED jobs, revisions superseded by a
+       successful successor, previews of finalized shots and, finally, any
+       terminal job each expire after their own number of days;
+    3. enforces ASSET_DISK_QUOTA_GB: while usage is above the quota, deletes
+       candidates in rank order (discarded, finalized previews, live) and
+       least recently updated first, down to ASSET_GC_TARGET_RATIO of it.
+       The shot cache is bounded by SHOT_CACHE_MAX_BYTES on its own and is
+       not counted: a blob whose only other link is a cache entry counts as
+       freed once its last ref goes.
+
+    Only terminal jobs are touched. A blob is deleted when its last ref
+    goes, so bytes shared by revisions or cache hits stay until every job
+    using them is gone. Deleted videos are marked `expired` on the job's
+    assets, and the job is dropped from the result cache.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[AssetStorage] = None,
+        session_factory=SessionLocal,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        self.storage = storage or AssetStorage()
+        self.session_factory = session_factory
+        self.result_cache = result_cache
+        self._cached: Set[tuple] = set()
+
+    @property
+    def _local(self) -> bool:
+        return isinstance(self.storage.backend, LocalBlobBackend)
+
+    def collect(self) -> Dict[str, Any]:
+        """Run one GC pass; returns a report of what was reclaimed"""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        reclaimed: Dict[str, int] = {}
+        evicted_jobs = 0
+
+        with self.session_factory() as db:
+            self._cached = _inodes(settings.shot_cache_dir)
+            orphans, orphan_bytes = self._sweep_orphans(db, now)
+            reclaimed["orphan"] = orphan_bytes
+
+            candidates = self._candidates(db)
+            done: Set[str] = set()
+            for candidate in candidates:
+                if candidate.job.job_id in done or not candidate.expired(now):
+                    continue
+                if candidate.file_ids is None:
+                    done.add(candidate.job.job_id)
+                freed = self._evict(db, candidate)
+                if freed is not None:
+                    reclaimed[candidate.reason] = reclaimed.get(candidate.reason, 0) + freed
+                    evicted_jobs += 1
+
+            usage = self._usage(db)
+            quota = int(settings.asset_disk_quota_gb * 1024 ** 3)
+            if quota and usage > quota:
+                target = int(quota * settings.asset_gc_target_ratio)
+                for candidate in sorted(candidates, key=lambda c: (c.rank, c.last_used)):
+                    if usage <= target:
+                        break
+                    if candidate.job.job_id in done or candidate.expired(now):
+                        continue
+                    if candidate.file_ids is None:
+                        done.add(candidate.job.job_id)
+                    freed = self._evict(db, candidate)
+                    if freed is not None:
+                        usage -= freed
+                        reclaimed["quota"] = reclaimed.get("quota", 0) + freed
+                        evicted_jobs += 1
+                if usage > target:
+                    logger.warning("asset_quota_unreachable", usage_bytes=usage, quota_bytes=quota)
+
+        duration = time.monotonic() - started
+        total = sum(reclaimed.values())
+        for reason, freed in reclaimed.items():
+            if freed:
+                metrics.incr("asset_gc_reclaimed_bytes", freed, reason=reason)
+        metrics.observe("asset_gc_run_s", duration)
+        metrics.set_gauge("asset_storage_bytes", usage)
+        report = {
+            "reclaimed_bytes": total,
+            "reclaimed_by_reason": {r: b for r, b in reclaimed.items() if b},
+            "evictions": evicted_jobs,
+            "orphans_removed": orphans,
+            "usage_bytes": usage,
+            "duration_s": round(duration, 3),
+        }
+        logger.info("asset_gc_completed", **report)
+        return report
+
+    def _candidates(self, db) -> List[_Candidate]:
+        jobs = db.query(JobModel).filter(JobModel.state.in_(TERMINAL_STATES)).all()
+        superseded = {
+            row.revision_of
+            for row in db.query(JobModel.revision_of)
+            .filter(JobModel.revision_of.isnot(None), JobModel.state == "SUCCEEDED")
+            .all()
+        }
+
+        candidates = []
+        for job in jobs:
+            if job.state in ("FAILED", "CANCELLED"):
+                candidates.append(_Candidate(job, "failed", RANK_DISCARDED, settings.asset_retention_failed_days))
+                continue
+            if job.job_id in superseded:
+                candidates.append(_Candidate(job, "superseded", RANK_DISCARDED, settings.asset_retention_superseded_days))
+                continue
+
+            previews = self._finalized_previews(db, job)
+            if previews:
+                candidates.append(
+                    _Candidate(job, "finalized_preview", RANK_FINALIZED_PREVIEW,
+                               settings.asset_retention_preview_days, file_ids=previews)
+                )
+            candidates.append(_Candidate(job, "retention", RANK_LIVE, settings.job_retention_days))
+        return candidates
+
+    def _finalized_previews(self, db, job: JobModel) -> Set[str]:
+        """File ids of preview renders whose shot has a completed final render"""
+        finalized = {
+            str(a.get("shot_id")) for a in (job.assets or [])
+            if a.get("final_status") == "completed" and not a.get("preview_expired")
+        }
+        if not finalized:
+            return set()
+        file_ids = {ref.file_id for ref in db.query(AssetRefModel.file_id).filter(AssetRefModel.job_id == job.job_id)}
+        for path in glob.glob(os.path.join(settings.static_video_dir, f"{glob.escape(job.job_id)}_*.mp4")):
+            file_ids.add(os.path.basename(path)[len(job.job_id) + 1: -len(".mp4")])
+        return {
+            file_id for file_id in file_ids
+            if file_id.split("_")[0] in finalized and not file_id.endswith("_final")
+        }
+
+    def _evict(self, db, candidate: _Candidate) -> Optional[int]:
+        """
+        Delete a candidate's refs, unreferenced blobs and legacy files
+
+        Returns the bytes freed, or None if nothing of it was left.
+        """
+        job = candidate.job
+        query = db.query(AssetRefModel).filter(AssetRefModel.job_id == job.job_id)
+        if candidate.file_ids is not None:
+            query = query.filter(AssetRefModel.file_id.in_(candidate.file_ids))
+        refs = query.all()
+        digests = {ref.sha256: ref.size or 0 for ref in refs}
+        for ref in refs:
+            db.delete(ref)
+        db.commit()
+
+        freed = 0
+        still_used = self._referenced(db, digests)
+        for digest, size in digests.items():
+            if digest not in still_used:
+                freed += self._delete_blob(digest, size)
+
+        if candidate.file_ids is None:
+            legacy = glob.glob(os.path.join(settings.static_video_dir, f"{glob.escape(job.job_id)}_*.mp4"))
+            legacy += glob.glob(os.path.join(settings.static_audio_dir, f"{glob.escape(job.job_id)}_*.mp3"))
+            legacy.append(os.path.join(settings.static_metadata_dir, f"{job.job_id}.json"))
+        else:
+            legacy = [os.path.join(settings.static_video_dir, f"{job.job_id}_{f}.mp4") for f in candidate.file_ids]
+        legacy = [path for path in legacy if os.path.exists(path)]
+        freed += sum(self._remove(path) for path in legacy)
+
+        marked = self._mark_expired(db, job, candidate.file_ids is None)
+        if not refs and not legacy and not marked:
+            return None
+        logger.info(
+            "asset_gc_evicted",
+            job_id=job.job_id,
+            reason=candidate.reason,
+            files=len(refs) if candidate.file_ids is None else len(candidate.file_ids),
+            freed_bytes=freed,
+        )
+        return freed
+
+    @staticmethod
+    def _referenced(db, digests: Iterable[str]) -> Set[str]:
+        digests = list(digests)
+        if not digests:
+            return set()
+        rows = db.query(AssetRefModel.sha256).filter(AssetRefModel.sha256.in_(digests)).distinct()
+        return {row.sha256 for row in rows}
+
+    def _delete_blob(self, digest: str, size: int) -> int:
+        """Delete an unreferenced blob; returns bytes actually freed"""
+        if not self._local:
+            self.storage.backend.delete(self.storage.blob_key(digest))
+            return size
+        path = self.storage.blob_path(digest)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        if time.time() - st.st_mtime < settings.asset_gc_orphan_grace_s:
+            # Just stored or deduplicated: a new ref may be on its way; the orphan sweep retries later
+            return 0
+        return self._remove(path)
+
+    def _remove(self, path: str) -> int:
+        """
+        Delete a file; returns the bytes it no longer takes from the quota
+
+        0 if another hardlink outside the shot cache keeps the data.
+        """
+        try:
+            st = os.stat(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        if st.st_nlink <= 1:
+            return st.st_size
+        if st.st_nlink == 2 and (st.st_dev, st.st_ino) in self._cached:
+            return st.st_size
+        return 0
+
+    def _mark_expired(self, db, job: JobModel, whole_job: bool) -> bool:
+        """Drop deleted video URLs from the job's assets; returns False if already marked"""
+        assets = []
+        changed = False
+        for asset in job.assets or []:
+            asset = dict(asset)
+            if whole_job and not asset.get("expired"):
+                asset.pop("video_url", None)
+                asset["expired"] = True
+            elif not whole_job and asset.get("final_status") == "completed" and not asset.get("preview_expired"):
+                asset["preview_expired"] = True
+            else:
+                assets.append(asset)
+                continue
+            changed = True
+            asset.pop("preview_video_url", None)
+            asset["variants"] = [
+                {**{k: v for k, v in variant.items() if k != "video_url"}, "expired": True}
+                for variant in asset.get("variants", [])
+            ]
+            assets.append(asset)
+        if changed:
+            JobDB.update_job_assets(db, job.job_id, assets)
+            if self.result_cache is not None:
+                self.result_cache.forget(job.job_id)
+        return changed
+
+    def _sweep_orphans(self, db, now: datetime):
+        """Remove leftovers no job refers to; returns (files removed, bytes freed)"""
+        cutoff = time.time() - settings.asset_gc_orphan_grace_s
+        removed = 0
+        freed = 0
+
+        # Refs of jobs that no longer exist
+        job_ids = db.query(JobModel.job_id)
+        stale = db.query(AssetRefModel).filter(AssetRefModel.job_id.notin_(job_ids)).all()
+        for ref in stale:
+            db.delete(ref)
+        if stale:
+            db.commit()
+        # A cached shot lives as long as its blob: once no job refers to it, it is deleted below
+        (
+            db.query(ShotCacheEntryModel)
+            .filter(ShotCacheEntryModel.sha256.notin_(db.query(AssetRefModel.sha256)))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+
+        paths = [os.path.join(settings.static_partial_dir, name) for name in _listdir(settings.static_partial_dir)]
+        paths += glob.glob(os.path.join(settings.shot_cache_dir, "*.tmp"))
+        if self._local:
+            referenced = {row.sha256 for row in db.query(AssetRefModel.sha256).distinct()}
+            for root, _, names in os.walk(settings.static_blob_dir):
+                for name in names:
+                    if name.endswith(".tmp") or name[: -len(AssetStorage.BLOB_SUFFIX)] not in referenced:
+                        paths.append(os.path.join(root, name))
+
+        for path in paths:
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            bytes_freed = self._remove(path)
+            removed += 1
+            freed += bytes_freed
+        if removed:
+            logger.info("asset_gc_orphans_removed", files=removed, freed_bytes=freed, stale_refs=len(stale))
+        return removed, freed
+
+    def _usage(self, db) -> int:
+        """Bytes used by assets: the static root minus the shot cache (hardlinks counted once) plus remote blobs"""
+        seen: Set[tuple] = set()
+        usage = 0
+        cache_dir = os.path.abspath(settings.shot_cache_dir)
+        for root, dirs, names in os.walk(settings.static_root):
+            if os.path.abspath(root) == cache_dir:
+                dirs[:] = []
+                continue
+            for name in names:
+                try:
+                    st = os.lstat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                if (st.st_dev, st.st_ino) in seen:
+                    continue
+                seen.add((st.st_dev, st.st_ino))
+                usage += st.st_size
+        if not self._local:
+            sizes = db.query(AssetRefModel.sha256, AssetRefModel.size).distinct().all()
+            usage += sum({row.sha256: row.size or 0 for row in sizes}.values())
+        return usage
+
+    async def run(self) -> None:
+        """Collect every `asset_gc_interval_s` until cancelled"""
+        logger.info("asset_gc_started", interval_s=settings.asset_gc_interval_s)
+        while True:
+            try:
+                await asyncio.to_thread(self.collect)
+            except Exception as e:
+                logger.error("asset_gc_failed", error=str(e))
+            await asyncio.sleep(settings.asset_gc_interval_s)
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def _inodes(path: str) -> Set[tuple]:
+    """(device, inode) of the files directly in `path`"""
+    inodes = set()
+    for name in _listdir(path):
+        try:
+            st = os.stat(os.path.join(path, name))
+        except FileNotFoundError:
+            continue
+        inodes.add((st.st_dev, st.st_ino))
+    return inodes
@@ -2,46 +2,528 @@
 Asset Storage Service
 """
 
+import asyncio
 import os
 import json
-from typing import Dict, Any
+import shutil
+import hashlib
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Type
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
 from src.config.settings import settings
+from src.models import SessionLocal
+from src.models.asset_ref import AssetRefModel
+from src.services.observability import logger, metrics
+
+
+class BlobBackend(ABC):
+    """
+    Where content-addressed video blobs live
+
+    Keys are relative blob paths (`ab/cd/<sha256>.mp4`). `streams_uploads`
+    backends receive downloads as a byte stream (no local file); the others
+    receive a finished file on the static volume.
+    """
+
+    streams_uploads = False
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored"""
+
+    @abstractmethod
+    def put_file(self, key: str, source_path: str, move: bool = True) -> None:
+        """Store a local file under `key` (moved, or linked / copied with move=False)"""
+
+    @abstractmethod
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """Store a byte stream under `key`; returns its size"""
+
+    @abstractmethod
+    def move(self, src_key: str, dst_key: str) -> None:
+        """Rename a stored object"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a stored object (idempotent)"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """URL clients download the blob from"""
+
+
+class LocalBlobBackend(BlobBackend):
+    """Blobs on the static volume, served by StaticFiles / nginx"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.static_blob_dir
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put_file(self, key: str, source_path: str, move: bool = True) -> None:
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if move:
+            os.replace(source_path, dest)
+            return
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        _link_or_copy(source_path, tmp)
+        os.replace(tmp, dest)
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            with open(tmp, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return size
+
+    def move(self, src_key: str, dst_key: str) -> None:
+        dest = self.path(dst_key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(self.path(src_key), dest)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return f"{settings.static_url_prefix}/{settings.static_blob_subdir}/{key.replace(os.sep, '/')}"
+
+
+class S3BlobBackend(BlobBackend):
+    """
+    Blobs in an S3-compatible bucket (AWS S3, MinIO, OSS)
+
+    Downloads are piped into multipart uploads part by part (the next part
+    is downloaded while the previous one uploads), so video bytes never hit
+    local disk. Clients fetch blobs from the bucket: through
+    S3_PUBLIC_BASE_URL (e.g. a CDN) when set, else via a pre-signed URL
+    handed out by the assets route.
+    """
+
+    streams_uploads = True
+    MIN_PART_BYTES = 5 * 1024 * 1024
+
+    def __init__(self, client: Any = None, bucket: Optional[str] = None):
+        if client is None:
+            if boto3 is None:
+                raise ImportError("boto3 is required for ASSET_STORAGE_BACKEND=s3")
+            client = boto3.client(
+                "s3",
+                endpoint_url=settings.s3_endpoint_url or None,
+                region_name=settings.s3_region or None,
+                aws_access_key_id=settings.s3_access_key_id or None,
+                aws_secret_access_key=settings.s3_secret_access_key or None,
+                config=BotoConfig(signature_version="s3v4", max_pool_connections=settings.s3_max_connections),
+            )
+        self.client = client
+        self.bucket = bucket or settings.s3_bucket
+        self.part_bytes = max(self.MIN_PART_BYTES, settings.s3_multipart_chunk_mb * 1024 * 1024)
+
+    def _key(self, key: str) -> str:
+        return f"{settings.s3_prefix.strip('/')}/{key}".lstrip("/")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:  # botocore ClientError
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, key: str, source_path: str, move: bool = True) -> None:
+        # upload_file switches to a parallel multipart upload for large files
+        self.client.upload_file(
+            source_path, self.bucket, self._key(key), ExtraArgs={"ContentType": "video/mp4"}
+        )
+        if move:
+            os.remove(source_path)
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        object_key = self._key(key)
+        upload = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=object_key, ContentType="video/mp4"
+        )
+        upload_id = upload["UploadId"]
+        parts: List[Dict[str, Any]] = []
+        pending: Optional[asyncio.Task] = None
+        buffer = bytearray()
+        part_number = 0
+        size = 0
+
+        async def upload_part(number: int, body: bytes) -> None:
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=body,
+            )
+            parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+        async def flush() -> None:
+            nonlocal pending, buffer, part_number
+            # At most one part uploading while the next one is downloaded
+            if pending is not None:
+                await pending
+            part_number += 1
+            pending = asyncio.create_task(upload_part(part_number, bytes(buffer)))
+            buffer = bytearray()
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) >= self.part_bytes:
+                    await flush()
+            if buffer or not part_number:
+                await flush()
+            if pending is not None:
+                await pending
+            parts.sort(key=lambda p: p["PartNumber"])
+            await asyncio.to_thread(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            if pending is not None and not pending.done():
+                pending.cancel()
+            try:
+                await asyncio.shield(asyncio.to_thread(
+                    self.client.abort_multipart_upload, Bucket=self.bucket, Key=object_key, UploadId=upload_id
+                ))
+            except Exception as e:
+                logger.warning("s3_multipart_abort_failed", key=object_key, error=str(e))
+            raise
+        metrics.incr("s3_multipart_uploads")
+        return size
+
+    def move(self, src_key: str, dst_key: str) -> None:
+        # Managed copy: server-side, multipart for large objects
+        self.client.copy(
+            {"Bucket": self.bucket, "Key": self._key(src_key)}, self.bucket, self._key(dst_key)
+        )
+        self.delete(src_key)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def url(self, key: str) -> str:
+        if settings.s3_public_base_url:
+            return f"{settings.s3_public_base_url.rstrip('/')}/{self._key(key)}"
+        return self.presigned_url(key)
+
+    def presigned_url(self, key: str, expires_s: Optional[int] = None) -> str:
+        """Time-limited GET URL for a private bucket"""
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=expires_s or settings.s3_presign_expiry_s,
+        )
+
+
+BLOB_BACKENDS: Dict[str, Type[BlobBackend]] = {
+    "local": LocalBlobBackend,
+    "s3": S3BlobBackend,
+}
+
 
 class AssetStorage:
     """
     Manage storage of generated assets (videos, audio, metadata)
+
+    Videos are stored content-addressed: each distinct file is written once
+    as `blobs/ab/cd/<sha256>.mp4` and jobs refer to it through the
+    `asset_refs` table, so revisions, cache hits and mock runs that produce
+    the same bytes share one file, and blob URLs never change content (safe
+    to cache as immutable). Jobs created before the blob layout (or with
+    ASSET_CONTENT_ADDRESSED=false) keep their `{job_id}_{shot_id}.mp4` files.
+
+    Blobs live in a pluggable BlobBackend (ASSET_STORAGE_BACKEND): `local`
+    keeps them on the static volume, `s3` in an S3-compatible bucket, so
+    API nodes hold no video bytes.
     """
-    
-    def __init__(self):
+
+    BLOB_SUFFIX = ".mp4"
+    ASSET_ROUTE = "/v1/t2v/assets"
+
+    def __init__(self, content_addressed: Optional[bool] = None, backend: Optional[BlobBackend] = None):
+        if backend is None:
+            backend_cls = BLOB_BACKENDS.get(settings.asset_storage_backend)
+            if backend_cls is None:
+                raise ValueError(f"Unknown asset storage backend: {settings.asset_storage_backend}")
+            backend = backend_cls()
+        self.backend = backend
+        self.content_addressed = (
+            settings.asset_content_addressed if content_addressed is None else content_addressed
+        )
+        # Remote backends only hold blobs
+        self.content_addressed = self.content_addressed or not isinstance(backend, LocalBlobBackend)
         # Ensure directories exist
         os.makedirs(settings.static_video_dir, exist_ok=True)
         os.makedirs(settings.static_audio_dir, exist_ok=True)
         os.makedirs(settings.static_metadata_dir, exist_ok=True)
-        
+        os.makedirs(settings.static_partial_dir, exist_ok=True)
+
+    @property
+    def streams_uploads(self) -> bool:
+        """Downloads should be piped into `store_video_stream` instead of a local file"""
+        return self.backend.streams_uploads
+
     def get_video_storage_path(self, job_id: str, shot_id: str) -> str:
-        """Get absolute path for storing video"""
+        """Get absolute path of a job's video (its blob once stored)"""
+        digest = self.get_video_digest(job_id, shot_id)
+        if digest is not None:
+            return self.blob_path(digest)
+        return self._legacy_video_path(job_id, shot_id)
+
+    def _legacy_video_path(self, job_id: str, shot_id: str) -> str:
         filename = f"{job_id}_{shot_id}.mp4"
         return os.path.join(settings.static_video_dir, filename)
-        
+
+    def get_staging_path(self, job_id: str, shot_id: str) -> str:
+        """Path to download a video to before `store_video` (never served)"""
+        filename = f"{job_id}_{shot_id}.{uuid.uuid4().hex[:8]}.mp4"
+        return os.path.join(settings.static_partial_dir, filename)
+
     def get_audio_storage_path(self, job_id: str, shot_id: str) -> str:
         """Get absolute path for storing audio"""
         filename = f"{job_id}_{shot_id}.mp3"
         return os.path.join(settings.static_audio_dir, filename)
-        
+
     def get_video_url(self, job_id: str, shot_id: str) -> str:
-        """Get public URL for video"""
+        """Get public URL for video (immutable blob URL when content-addressed)"""
         # TODO: Construct full URL properly based on host
+        digest = self.get_video_digest(job_id, shot_id)
+        if digest is not None:
+            return self.blob_url(digest)
         filename = f"{job_id}_{shot_id}.mp4"
         return f"{settings.static_url_prefix}/{settings.static_video_subdir}/{filename}"
-        
+
     def get_audio_url(self, job_id: str, shot_id: str) -> str:
         """Get public URL for audio"""
         filename = f"{job_id}_{shot_id}.mp3"
         return f"{settings.static_url_prefix}/{settings.static_audio_subdir}/{filename}"
-        
+
+    @staticmethod
+    def blob_key(digest: str) -> str:
+        """Sharded blob key: ab/cd/<sha256>.mp4"""
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{AssetStorage.BLOB_SUFFIX}"
+
+    def blob_path(self, digest: str) -> str:
+        """Absolute path of a blob on the static volume (local backend)"""
+        root = getattr(self.backend, "root", settings.static_blob_dir)
+        return os.path.join(root, *self.blob_key(digest).split("/"))
+
+    def blob_url(self, digest: str) -> str:
+        """Stable public URL of a blob"""
+        if isinstance(self.backend, S3BlobBackend) and settings.s3_public_base_url:
+            return self.backend.url(self.blob_key(digest))
+        # The assets route serves local blobs with Range / ETag / immutable caching,
+        # and signs a fresh URL per request for private buckets
+        return f"{self.ASSET_ROUTE}/{digest}{self.BLOB_SUFFIX}"
+
+    def blob_exists(self, digest: str) -> bool:
+        return self.backend.exists(self.blob_key(digest))
+
+    def blob_download_url(self, digest: str) -> str:
+        """URL to redirect a client to (pre-signed for private buckets)"""
+        return self.backend.url(self.blob_key(digest))
+
+    def get_video_digest(self, job_id: str, shot_id: str) -> Optional[str]:
+        """sha256 of a job's video, or None if it has no blob reference"""
+        with SessionLocal() as db:
+            ref = (
+                db.query(AssetRefModel.sha256)
+                .filter(AssetRefModel.job_id == job_id, AssetRefModel.file_id == str(shot_id))
+                .first()
+            )
+        return ref.sha256 if ref else None
+
+    def has_video(self, job_id: str, shot_id: str) -> bool:
+        """Whether the job's video is stored"""
+        digest = self.get_video_digest(job_id, shot_id)
+        if digest is not None:
+            return self.blob_exists(digest)
+        return os.path.exists(self._legacy_video_path(job_id, shot_id))
+
+    def store_video(self, job_id: str, shot_id: str, source_path: str, move: bool = True) -> str:
+        """
+        Store `source_path` as the job's video and return its final path
+
+        Content-addressed: the file is hashed and renamed (or uploaded) into
+        its blob, or dropped if an identical blob already exists, then the
+        job's reference is recorded. `source_path` must be on the static
+        volume for the rename to be atomic; with `move=False` it is
+        hardlinked (e.g. from the shot cache) and left in place.
+        """
+        if not self.content_addressed:
+            dest = self._legacy_video_path(job_id, shot_id)
+            if move:
+                os.replace(source_path, dest)
+            else:
+                if os.path.exists(dest):
+                    os.remove(dest)
+                _link_or_copy(source_path, dest)
+            return dest
+
+        digest = _sha256_file(source_path)
+        size = os.path.getsize(source_path)
+        key = self.blob_key(digest)
+        if self.backend.exists(key):
+            metrics.incr("asset_blobs_deduplicated")
+            self._touch(digest)
+            if move:
+                os.remove(source_path)
+        else:
+            self.backend.put_file(key, source_path, move=move)
+            metrics.incr("asset_blobs_created")
+        self._set_ref(job_id, shot_id, digest, size)
+        return self.blob_path(digest)
+
+    async def store_video_stream(self, job_id: str, shot_id: str, chunks: AsyncIterator[bytes]) -> str:
+        """
+        Store a downloading video's byte stream as the job's video
+
+        The stream is hashed as it is uploaded to a staging key, then moved
+        to its blob key (or discarded if the blob already exists). Returns
+        the sha256.
+        """
+        digest = hashlib.sha256()
+
+        async def hashed() -> AsyncIterator[bytes]:
+            async for chunk in chunks:
+                digest.update(chunk)
+                yield chunk
+
+        staging_key = f"staging/{uuid.uuid4().hex}{self.BLOB_SUFFIX}"
+        try:
+            size = await self.backend.put_stream(staging_key, hashed())
+            key = self.blob_key(digest.hexdigest())
+            if await asyncio.to_thread(self.backend.exists, key):
+                metrics.incr("asset_blobs_deduplicated")
+                self._touch(digest.hexdigest())
+                await asyncio.to_thread(self.backend.delete, staging_key)
+            else:
+                await asyncio.to_thread(self.backend.move, staging_key, key)
+                metrics.incr("asset_blobs_created")
+        except BaseException:
+            # Close the download stream (and its connection) too
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            try:
+                await asyncio.shield(asyncio.to_thread(self.backend.delete, staging_key))
+            except Exception as e:
+                logger.warning("asset_staging_cleanup_failed", key=staging_key, error=str(e))
+            raise
+        await asyncio.to_thread(self._set_ref, job_id, shot_id, digest.hexdigest(), size)
+        return digest.hexdigest()
+
+    def _touch(self, digest: str) -> None:
+        """Mark a blob as just used, so the GC does not delete it under a new ref"""
+        if isinstance(self.backend, LocalBlobBackend):
+            try:
+                os.utime(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _set_ref(self, job_id: str, shot_id: str, digest: str, size: int) -> None:
+        with SessionLocal() as db:
+            ref = (
+                db.query(AssetRefModel)
+                .filter(AssetRefModel.job_id == job_id, AssetRefModel.file_id == str(shot_id))
+                .first()
+            )
+            if ref is None:
+                ref = AssetRefModel(job_id=job_id, file_id=str(shot_id))
+                db.add(ref)
+            ref.sha256 = digest
+            ref.size = size
+            ref.created_at = datetime.utcnow()
+            db.commit()
+        logger.info("asset_ref_stored", job_id=job_id, file_id=str(shot_id), sha256=digest, size=size)
+
+    def _ref_size(self, job_id: str, shot_id: str) -> int:
+        with SessionLocal() as db:
+            ref = (
+                db.query(AssetRefModel.size)
+                .filter(AssetRefModel.job_id == job_id, AssetRefModel.file_id == str(shot_id))
+                .first()
+            )
+        return ref.size if ref else 0
+
+    def link_video(self, src_job_id: str, src_shot_id: str, dst_job_id: str, dst_shot_id: str) -> bool:
+        """Reuse another job's video without copying bytes (blob reference, else hardlink / copy)"""
+        digest = self.get_video_digest(src_job_id, src_shot_id)
+        if digest is not None:
+            return self.link_blob(dst_job_id, dst_shot_id, digest, self._ref_size(src_job_id, src_shot_id))
+
+        src = self._legacy_video_path(src_job_id, src_shot_id)
+        dst = self._legacy_video_path(dst_job_id, dst_shot_id)
+        if not os.path.exists(src):
+            return False
+        if os.path.exists(dst):
+            os.remove(dst)
+        _link_or_copy(src, dst)
+        return True
+
+    def link_blob(self, job_id: str, shot_id: str, digest: str, size: int) -> bool:
+        """Make an existing blob the job's video; returns False if the blob is gone"""
+        if not self.blob_exists(digest):
+            return False
+        self._touch(digest)
+        self._set_ref(job_id, shot_id, digest, size)
+        return True
+
     def write_job_metadata(self, job_id: str, metadata: Dict[str, Any]) -> None:
         """Write job metadata to JSON file"""
         filename = f"{job_id}.json"
         path = os.path.join(settings.static_metadata_dir, filename)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: str, dest: str) -> None:
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
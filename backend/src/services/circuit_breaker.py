@@ -0,0 +1,433 @@
+"""
+Circuit Breaker Service - Fail fast while an upstream dependency is degraded
+"""
+
+import asyncio
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.services.observability import logger, metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_after_s: float):
+        self.name = name
+        self.retry_after_s = retry_after_s
+        super().__init__(f"{name} is unavailable (circuit open), retry after {math.ceil(retry_after_s)}s")
+
+
+def is_dependency_failure(error: BaseException, ignore_statuses: Iterable[int] = ()) -> bool:
+    """
+    Whether an error says something about the dependency's health
+
+    Client errors (4xx) are the caller's fault and do not count; statuses in
+    `ignore_statuses` are handled elsewhere (e.g. 429 by the AIMD limiter).
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        if status_code in ignore_statuses:
+            return False
+        if 400 <= status_code < 500 and status_code not in (408, 429):
+            return False
+    return True
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a rolling window of calls
+
+    While closed, outcomes are kept for `window_s`; once at least
+    `min_calls` are recorded, the breaker opens when the failure rate or the
+    rate of calls slower than `slow_call_s` crosses its threshold. An open
+    breaker rejects calls for `open_s`, then lets `half_open_calls` probes
+    through: if they all succeed it closes, any failure re-opens it.
+
+    Rejected callers either fail fast with CircuitOpenError or, with
+    CIRCUIT_BREAKER_OPEN_MODE=wait, wait up to `wait_s` for a probe slot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_s: float,
+        is_failure: Callable[[BaseException], bool] = is_dependency_failure,
+        window_s: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+        slow_call_rate: Optional[float] = None,
+        open_s: Optional[float] = None,
+        half_open_calls: Optional[int] = None,
+        mode: Optional[str] = None,
+        wait_s: Optional[float] = None,
+        on_transition: Optional[Callable[["CircuitBreaker"], None]] = None,
+    ):
+        self.name = name
+        self.slow_call_s = slow_call_s
+        self.is_failure = is_failure
+        self.window_s = window_s or settings.circuit_breaker_window_s
+        self.min_calls = min_calls or settings.circuit_breaker_min_calls
+        self.failure_rate_threshold = failure_rate or settings.circuit_breaker_failure_rate
+        self.slow_call_rate_threshold = slow_call_rate or settings.circuit_breaker_slow_call_rate
+        self.open_s = open_s or settings.circuit_breaker_open_s
+        self.half_open_calls = half_open_calls or settings.circuit_breaker_half_open_calls
+        self.mode = mode or settings.circuit_breaker_open_mode
+        self.wait_s = settings.circuit_breaker_wait_s if wait_s is None else wait_s
+        self.on_transition = on_transition
+
+        self._state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()  # (at, failed, slow)
+        self._opened_at = 0.0
+        self._opened_wall: Optional[datetime] = None
+        self._probes = 0
+        self._probe_successes = 0
+        metrics.set_gauge("circuit_breaker_state", STATE_GAUGE[CLOSED], dependency=name)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_s:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def retry_after_s(self) -> float:
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.open_s - (time.monotonic() - self._opened_at))
+
+    def _rates(self) -> Tuple[int, float, float]:
+        cutoff = time.monotonic() - self.window_s
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        calls = len(self._outcomes)
+        if not calls:
+            return 0, 0.0, 0.0
+        failed = sum(1 for _, f, _ in self._outcomes if f)
+        slow = sum(1 for _, _, s in self._outcomes if s)
+        return calls, failed / calls, slow / calls
+
+    def _try_enter(self) -> Optional[bool]:
+        """Returns whether the call is a probe, or None if it must not proceed"""
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return True
+        return None
+
+    async def admit(self, wait: Optional[bool] = None) -> None:
+        """Fail fast (or wait, in wait mode) while calls would be rejected"""
+        if settings.circuit_breaker_enabled:
+            await self._enter(wait, take_probe=False)
+
+    async def _enter(self, wait: Optional[bool], take_probe: bool = True) -> bool:
+        wait = self.mode == "wait" if wait is None else wait
+        deadline = time.monotonic() + self.wait_s
+        while True:
+            if take_probe:
+                probe = self._try_enter()
+                if probe is not None:
+                    return probe
+            elif self.state == CLOSED or (self._state == HALF_OPEN and self._probes < self.half_open_calls):
+                return False
+
+            remaining = deadline - time.monotonic()
+            if not wait or remaining <= 0:
+                metrics.incr("circuit_breaker_rejected", dependency=self.name)
+                raise CircuitOpenError(self.name, self.retry_after_s() or self.open_s)
+            await asyncio.sleep(min(remaining, max(self.retry_after_s(), 0.5)))
+
+    @asynccontextmanager
+    async def guard(self, wait: Optional[bool] = None):
+        """Wrap one call to the dependency and record its outcome"""
+        if not settings.circuit_breaker_enabled:
+            yield
+            return
+
+        probe = await self._enter(wait)
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            raise
+        except BaseException as e:
+            self.record(time.monotonic() - started, failed=self.is_failure(e), probe=probe)
+            raise
+        else:
+            self.record(time.monotonic() - started, failed=False, probe=probe)
+
+    def record(self, latency_s: float, failed: bool, probe: bool = False) -> None:
+        """Record one call outcome"""
+        slow = latency_s > self.slow_call_s
+        metrics.observe("circuit_breaker_call_s", latency_s, dependency=self.name)
+
+        if probe:
+            self._probes = max(0, self._probes - 1)
+            if self._state != HALF_OPEN:
+                return
+            if failed or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(CLOSED)
+            return
+
+        if self._state != CLOSED:
+            return
+        self._outcomes.append((time.monotonic(), failed, slow))
+        calls, failure_rate, slow_rate = self._rates()
+        if calls >= self.min_calls and (
+            failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold
+        ):
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        previous = self._state
+        calls, failure_rate, slow_rate = self._rates()
+        self._state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self._opened_wall = datetime.utcnow()
+        elif state == CLOSED:
+            self._outcomes.clear()
+            self._opened_wall = None
+
+        metrics.set_gauge("circuit_breaker_state", STATE_GAUGE[state], dependency=self.name)
+        metrics.incr("circuit_breaker_transitions", dependency=self.name, to=state)
+        log = logger.warning if state == OPEN else logger.info
+        log(
+            "circuit_breaker_transition",
+            name=self.name,
+            previous=previous,
+            state=state,
+            calls=calls,
+            failure_rate=round(failure_rate, 3),
+            slow_call_rate=round(slow_rate, 3),
+        )
+        if self.on_transition is not None:
+            try:
+                self.on_transition(self)
+            except Exception as e:
+                logger.error("circuit_breaker_publish_failed", name=self.name, error=str(e))
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls, failure_rate, slow_rate = self._rates()
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": round(failure_rate, 3),
+            "slow_call_rate": round(slow_rate, 3),
+            "retry_after_s": round(self.retry_after_s(), 1),
+            "opened_at": self._opened_wall.isoformat() if self._opened_wall else None,
+        }
+
+
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+_publish_lock = threading.Lock()
+_publish_seq = 0
+_published_seq: Dict[str, int] = {}
+_publish_tasks: Set[asyncio.Task] = set()
+
+
+def _publish_state(breaker: CircuitBreaker) -> None:
+    """
+    Persist a transition so other processes (and /health) see it
+
+    The state is captured now and written from a worker thread, so a
+    transition never blocks the event loop on the SQLite write lock. A
+    write overtaken by a later transition of the same breaker is dropped.
+    """
+    global _publish_seq
+    snapshot = breaker.snapshot()
+    _publish_seq += 1
+    values = {
+        "state": breaker._state,
+        "failure_rate": snapshot["failure_rate"],
+        "slow_call_rate": snapshot["slow_call_rate"],
+        "calls": snapshot["calls"],
+        "opened_at": breaker._opened_wall,
+        "updated_at": datetime.utcnow(),
+    }
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write_state(breaker.name, _publish_seq, values)
+        return
+    task = loop.create_task(asyncio.to_thread(_write_state, breaker.name, _publish_seq, values))
+    _publish_tasks.add(task)
+    task.add_done_callback(lambda t, name=breaker.name: _publish_done(t, name))
+
+
+def _publish_done(task: asyncio.Task, name: str) -> None:
+    _publish_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("circuit_breaker_publish_failed", name=name, error=str(task.exception()))
+
+
+def _write_state(name: str, seq: int, values: Dict[str, Any]) -> None:
+    from src.models import SessionLocal
+    from src.models.circuit_breaker import CircuitBreakerStateModel
+
+    with _publish_lock:
+        if _published_seq.get(name, 0) > seq:
+            return
+        with SessionLocal() as db:
+            row = (
+                db.query(CircuitBreakerStateModel)
+                .filter_by(name=name, process_id=PROCESS_ID)
+                .first()
+            )
+            if row is None:
+                row = CircuitBreakerStateModel(name=name, process_id=PROCESS_ID)
+                db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+            db.commit()
+        _published_seq[name] = seq
+
+
+def _dashscope_failure(error: BaseException) -> bool:
+    # Throttling is congestion, handled by the adaptive concurrency limit
+    return is_dependency_failure(error, ignore_statuses=(429,))
+
+
+BREAKER_PROFILES: Dict[str, Dict[str, Any]] = {
+    "dashscope": {"slow_call_s": lambda: settings.dashscope_slow_call_s, "is_failure": _dashscope_failure},
+    "llm": {"slow_call_s": lambda: settings.llm_slow_call_s, "is_failure": is_dependency_failure},
+}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a dependency in BREAKER_PROFILES"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        profile = BREAKER_PROFILES[name]
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            slow_call_s=profile["slow_call_s"](),
+            is_failure=profile["is_failure"],
+            on_transition=_publish_state,
+        )
+    return breaker
+
+
+_published_rows: Tuple[float, List[Dict[str, Any]]] = (float("-inf"), [])
+
+
+def _published_rows_fresh() -> bool:
+    return time.monotonic() - _published_rows[0] < settings.circuit_breaker_state_ttl_s
+
+
+def _read_published_rows() -> List[Dict[str, Any]]:
+    """Breaker rows published by all processes, re-read at most once per TTL"""
+    global _published_rows
+    if _published_rows_fresh():
+        return _published_rows[1]
+
+    from src.models import SessionLocal
+    from src.models.circuit_breaker import CircuitBreakerStateModel
+
+    try:
+        with SessionLocal() as db:
+            rows = [
+                {
+                    "name": row.name,
+                    "process_id": row.process_id,
+                    "state": row.state,
+                    "calls": row.calls,
+                    "failure_rate": row.failure_rate,
+                    "slow_call_rate": row.slow_call_rate,
+                    "opened_at": row.opened_at,
+                    "updated_at": row.updated_at,
+                }
+                for row in db.query(CircuitBreakerStateModel).all()
+            ]
+    except Exception as e:
+        logger.error("circuit_breaker_state_read_failed", error=str(e))
+        rows = []
+    _published_rows = (time.monotonic(), rows)
+    return rows
+
+
+async def adependency_states() -> Dict[str, Dict[str, Any]]:
+    """dependency_states() without blocking the event loop on the DB"""
+    if not _published_rows_fresh():
+        await asyncio.to_thread(_read_published_rows)
+    return dependency_states()
+
+
+def dependency_states() -> Dict[str, Dict[str, Any]]:
+    """
+    Breaker state per dependency across all API and worker processes
+
+    A dependency is reported open while any process holds its breaker open
+    (and the open period has not lapsed), half_open while any is probing.
+    Other processes' states come from a snapshot at most
+    CIRCUIT_BREAKER_STATE_TTL_S old; this process's breakers are live.
+    """
+    states: Dict[str, Dict[str, Any]] = {
+        name: {"state": CLOSED, "retry_after_s": 0.0, "processes": {}} for name in BREAKER_PROFILES
+    }
+    now = datetime.utcnow()
+    open_window = timedelta(seconds=settings.circuit_breaker_open_s)
+
+    reported: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for row in _read_published_rows():
+        state = row["state"]
+        opened_at = row["opened_at"]
+        # A process that died while open stops counting once its open period lapses
+        if state == OPEN and opened_at is not None and now - opened_at >= open_window:
+            state = HALF_OPEN
+        stale = row["updated_at"] is not None and now - row["updated_at"] >= open_window * 4
+        if stale and state != OPEN:
+            # Nothing heard from this process for a while; it carries no signal
+            continue
+        retry_after_s = 0.0
+        if state == OPEN and opened_at is not None:
+            retry_after_s = (open_window - (now - opened_at)).total_seconds()
+        reported[(row["name"], row["process_id"])] = {
+            "state": state,
+            "calls": row["calls"],
+            "failure_rate": row["failure_rate"],
+            "slow_call_rate": row["slow_call_rate"],
+            "retry_after_s": round(retry_after_s, 1),
+            "opened_at": opened_at.isoformat() if opened_at else None,
+        }
+    for name, breaker in _breakers.items():
+        reported[(name, PROCESS_ID)] = breaker.snapshot()
+
+    for (name, process_id), snapshot in reported.items():
+        entry = states.setdefault(name, {"state": CLOSED, "retry_after_s": 0.0, "processes": {}})
+        entry["processes"][process_id] = snapshot
+        if STATE_GAUGE[snapshot["state"]] > STATE_GAUGE[entry["state"]]:
+            entry["state"] = snapshot["state"]
+        entry["retry_after_s"] = max(entry["retry_after_s"], snapshot["retry_after_s"])
+    return states
@@ -0,0 +1,186 @@
+"""
+Concurrency Controller - Adaptive in-flight limit for upstream DashScope tasks
+"""
+
+import asyncio
+import time
+from typing import Optional, Set
+
+from src.config.settings import settings
+from src.services.fair_scheduler import FairShareQueue
+from src.services.observability import logger, metrics
+
+
+def submitting_processes() -> int:
+    """Processes submitting to DashScope with the same account"""
+    processes = max(1, settings.worker_hosts) * max(1, settings.worker_processes)
+    if settings.inline_worker:
+        processes += 1
+    return processes
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD limit on how many DashScope tasks a process keeps in flight
+
+    A slot is held from submission until the task reaches a terminal state.
+    Callers beyond the limit wait in a FairShareQueue (higher priority
+    first, then weighted fair share across clients) instead of failing. The limit grows additively while it is fully
+    used and submissions are healthy, and shrinks multiplicatively on
+    throttling or when submit latency exceeds its target, at most once per
+    cooldown so one burst of errors counts as one congestion signal.
+
+    Every process that submits (WORKER_HOSTS x WORKER_PROCESSES workers,
+    plus the API process with INLINE_WORKER) gets an equal share of the
+    configured ceiling, so the fleet as a whole stays within the account's
+    capacity.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[float] = None,
+        min_limit: Optional[float] = None,
+        max_limit: Optional[float] = None,
+        increase: Optional[float] = None,
+        decrease_factor: Optional[float] = None,
+        latency_target_s: Optional[float] = None,
+        cooldown_s: Optional[float] = None,
+    ):
+        workers = submitting_processes()
+        self.min_limit = min_limit or settings.dashscope_concurrency_min
+        self.max_limit = max(self.min_limit, (max_limit or settings.dashscope_concurrency_max) / workers)
+        self.increase = increase or settings.dashscope_concurrency_increase
+        self.decrease_factor = decrease_factor or settings.dashscope_concurrency_decrease_factor
+        self.latency_target_s = latency_target_s or settings.dashscope_latency_target_s
+        self.cooldown_s = settings.dashscope_concurrency_cooldown_s if cooldown_s is None else cooldown_s
+
+        self._limit = float(min(max(initial or settings.dashscope_concurrency_initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._task_ids: Set[str] = set()
+        self._waiters = FairShareQueue()
+        self._last_decrease = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    @property
+    def waiters(self) -> FairShareQueue:
+        return self._waiters
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiters.depth
+
+    def _publish(self) -> None:
+        metrics.set_gauge("dashscope_concurrency_limit", self._limit)
+        metrics.set_gauge("dashscope_in_flight", self._in_flight)
+        metrics.set_gauge("dashscope_queue_depth", self.queue_depth)
+
+    async def acquire(
+        self,
+        priority: int = 0,
+        client: str = "",
+        quality_mode: Optional[str] = None,
+        cost: float = 1.0,
+    ) -> None:
+        """Wait for an in-flight slot, queued fairly against other clients"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.push(future, client=client, quality_mode=quality_mode, cost=cost, priority=priority)
+        self._wake()
+        self._publish()
+        if future.done():
+            return
+
+        started = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self.release()
+            self._publish()
+            raise
+        metrics.observe("dashscope_queue_wait_s", time.monotonic() - started)
+
+    def bind(self, task_id: str) -> None:
+        """Attach an acquired slot to the upstream task it was used for"""
+        self._task_ids.add(task_id)
+
+    def adopt(self, task_id: str) -> None:
+        """Take a slot for a task submitted by an earlier process (no waiting)"""
+        if task_id in self._task_ids:
+            return
+        self._in_flight += 1
+        self._task_ids.add(task_id)
+        self._publish()
+
+    def release_task(self, task_id: str) -> None:
+        """Release the slot held by `task_id` (idempotent)"""
+        if task_id in self._task_ids:
+            self._task_ids.discard(task_id)
+            self.release()
+
+    def release(self) -> None:
+        """Return a slot and wake waiters that now fit under the limit"""
+        self._in_flight = max(0, self._in_flight - 1)
+        self._wake()
+        self._publish()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.pop()
+            if future is None:
+                break
+            self._in_flight += 1
+            future.set_result(None)
+
+    def on_success(self, latency_s: float) -> None:
+        """Record a healthy submission; slow ones count as congestion"""
+        metrics.observe("dashscope_submit_latency_s", latency_s)
+        if latency_s > self.latency_target_s:
+            self._decrease("latency")
+            return
+        # Only grow while the current limit is actually in use
+        if self._in_flight >= self.limit - 1:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._wake()
+            self._publish()
+
+    def on_throttled(self) -> None:
+        """Record a throttling response from upstream"""
+        metrics.incr("dashscope_throttled")
+        self._decrease("throttled")
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_s:
+            return
+        self._last_decrease = now
+        previous = self._limit
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        metrics.incr("dashscope_concurrency_decreases", reason=reason)
+        logger.warning(
+            "dashscope_concurrency_decreased",
+            reason=reason,
+            previous=round(previous, 2),
+            limit=round(self._limit, 2),
+            in_flight=self._in_flight,
+        )
+        self._publish()
+
+
+_controller: Optional[AdaptiveConcurrencyController] = None
+
+
+def get_concurrency_controller() -> AdaptiveConcurrencyController:
+    """Process-wide controller shared by every adapter"""
+    global _controller
+    if _controller is None:
+        _controller = AdaptiveConcurrencyController()
+    return _controller
@@ -0,0 +1,88 @@
+"""
+Service Container - Long-lived services shared across requests
+"""
+
+from typing import Any, Dict, Optional
+
+from src.models import SessionLocal
+from src.core.llm_orchestrator import LLMOrchestrator, FeedbackParser
+from src.core.template_router import TemplateRouter
+from src.core.validator import Validator
+from src.core.wan26_adapter import Wan26Adapter
+from src.services.asset_storage import AssetStorage
+from src.services.concurrency_controller import get_concurrency_controller
+from src.services.job_manager import JobManager
+from src.services.job_queue import JobQueue, get_job_queue
+from src.services.job_state import add_terminal_listener
+from src.services.observability import logger, metrics
+from src.services.rate_limiter import RateLimiter
+from src.services.result_cache import ResultCache
+from src.services.task_poller import get_task_poller
+from src.services.wan26_downloader import Wan26Downloader
+
+
+class ServiceContainer:
+    """
+    Build services once per process
+
+    The API creates one container in its lifespan and injects its members
+    through FastAPI dependencies; workers create their own. Keeping these
+    alive is what lets the template index, rate-limit state and HTTP
+    connection pools survive between requests.
+    """
+
+    def __init__(self, job_queue: Optional[JobQueue] = None):
+        self.job_queue = job_queue or get_job_queue()
+        self.rate_limiter = RateLimiter()
+        # Release a client's concurrent job slot wherever its job finishes
+        add_terminal_listener(self.rate_limiter.on_job_terminal)
+        self.template_router = TemplateRouter()
+        self.storage = AssetStorage()
+        self.wan26_adapter = Wan26Adapter()
+        self.downloader = Wan26Downloader()
+        self.llm_orchestrator = LLMOrchestrator()
+        self.feedback_parser = FeedbackParser()
+        self.validator = Validator()
+        self.result_cache = ResultCache()
+
+        self.job_manager = JobManager(
+            job_queue=self.job_queue,
+            llm_orchestrator=self.llm_orchestrator,
+            template_router=self.template_router,
+            wan26_adapter=self.wan26_adapter,
+            rate_limiter=self.rate_limiter,
+            downloader=self.downloader,
+            storage=self.storage,
+            result_cache=self.result_cache,
+        )
+
+    def warm(self) -> None:
+        """Pay one-off initialization costs before the first request"""
+        with SessionLocal() as db:
+            try:
+                self.template_router.warm(db)
+            except Exception as e:
+                logger.warning("template_router_warm_failed", error=str(e))
+
+        # Create the chat model clients now rather than on the first job
+        try:
+            self.llm_orchestrator._ensure_llm()
+            self.feedback_parser._ensure_llm()
+        except Exception as e:
+            logger.warning("llm_warm_failed", error=str(e))
+        get_task_poller(self.wan26_adapter.fetch_task_status)
+
+        logger.info("services_warmed")
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """This process's metrics, fair-share queue and download pool"""
+        snapshot = metrics.snapshot()
+        snapshot["fair_share"] = get_concurrency_controller().waiters.snapshot()
+        snapshot["download_pool"] = self.downloader.pool_stats()
+        return snapshot
+
+    async def close(self) -> None:
+        """Release pooled connections and background loops"""
+        await get_task_poller(self.wan26_adapter.fetch_task_status).close()
+        await self.wan26_adapter.close()
+        await self.downloader.close()
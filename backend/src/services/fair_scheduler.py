@@ -0,0 +1,155 @@
+"""
+Fair Scheduler - Weighted fair queuing of shot submissions across clients
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.services.observability import metrics
+
+
+def client_tier(client: str) -> str:
+    """Tier of a client key (client IP today, API key later)"""
+    return settings.fair_share_client_tiers.get(client, settings.fair_share_default_tier)
+
+
+def share_weight(client: str, quality_mode: Optional[str] = None) -> float:
+    """Fair-share weight: tier weight times quality mode weight"""
+    tier_weight = settings.fair_share_tier_weights.get(client_tier(client), 1.0)
+    quality_weight = settings.fair_share_quality_weights.get(quality_mode or "", 1.0)
+    return max(0.01, tier_weight * quality_weight)
+
+
+class _ClientStats:
+    """Queue wait statistics for one client"""
+
+    WINDOW = 200
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.queued = 0
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.recent: Deque[float] = deque(maxlen=self.WINDOW)
+        self.last_seen = time.monotonic()
+
+    def record(self, wait_s: float) -> None:
+        self.count += 1
+        self.total_s += wait_s
+        self.max_s = max(self.max_s, wait_s)
+        self.recent.append(wait_s)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "tier": self.tier,
+            "queued": self.queued,
+            "dispatched": self.count,
+            "mean_wait_s": round(self.total_s / self.count, 3) if self.count else 0.0,
+            "p95_wait_s": round(p95, 3),
+            "max_wait_s": round(self.max_s, 3),
+        }
+
+
+class FairShareQueue:
+    """
+    Waiters for upstream submission slots, ordered by weighted fair queuing
+
+    Uses start-time fair queuing: each submission gets a start tag
+    `max(virtual_time, client's last finish tag)` and advances the client's
+    finish tag by `cost / weight`, where cost is the seconds of video
+    requested. Waiters are served by (priority, start tag), so a client with
+    a deep backlog only advances its own tags, and a light client's first
+    shot starts at the current virtual time, ahead of the heavy backlog.
+    Priority (finalize before preview) still dominates fairness.
+    """
+
+    def __init__(self, idle_ttl_s: Optional[float] = None, max_clients: int = 10000):
+        self.idle_ttl_s = settings.fair_share_idle_ttl_s if idle_ttl_s is None else idle_ttl_s
+        self.max_clients = max_clients
+        self._heap: List[Tuple[int, float, int, asyncio.Future, str, float]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._finish: Dict[str, float] = {}
+        self._clients: "OrderedDict[str, _ClientStats]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for entry in self._heap if not entry[3].done())
+
+    def push(
+        self,
+        future: asyncio.Future,
+        client: str = "",
+        quality_mode: Optional[str] = None,
+        cost: float = 1.0,
+        priority: int = 0,
+    ) -> None:
+        """Queue a waiter; `future` is resolved by the caller after pop()"""
+        if not settings.fair_share_enabled:
+            client = ""
+        start = max(self._virtual_time, self._finish.get(client, 0.0))
+        self._finish[client] = start + max(cost, 0.0) / share_weight(client, quality_mode)
+        heapq.heappush(self._heap, (-priority, start, next(self._seq), future, client, time.monotonic()))
+        stats = self._stats(client)
+        stats.queued += 1
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """Next live waiter in fair order, or None"""
+        while self._heap:
+            _, start, _, future, client, enqueued = heapq.heappop(self._heap)
+            stats = self._stats(client)
+            stats.queued = max(0, stats.queued - 1)
+            if future.done():
+                continue
+            self._virtual_time = max(self._virtual_time, start)
+            wait_s = time.monotonic() - enqueued
+            stats.record(wait_s)
+            metrics.observe("shot_queue_wait_s", wait_s, tier=stats.tier)
+            self._prune()
+            return future
+        return None
+
+    def _stats(self, client: str) -> _ClientStats:
+        stats = self._clients.get(client)
+        if stats is None:
+            stats = self._clients[client] = _ClientStats(client_tier(client))
+        stats.last_seen = time.monotonic()
+        self._clients.move_to_end(client)
+        return stats
+
+    def _prune(self) -> None:
+        """Forget finish tags that no longer matter and clients gone idle"""
+        stale = [c for c, f in self._finish.items() if f <= self._virtual_time and not self._has_queued(c)]
+        for client in stale:
+            del self._finish[client]
+
+        now = time.monotonic()
+        while self._clients:
+            client, stats = next(iter(self._clients.items()))
+            active = stats.queued or now - stats.last_seen <= self.idle_ttl_s
+            if active and len(self._clients) <= self.max_clients:
+                break
+            self._clients.popitem(last=False)
+        metrics.set_gauge("fair_share_clients", len(self._clients))
+
+    def _has_queued(self, client: str) -> bool:
+        stats = self._clients.get(client)
+        return bool(stats and stats.queued)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-client queue depth and wait times"""
+        return {
+            "virtual_time": round(self._virtual_time, 3),
+            "clients": {client or "-": stats.summary() for client, stats in self._clients.items()},
+        }
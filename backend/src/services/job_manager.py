@@ -3,24 +3,40 @@ Job Manager - Core orchestration logic
 """
 
 import asyncio
-from typing import Optional, Dict, Any, List
+import copy
+import os
+import time
+from typing import Optional, Dict, Any, List, Set
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from src.models import SessionLocal
 from src.models.job import JobModel
 from src.services.storage import JobDB
-from src.services.job_state import transition_state
-from src.services.observability import logger
+from src.services.job_state import transition_state, is_terminal_state
+from src.services.observability import logger, metrics
 from src.services.rate_limiter import RateLimiter
+from src.services.circuit_breaker import CircuitOpenError, adependency_states
 from src.core.input_processor import InputProcessor
-from src.core.llm_orchestrator import LLMOrchestrator
+from src.core.llm_orchestrator import LLMOrchestrator, IR, ShotPlan
 from src.core.template_router import TemplateRouter
 from src.core.prompt_compiler import PromptCompiler
 from src.core.wan26_adapter import Wan26Adapter, ShotGenerationRequest
 from src.core.validator import Validator
+from src.core.revision_planner import RevisionPlanner
 from src.services.wan26_downloader import Wan26Downloader
 from src.services.asset_storage import AssetStorage
+from src.services.job_queue import JobHandedOff, JobQueue, QueuedJob, get_job_queue
+from src.services.result_cache import ResultCache
+from src.services.shot_cache import ShotCache
 from src.config.settings import settings
+from src.config.constants import (
+    PREVIEW_SEED_STRIDE,
+    QUALITY_MODES,
+    QUEUE_PRIORITY_FINALIZE,
+    QUEUE_PRIORITY_PREVIEW,
+    QUEUE_PRIORITY_REVISION,
+)
 from src.services.mock_data import MockDataService
 
 
@@ -29,16 +45,42 @@ class JobManager:
     Orchestrates the entire text-to-video generation workflow
     """
 
-    def __init__(self):
+    STAGE_PRIORITIES = {
+        "preview": QUEUE_PRIORITY_PREVIEW,
+        "revision": QUEUE_PRIORITY_REVISION,
+        "finalize": QUEUE_PRIORITY_FINALIZE,
+    }
+
+    def __init__(
+        self,
+        job_queue: Optional[JobQueue] = None,
+        llm_orchestrator: Optional[LLMOrchestrator] = None,
+        template_router: Optional[TemplateRouter] = None,
+        wan26_adapter: Optional[Wan26Adapter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        downloader: Optional[Wan26Downloader] = None,
+        storage: Optional[AssetStorage] = None,
+        result_cache: Optional[ResultCache] = None,
+        shot_cache: Optional[ShotCache] = None,
+    ):
+        # Long-lived components are normally injected by ServiceContainer
+        self.job_queue = job_queue or get_job_queue()
         self.input_processor = InputProcessor()
-        self.llm_orchestrator = LLMOrchestrator()
-        self.template_router = TemplateRouter()
+        self.llm_orchestrator = llm_orchestrator or LLMOrchestrator()
+        self.template_router = template_router or TemplateRouter()
         self.prompt_compiler = PromptCompiler()
-        self.wan26_adapter = Wan26Adapter()
+        self.wan26_adapter = wan26_adapter or Wan26Adapter()
         self.validator = Validator()
-        self.rate_limiter = RateLimiter()
-        self.downloader = Wan26Downloader()
-        self.storage = AssetStorage()
+        self.revision_planner = RevisionPlanner()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.downloader = downloader or Wan26Downloader()
+        self.storage = storage or AssetStorage()
+        self.result_cache = result_cache or ResultCache()
+        self.shot_cache = shot_cache or ShotCache()
+        # job_id -> background task running in this process
+        self._running: Dict[str, asyncio.Task] = {}
+        # Jobs stopped for another worker to resume; their upstream tasks are kept
+        self._handed_off: Set[str] = set()
 
     async def execute_generation_workflow(
         self,
@@ -52,9 +94,9 @@ class JobManager:
         Execute full generation workflow
         """
         # 1. Rate Limiting
-        limit_check = self.rate_limiter.check_rate_limit(client_ip)
-        if not limit_check["allowed"]:
-            raise ValueError(f"Rate limit exceeded. Try again after {limit_check['reset_at']}")
+        self._check_client_limits(client_ip)
+        if not settings.mock_mode:
+            await self._check_dependencies("llm", "dashscope")
 
         # 2. Input Processing
         processed_input = self.input_processor.process_input(user_input)
@@ -67,6 +109,7 @@ class JobManager:
             pii_flags=processed_input["pii_flags"],
             quality_mode=quality_mode,
             resolution=resolution,
+            client_ip=client_ip,
             state="PENDING"
         )
         
@@ -96,13 +139,209 @@ class JobManager:
             
             return job
 
-        # START BACKGROUND PROCESSING
-        # In a real app, this would be offloaded to Celery/Redis Queue
-        # Here we use asyncio.create_task for simplicity
-        asyncio.create_task(self._process_job_background(db, job.job_id, processed_input, quality_mode))
+        # RESULT CACHE CHECK
+        cached = self.result_cache.lookup(db, job.user_input_hash, quality_mode, resolution)
+        if cached is not None:
+            return await self._clone_cached_result(db, job, cached)
+
+        # HAND OFF TO WORKERS
+        # The queue entry survives API restarts; a `prism-worker` process
+        # claims it and runs `_process_job_background`.
+        self.rate_limiter.increment_concurrent_jobs(client_ip, job.job_id)
+        self.job_queue.enqueue(
+            job.job_id,
+            "generate",
+            payload={"quality_mode": quality_mode},
+            priority=QUEUE_PRIORITY_PREVIEW,
+        )
         
         return job
 
+    def _check_client_limits(self, client_ip: Optional[str]) -> None:
+        """Raise ValueError when the client is over its request rate or job limit"""
+        if not client_ip:
+            return
+        limit_check = self.rate_limiter.check_rate_limit(client_ip)
+        if not limit_check["allowed"]:
+            raise ValueError(f"Rate limit exceeded. Try again after {limit_check['reset_at']}")
+        self._check_concurrent_jobs(client_ip)
+
+    def _check_concurrent_jobs(self, client_ip: Optional[str]) -> None:
+        """Raise ValueError when the client already runs its maximum number of jobs"""
+        if not client_ip:
+            return
+        concurrency_check = self.rate_limiter.check_concurrent_jobs(client_ip)
+        if not concurrency_check["allowed"]:
+            raise ValueError(
+                f"Too many concurrent jobs ({concurrency_check['current']}/{concurrency_check['max']}). "
+                "Wait for a running job to finish or cancel one."
+            )
+
+    async def _check_dependencies(self, *names: str) -> None:
+        """Raise CircuitOpenError when a needed dependency's breaker is open (fail-fast mode)"""
+        if not settings.circuit_breaker_enabled or settings.circuit_breaker_open_mode != "fail_fast":
+            return
+        states = await adependency_states()
+        for name in names:
+            state = states.get(name)
+            if state and state["state"] == "open":
+                metrics.incr("jobs_rejected_dependency_open", dependency=name)
+                raise CircuitOpenError(name, state["retry_after_s"])
+
+    async def _clone_cached_result(self, db: Session, job: JobModel, source: JobModel) -> JobModel:
+        """
+        Copy IR, shot plan and assets from a previous identical job
+
+        Every video is linked to the new job (a blob reference, or a hardlink
+        of a legacy file) and its URLs point at the new job's copy, so the
+        clone keeps its videos when the source job is garbage collected.
+        """
+        urls = {}
+        for shot_request in source.shot_requests or []:
+            file_id = shot_request.get("file_id") or str(shot_request["shot_id"])
+            linked = await asyncio.to_thread(self.storage.link_video, source.job_id, file_id, job.job_id, file_id)
+            if linked:
+                urls[self.storage.get_video_url(source.job_id, file_id)] = self.storage.get_video_url(job.job_id, file_id)
+
+        def _relink(entry: Dict[str, Any]) -> Dict[str, Any]:
+            for key in ("video_url", "preview_video_url"):
+                if entry.get(key) in urls:
+                    entry[key] = urls[entry[key]]
+            return entry
+
+        assets = copy.deepcopy(source.assets)
+        for asset in assets or []:
+            _relink(asset)
+            for variant in asset.get("variants", []):
+                _relink(variant)
+
+        job.ir = copy.deepcopy(source.ir)
+        job.template_id = source.template_id
+        job.template_version = source.template_version
+        job.shot_plan = copy.deepcopy(source.shot_plan)
+        job.shot_requests = copy.deepcopy(source.shot_requests)
+        job.assets = assets
+        job.total_duration_s = source.total_duration_s
+        job.cache_source_job_id = source.job_id
+        db.commit()
+
+        transition_state(db, job.job_id, "SUCCEEDED", f"result_cache_hit:{source.job_id}")
+        logger.info("result_cache_hit", job_id=job.job_id, source_job_id=source.job_id)
+        return job
+
+    async def run_queued_job(self, db: Session, entry: QueuedJob) -> None:
+        """
+        Execute a queue entry claimed by a worker
+
+        The work runs as its own task so it can be cancelled when the job is
+        cancelled, either directly (same process) or by the watcher noticing
+        the CANCELLED state written by another process.
+        """
+        job = JobDB.get_job(db, entry.job_id)
+        if not job:
+            logger.warning("queued_job_missing", job_id=entry.job_id, entry_id=entry.entry_id)
+            return
+        if is_terminal_state(job.state):
+            # Cancelled, timed out, or already finished by an earlier run
+            logger.info("queued_job_finished", job_id=entry.job_id, entry_id=entry.entry_id, state=job.state)
+            return
+
+        if entry.kind == "generate":
+            processed_input = {"redacted_text": job.user_input_redacted}
+            quality_mode = entry.payload.get("quality_mode", job.quality_mode)
+            work = self._process_job_background(db, job.job_id, processed_input, quality_mode)
+        elif entry.kind == "revise":
+            work = self._process_revision_background(
+                db, job.job_id, entry.payload.get("suggested_modifications", {})
+            )
+        elif entry.kind == "finalize":
+            work = self._process_finalization_background(
+                db, job.job_id, entry.payload.get("target_resolution", "1920x1080")
+            )
+        else:
+            raise ValueError(f"Unknown queue entry kind: {entry.kind}")
+
+        task = asyncio.create_task(work)
+        self._running[job.job_id] = task
+        watcher = asyncio.create_task(self._watch_cancellation(job.job_id, task))
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            # The worker itself is being cancelled
+            task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+            self._running.pop(job.job_id, None)
+
+        if task.cancelled():
+            if job.job_id in self._handed_off:
+                self._handed_off.discard(job.job_id)
+                raise JobHandedOff(job.job_id)
+            logger.info("job_run_cancelled", job_id=job.job_id, kind=entry.kind)
+            return
+        task.result()
+
+    def hand_off(self, job_id: str) -> bool:
+        """
+        Stop running a job locally so another worker can resume it
+
+        Used when a worker shuts down: upstream tasks are left rendering and
+        their ids are already persisted, so the next run re-attaches to them.
+        """
+        task = self._running.get(job_id)
+        if task is None or task.done():
+            return False
+        self._handed_off.add(job_id)
+        task.cancel()
+        logger.info("job_handed_off", job_id=job_id)
+        return True
+
+    async def _watch_cancellation(self, job_id: str, task: asyncio.Task) -> None:
+        """
+        Cancel `task` once the job is marked CANCELLED, or FAILED by the
+        watchdog (possibly in another process)
+        """
+        while not task.done():
+            await asyncio.sleep(settings.job_cancel_poll_interval_s)
+            with SessionLocal() as session:
+                state = JobDB.get_job_state(session, job_id)
+            if state in ("CANCELLED", "FAILED"):
+                task.cancel()
+                return
+
+    def cancel_job(self, db: Session, job_id: str) -> JobModel:
+        """
+        Cancel a job and everything it still has in flight
+
+        Queue entries are cancelled so no worker picks the job up again.
+        Running work notices the CANCELLED state, cancels its polls and
+        downloads, and best-effort cancels its upstream tasks. The client's
+        concurrency slot is released here.
+        """
+        job = JobDB.get_job(db, job_id)
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+        if job.state == "CANCELLED":
+            return job
+        if is_terminal_state(job.state):
+            raise ValueError(f"Job already finished: {job.state}")
+
+        transition_state(db, job_id, "CANCELLED", "cancelled_by_user")
+        cancelled_entries = self.job_queue.cancel(job_id)
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+        # Also released by the terminal-state listener; releasing is idempotent
+        if job.client_ip:
+            self.rate_limiter.decrement_concurrent_jobs(job.client_ip, job_id)
+
+        metrics.incr("jobs_cancelled")
+        logger.info("job_cancelled", job_id=job_id, queue_entries=cancelled_entries, local=task is not None)
+        return job
+
     async def _process_job_background(
         self,
         db: Session,
@@ -112,110 +351,543 @@ class JobManager:
     ):
         """
         Background processing task
+
+        Resumable: when a previous run (e.g. on a worker that was restarted)
+        already persisted the IR and shot plan, the LLM stages are skipped,
+        and `_render_shots` re-attaches to upstream tasks it had submitted.
         """
         try:
-            transition_state(db, job_id, "RUNNING", "processing_started")
+            self._enter_stage(db, job_id, "preview", "processing_started")
+
+            job = JobDB.get_job(db, job_id)
+            if job.ir and job.shot_plan and job.template_id:
+                ir = IR(**job.ir)
+                shot_plan = ShotPlan(**job.shot_plan)
+                logger.info("job_resumed", job_id=job_id, stage="render")
+            else:
+                # 1. LLM IR Parsing
+                ir = await self.llm_orchestrator.aparse_ir(processed_input["redacted_text"], quality_mode)
+
+                # 2. Template Routing
+                template_match = self.template_router.match_template(ir.dict(), db)
+
+                if not template_match:
+                    # Fallback to generic template or error
+                    # For now, raise error
+                    raise ValueError("No suitable template found")
+
+                # 3. Template Instantiation
+                shot_plan = await self.llm_orchestrator.ainstantiate_template(ir, template_match.template)
+
+                # Update Job with intermediate results
+                job.ir = ir.dict()
+                job.template_id = template_match.template_id
+                job.template_version = template_match.version
+                job.shot_plan = shot_plan.dict()
+                db.commit()
             
-            # 1. LLM IR Parsing
-            ir = self.llm_orchestrator.parse_ir(processed_input["redacted_text"], quality_mode)
+            # 4. Video Generation (Parallel, one request per shot and seed)
+            shot_requests = self._build_shot_requests(
+                shot_plan.dict(), ir.dict(), self._preview_seed_count(quality_mode)
+            )
             
-            # 2. Template Routing
-            # Note: We need a fresh db session for background task if not passed correctly, 
-            # but here we assume db is thread-safe or scoped correctly for this simple example.
-            # In production, create a new session here.
-            template_match = self.template_router.match_template(ir.dict(), db)
+            # 5. Poll -> Download -> Store, pipelined per shot
+            await self._render_shots(db, job, shot_requests)
             
-            if not template_match:
-                # Fallback to generic template or error
-                # For now, raise error
-                raise ValueError("No suitable template found")
-                
-            # 3. Template Instantiation
-            shot_plan = self.llm_orchestrator.instantiate_template(ir, template_match.template)
+            self._complete_preview(db, job_id, "processing_complete")
             
-            # Update Job with intermediate results
-            job = JobDB.get_job(db, job_id)
-            job.ir = ir.dict()
-            job.template_id = template_match.template_id
-            job.template_version = template_match.version
-            job.shot_plan = shot_plan.dict()
+        except Exception as e:
+            logger.error("job_processing_failed", job_id=job_id, error=str(e))
+            JobDB.update_job_error(db, job_id, {"message": str(e)})
+            transition_state(db, job_id, "FAILED", str(e))
+
+    def _enter_stage(self, db: Session, job_id: str, stage: str, reason: str) -> None:
+        """Move a job to RUNNING for the given background pass"""
+        job = JobDB.get_job(db, job_id)
+        if job:
+            job.stage = stage
             db.commit()
+        transition_state(db, job_id, "RUNNING", reason)
+
+    def _complete_preview(self, db: Session, job_id: str, reason: str) -> None:
+        """
+        Finish a preview or revision pass
+
+        A finalize requested while the preview was still rendering is queued
+        now instead of marking the job SUCCEEDED in between.
+        """
+        job = JobDB.get_job(db, job_id)
+        db.refresh(job)
+        if job.finalize_request:
+            target_resolution = job.finalize_request.get("target_resolution", "1920x1080")
+            job.finalize_request = None
+            db.commit()
+            self._queue_finalization(db, job, target_resolution)
+            return
+        transition_state(db, job_id, "SUCCEEDED", reason)
+
+    @staticmethod
+    def _preview_seed_count(quality_mode: Optional[str]) -> int:
+        return QUALITY_MODES.get(quality_mode or "", {}).get("preview_seeds", 1)
+
+    def _build_shot_requests(
+        self,
+        shot_plan: Dict[str, Any],
+        ir: Dict[str, Any],
+        seed_count: int = 1,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compile every shot of a plan into persisted shot request entries
+
+        Each shot gets `seed_count` entries that differ only by seed, so the
+        preview offers real choices for finalize's `selected_seeds`. Variant
+        seeds are derived deterministically from the shot seed, which keeps
+        them stable across revisions and shot cache lookups.
+        """
+        shot_requests = []
+        
+        for shot in shot_plan.get("shots", []):
+            compiled = self.prompt_compiler.compile_shot_prompt(
+                shot, shot_plan, ir
+            )
+            base_seed = shot.get("seed", 12345)
             
-            # 4. Video Generation (Parallel)
-            tasks = []
-            shot_requests = []
-            
-            for shot in shot_plan.shots:
-                compiled = self.prompt_compiler.compile_shot_prompt(
-                    shot, shot_plan.dict(), ir.dict()
-                )
-                
+            for variant in range(seed_count):
                 request = ShotGenerationRequest(
                     prompt=compiled.compiled_prompt,
                     negative_prompt=compiled.compiled_negative_prompt,
                     duration=shot.get("duration_s", 5),
                     size="1280*720", # TODO: Use job config
-                    seed=shot.get("seed", 12345)
+                    seed=base_seed + variant * PREVIEW_SEED_STRIDE
                 )
                 
-                shot_requests.append({
+                shot_request = {
                     "shot_id": shot["shot_id"],
+                    "variant": variant,
+                    "variant_count": seed_count,
                     "request": request.dict(),
+                    "cache_key": ShotCache.key_for(request),
                     "task_id": None
-                })
-                
-                tasks.append(self.wan26_adapter.submit_shot_request(request))
-                
-            # Submit all requests
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Update shot requests with task IDs
-            active_tasks = []
-            for i, response in enumerate(responses):
+                }
+                if variant:
+                    shot_request["file_id"] = f'{shot["shot_id"]}_v{variant}'
+                shot_requests.append(shot_request)
+
+        return shot_requests
+
+    def _apply_variant_budget(
+        self,
+        db: Session,
+        job_id: str,
+        pending: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Drop extra seed variants beyond the job's preview budget
+
+        The first variant of every shot is always rendered; extra variants
+        are admitted in variant order while their total video seconds fit in
+        `preview_variant_budget_s`.
+        """
+        admitted = [r for r in pending if not r.get("variant")]
+        budget = settings.preview_variant_budget_s
+        for shot_request in sorted(
+            (r for r in pending if r.get("variant")), key=lambda r: r["variant"]
+        ):
+            duration = shot_request["request"]["duration"]
+            if duration <= budget:
+                budget -= duration
+                admitted.append(shot_request)
+            else:
+                self._store_shot_asset(db, job_id, shot_request, error="budget_exhausted", status="skipped")
+
+        dropped = len(pending) - len(admitted)
+        if dropped:
+            logger.info("preview_variants_over_budget", job_id=job_id, dropped=dropped)
+        return admitted
+
+    async def _render_shots(
+        self,
+        db: Session,
+        job: JobModel,
+        shot_requests: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Render shot requests: cache lookup, submit, then per-shot pipelines
+
+        Entries already marked `reused_from` are left alone. Each shot commits
+        its asset as soon as it lands, so partial results are visible while
+        slower shots are still rendering. Entries are merged into
+        `job.shot_requests` by (shot_id, stage, variant), so a finalize pass
+        keeps the preview requests it was derived from.
+
+        Every upstream task id is persisted as soon as its submission
+        returns. When the job is re-run after a crash or a worker hand-off,
+        renders that already finished are kept and tasks submitted by the
+        previous run are re-attached to instead of being paid for again.
+        """
+        job_id = job.job_id
+        persisted = {self._request_key(r): r for r in (job.shot_requests or [])}
+
+        pending = []
+        for shot_request in shot_requests:
+            if shot_request.get("reused_from"):
+                continue
+            previous = persisted.get(self._request_key(shot_request))
+            if previous and previous.get("cache_key") == shot_request["cache_key"]:
+                if self._render_finished(job, shot_request):
+                    continue
+                # Shots already rendered by an identical request skip submission
+                if await self._restore_cached_shot(db, job_id, shot_request):
+                    continue
+                if previous.get("task_id"):
+                    shot_request["task_id"] = previous["task_id"]
+                    shot_request["resumed"] = True
+                    pending.append(shot_request)
+                    continue
+            elif await self._restore_cached_shot(db, job_id, shot_request):
+                continue
+            pending.append(shot_request)
+
+        pending = self._apply_variant_budget(db, job_id, pending)
+        self._persist_shot_requests(db, job, shot_requests)
+
+        resumed = [r for r in pending if r.get("resumed")]
+        for shot_request in resumed:
+            self.wan26_adapter.adopt_task(shot_request["task_id"])
+        if resumed:
+            metrics.incr("shot_tasks_resumed", len(resumed))
+            logger.info("shot_tasks_resumed", job_id=job_id, task_ids=[r["task_id"] for r in resumed])
+
+        # Submit all remaining requests; finalize renders jump the upstream queue,
+        # otherwise slots are shared fairly between clients
+        priority = self.STAGE_PRIORITIES.get(job.stage, QUEUE_PRIORITY_PREVIEW)
+
+        async def _submit(shot_request: Dict[str, Any]) -> None:
+            response = await self.wan26_adapter.submit_shot_request(
+                ShotGenerationRequest(**shot_request["request"]),
+                priority=priority,
+                client=job.client_ip or "",
+                quality_mode=job.quality_mode,
+            )
+            # Persist right away so a crash from here on re-attaches to the task
+            shot_request["task_id"] = response.task_id
+            self._persist_shot_requests(db, job, [shot_request])
+
+        to_submit = [r for r in pending if not r.get("task_id")]
+        running = []
+        watcher = None
+        try:
+            responses = await asyncio.gather(*[_submit(r) for r in to_submit], return_exceptions=True)
+
+            for shot_request, response in zip(to_submit, responses):
                 if isinstance(response, Exception):
-                    logger.error("shot_submission_failed", shot_id=shot_requests[i]["shot_id"], error=str(response))
-                    # Handle partial failure?
-                else:
-                    shot_requests[i]["task_id"] = response.task_id
-                    active_tasks.append((shot_requests[i]["shot_id"], response.task_id))
-            
-            job.shot_requests = shot_requests
-            db.commit()
-            
-            # 5. Poll for Completion
-            # Simple polling implementation
-            assets = []
-            for shot_id, task_id in active_tasks:
-                result = await self.wan26_adapter.poll_task_status(task_id)
-                if result.status == "succeeded":
-                    # Download video
-                    local_path = await self.downloader.download_video(result.video_url)
-                    
-                    # Move to permanent storage
-                    storage_path = self.storage.get_video_storage_path(job_id, str(shot_id))
-                    import shutil
-                    shutil.move(local_path, storage_path)
-                    
-                    assets.append({
-                        "shot_id": shot_id,
-                        "video_url": self.storage.get_video_url(job_id, str(shot_id)),
-                        "status": "completed"
-                    })
+                    logger.error("shot_submission_failed", shot_id=shot_request["shot_id"], error=str(response))
+                    self._store_shot_asset(db, job_id, shot_request, error="submission_failed")
+
+            running = [
+                (shot_request, asyncio.create_task(self._run_shot_pipeline(db, job_id, shot_request)))
+                for shot_request in pending
+                if shot_request["task_id"]
+            ]
+            if any(r.get("variant_count", 1) > 1 for r, _ in running):
+                watcher = asyncio.create_task(self._watch_variants(db, job, running))
+            await asyncio.gather(*[task for _, task in running], return_exceptions=True)
+        except asyncio.CancelledError:
+            # Job cancelled: gather has cancelled the local pipelines (or the
+            # submissions still waiting for a slot), now release the upstream
+            # tasks already submitted. A job handed off to another worker
+            # keeps them; the next run re-attaches.
+            if job_id not in self._handed_off:
+                started = {id(r) for r, _ in running}
+                unsettled = [r for r, task in running if not task.done() or task.cancelled()]
+                unsettled += [r for r in pending if r.get("task_id") and id(r) not in started]
+                await self._cancel_upstream(job_id, unsettled)
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    @staticmethod
+    def _request_key(shot_request: Dict[str, Any]):
+        return (str(shot_request["shot_id"]), shot_request.get("stage", "preview"), shot_request.get("variant", 0))
+
+    def _persist_shot_requests(self, db: Session, job: JobModel, shot_requests: List[Dict[str, Any]]) -> None:
+        """Merge entries into `job.shot_requests` by (shot_id, stage, variant)"""
+        updated = {self._request_key(r): r for r in shot_requests}
+        merged = []
+        for r in job.shot_requests or []:
+            merged.append(dict(updated.pop(self._request_key(r), r)))
+        merged.extend(dict(r) for r in updated.values())
+        job.shot_requests = merged
+        db.commit()
+
+    def _render_finished(self, job: JobModel, shot_request: Dict[str, Any]) -> bool:
+        """Whether a previous run already settled this render (completed, cancelled or skipped)"""
+        asset = next(
+            (a for a in (job.assets or []) if str(a.get("shot_id")) == str(shot_request["shot_id"])), None
+        )
+        if asset is None:
+            return False
+        request = shot_request["request"]
+        if shot_request.get("stage") == "finalize":
+            status = asset.get("final_status")
+            done = status == "completed" and asset.get("seed") == request["seed"]
+        else:
+            variant = next((v for v in asset.get("variants", []) if v.get("seed") == request["seed"]), {})
+            status = variant.get("status")
+            done = status in ("completed", "cancelled", "skipped")
+        if status != "completed":
+            return done
+        file_id = shot_request.get("file_id") or str(shot_request["shot_id"])
+        return self.storage.has_video(job.job_id, file_id)
+
+    async def _cancel_upstream(self, job_id: str, shot_requests: List[Dict[str, Any]]) -> None:
+        """Best-effort cancel of upstream tasks"""
+        task_ids = [r["task_id"] for r in shot_requests if r.get("task_id")]
+        results = await asyncio.gather(*[
+            self.wan26_adapter.cancel_task(task_id) for task_id in task_ids
+        ], return_exceptions=True)
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        logger.info("upstream_tasks_cancelled", job_id=job_id, requested=len(task_ids), failed=failed)
+
+    async def _watch_variants(
+        self,
+        db: Session,
+        job: JobModel,
+        running: List[Any],
+    ) -> None:
+        """
+        Cancel seed variants nobody will use
+
+        Variants of a shot are cancelled once the user has selected a seed
+        for it (finalize while the preview is running), and all remaining
+        variants are cancelled `preview_variant_deadline_s` after every
+        shot has at least one completed variant.
+        """
+        shot_ids = {str(r["shot_id"]) for r, _ in running}
+        ready_since = None
+
+        while True:
+            await asyncio.sleep(settings.preview_watch_interval_s)
+            live = [(r, task) for r, task in running if not task.done()]
+            if not live:
+                return
+
+            db.refresh(job, attribute_names=["selected_seeds", "assets"])
+            selected = {str(k): v for k, v in (job.selected_seeds or {}).items()}
+            completed = {
+                str(a.get("shot_id")) for a in (job.assets or []) if a.get("status") == "completed"
+            }
+
+            if ready_since is None and shot_ids <= completed:
+                ready_since = time.monotonic()
+            deadline_hit = (
+                ready_since is not None
+                and time.monotonic() - ready_since >= settings.preview_variant_deadline_s
+            )
+
+            for shot_request, task in live:
+                chosen = selected.get(str(shot_request["shot_id"]))
+                if chosen is not None and chosen != shot_request["request"]["seed"]:
+                    await self._cancel_variant(db, job.job_id, shot_request, task, "seed_selected")
+                elif deadline_hit:
+                    await self._cancel_variant(db, job.job_id, shot_request, task, "variant_deadline")
+
+    async def _cancel_variant(
+        self,
+        db: Session,
+        job_id: str,
+        shot_request: Dict[str, Any],
+        task: asyncio.Task,
+        reason: str,
+    ) -> None:
+        """Stop one variant's pipeline and best-effort cancel its upstream task"""
+        if task.done():
+            return
+        task.cancel()
+
+        task_id = shot_request.get("task_id")
+        if task_id:
+            try:
+                await self.wan26_adapter.cancel_task(task_id)
+            except Exception as e:
+                # Only PENDING upstream tasks can be cancelled
+                logger.info("upstream_cancel_failed", job_id=job_id, task_id=task_id, error=str(e))
+
+        self._store_shot_asset(db, job_id, shot_request, error=reason, status="cancelled")
+        metrics.incr("preview_variants_cancelled", reason=reason)
+        logger.info(
+            "preview_variant_cancelled",
+            job_id=job_id,
+            shot_id=shot_request["shot_id"],
+            seed=shot_request["request"]["seed"],
+            reason=reason,
+        )
+
+    async def _restore_cached_shot(
+        self,
+        db: Session,
+        job_id: str,
+        shot_request: Dict[str, Any],
+    ) -> bool:
+        """
+        Fill a shot from the shot cache; returns False on a miss
+        """
+        shot_id = shot_request["shot_id"]
+        file_id = shot_request.get("file_id") or str(shot_id)
+        cache_key = shot_request["cache_key"]
+        if self.storage.content_addressed:
+            blob = await asyncio.to_thread(self.shot_cache.get_blob, cache_key)
+            if blob is None:
+                return False
+            digest, size = blob
+            if not await asyncio.to_thread(self.storage.link_blob, job_id, file_id, digest, size):
+                # Collected since: every job using it is gone
+                await asyncio.to_thread(self.shot_cache.forget, cache_key)
+                logger.warning("shot_cache_restore_failed", job_id=job_id, shot_id=shot_id, error="blob_missing")
+                return False
+        else:
+            cached_path = await asyncio.to_thread(self.shot_cache.get, cache_key)
+            if cached_path is None:
+                return False
+            try:
+                await asyncio.to_thread(self.storage.store_video, job_id, file_id, cached_path, False)
+            except OSError as e:
+                # Evicted between get() and link
+                logger.warning("shot_cache_restore_failed", job_id=job_id, shot_id=shot_id, error=str(e))
+                return False
+
+        shot_request["cached"] = True
+        self._store_shot_asset(db, job_id, shot_request, cache_hit=True)
+        logger.info("shot_cache_hit", job_id=job_id, shot_id=shot_id)
+        return True
+
+    def _store_shot_asset(
+        self,
+        db: Session,
+        job_id: str,
+        shot_request: Dict[str, Any],
+        error: Optional[str] = None,
+        cache_hit: bool = False,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Record the outcome of one rendered shot on the job's assets
+
+        Preview renders are kept per seed in the asset's `variants`; the
+        first completed variant is promoted to the asset's `video_url`.
+        Finalize renders update the asset in place: on success the final
+        video becomes `video_url` (the preview stays available as
+        `preview_video_url`), on failure the preview is kept and only
+        `final_status` records the error.
+        """
+        shot_id = shot_request["shot_id"]
+        request = shot_request["request"]
+        file_id = shot_request.get("file_id") or str(shot_id)
+
+        if shot_request.get("stage") == "finalize":
+            if error is not None:
+                asset = {"shot_id": shot_id, "final_status": status or "failed", "final_error": error}
+            else:
+                asset = {
+                    "shot_id": shot_id,
+                    "video_url": self.storage.get_video_url(job_id, file_id),
+                    "status": "completed",
+                    "seed": request["seed"],
+                    "resolution": request["size"].replace("*", "x"),
+                    "final_status": "completed",
+                }
+            JobDB.upsert_job_asset(db, job_id, asset, merge=True)
+            return asset
+
+        variant = {
+            "variant": shot_request.get("variant", 0),
+            "seed": request["seed"],
+            "resolution": request["size"].replace("*", "x"),
+        }
+        if error is not None:
+            variant["status"] = status or "failed"
+            variant["error"] = error
+        else:
+            variant["status"] = "completed"
+            variant["video_url"] = self.storage.get_video_url(job_id, file_id)
+            if cache_hit:
+                variant["cache_hit"] = True
+            if shot_request.get("reused_from"):
+                variant["reused_from"] = shot_request["reused_from"]
+
+        job = JobDB.get_job(db, job_id)
+        existing = next(
+            (a for a in (job.assets or []) if str(a.get("shot_id")) == str(shot_id)), {}
+        )
+        variants = [v for v in existing.get("variants", []) if v.get("seed") != variant["seed"]]
+        variants.append(variant)
+        variants.sort(key=lambda v: v.get("variant", 0))
+
+        completed = [v for v in variants if v["status"] == "completed"]
+        primary = next(
+            (v for v in completed if existing.get("status") == "completed" and v["seed"] == existing.get("seed")),
+            None,
+        )
+        if primary is None and completed:
+            primary = variant if variant["status"] == "completed" else completed[0]
+
+        asset = {"shot_id": shot_id, "variants": variants}
+        if primary is not None:
+            asset.update({k: v for k, v in primary.items() if k not in ("variant", "status")})
+            asset["status"] = "completed"
+        elif len(variants) >= shot_request.get("variant_count", 1):
+            asset["status"] = "failed"
+            asset["error"] = variants[0].get("error")
+        else:
+            asset["status"] = "rendering"
+
+        JobDB.upsert_job_asset(db, job_id, asset)
+        return asset
+
+    async def _run_shot_pipeline(
+        self,
+        db: Session,
+        job_id: str,
+        shot_request: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Wait for one upstream task, download its video and persist the asset
+        """
+        shot_id = shot_request["shot_id"]
+        task_id = shot_request["task_id"]
+        request = shot_request["request"]
+        profile = f'{request["size"]}:{request["duration"]}'
+        error = None
+
+        try:
+            result = await self.wan26_adapter.poll_task_status(task_id, profile=profile)
+            if result.status == "succeeded":
+                file_id = shot_request.get("file_id") or str(shot_id)
+                if self.storage.streams_uploads:
+                    # Object storage: pipe the download into a multipart upload
+                    await self.storage.store_video_stream(
+                        job_id, file_id, self.downloader.stream_video(result.video_url)
+                    )
                 else:
-                    assets.append({
-                        "shot_id": shot_id,
-                        "status": "failed",
-                        "error": result.error
-                    })
-            
-            JobDB.update_job_assets(db, job_id, assets)
-            
-            transition_state(db, job_id, "SUCCEEDED", "processing_complete")
-            
+                    staging_path = self.storage.get_staging_path(job_id, file_id)
+                    await self.downloader.download_video(result.video_url, staging_path)
+                    try:
+                        storage_path = await asyncio.to_thread(self.storage.store_video, job_id, file_id, staging_path)
+                    finally:
+                        if os.path.exists(staging_path):
+                            os.remove(staging_path)
+                    if not self.storage.content_addressed:
+                        await asyncio.to_thread(self.shot_cache.put, shot_request["cache_key"], storage_path)
+                if self.storage.content_addressed:
+                    await asyncio.to_thread(self.shot_cache.put_blob, shot_request["cache_key"], job_id, file_id)
+            else:
+                error = result.error or "generation_failed"
         except Exception as e:
-            logger.error("job_processing_failed", job_id=job_id, error=str(e))
-            JobDB.update_job_error(db, job_id, {"message": str(e)})
-            transition_state(db, job_id, "FAILED", str(e))
+            logger.error("shot_pipeline_failed", job_id=job_id, shot_id=shot_id, task_id=task_id, error=str(e))
+            error = str(e)
+
+        return self._store_shot_asset(db, job_id, shot_request, error=error)
 
     async def execute_revision_workflow(
         self,
@@ -239,7 +911,6 @@ class JobManager:
             logger.info("mock_mode_revision", parent_job_id=parent_job_id)
             
             # Copy parent data
-            import copy
             mock_ir = copy.deepcopy(parent_job.ir) if parent_job.ir else {}
             if "narration" in targeted_fields and isinstance(mock_ir, dict):
                 if "audio" not in mock_ir: mock_ir["audio"] = {}
@@ -265,9 +936,123 @@ class JobManager:
             
             return job
 
-        # Real revision logic would go here
-        # For now, just raise not implemented for live mode
-        raise NotImplementedError("Live revision not yet implemented")
+        # Live revision: regenerate only the shots the feedback invalidates
+        self._check_client_limits(client_ip)
+        await self._check_dependencies("llm", "dashscope")
+        job = JobDB.create_job(
+            db=db,
+            user_input_redacted=parent_job.user_input_redacted,
+            user_input_hash=parent_job.user_input_hash,
+            pii_flags=parent_job.pii_flags,
+            template_id=parent_job.template_id,
+            template_version=parent_job.template_version,
+            quality_mode=parent_job.quality_mode,
+            resolution=parent_job.resolution,
+            ir=copy.deepcopy(parent_job.ir),
+            revision_of=parent_job_id,
+            targeted_fields=targeted_fields,
+            client_ip=client_ip,
+            state="PENDING",
+        )
+
+        if client_ip:
+            self.rate_limiter.increment_concurrent_jobs(client_ip, job.job_id)
+
+        self.job_queue.enqueue(
+            job.job_id,
+            "revise",
+            payload={
+                "feedback": feedback,
+                "suggested_modifications": suggested_modifications,
+            },
+            priority=QUEUE_PRIORITY_REVISION,
+        )
+
+        return job
+
+    async def _process_revision_background(
+        self,
+        db: Session,
+        job_id: str,
+        suggested_modifications: Dict[str, Any],
+    ):
+        """
+        Background revision task: diff against the parent shot by shot
+        """
+        try:
+            self._enter_stage(db, job_id, "revision", "revision_started")
+
+            job = JobDB.get_job(db, job_id)
+            parent_job = JobDB.get_job(db, job.revision_of)
+            if not parent_job or not parent_job.shot_plan:
+                raise ValueError(f"Parent job has no shot plan: {job.revision_of}")
+
+            targeted_fields = job.targeted_fields or []
+            parent_shots = parent_job.shot_plan.get("shots", [])
+
+            # 1. Revise the shot plan, keeping only targeted changes
+            if job.shot_plan:
+                # Resumed after a restart: the revised plan is already persisted
+                shot_plan = job.shot_plan
+                merged_shots = shot_plan.get("shots", [])
+                logger.info("job_resumed", job_id=job_id, stage="revision_render")
+            else:
+                revised_plan = await self.llm_orchestrator.arevise_shot_plan(
+                    parent_job.shot_plan, targeted_fields, suggested_modifications
+                )
+                merged_shots = self.revision_planner.merge_shots(parent_shots, revised_plan.shots, targeted_fields)
+                shot_plan = dict(parent_job.shot_plan)
+                shot_plan["shots"] = merged_shots
+
+                job.shot_plan = shot_plan
+                db.commit()
+
+            # 2. Diff compiled requests against the parent's
+            shot_requests = self._build_shot_requests(
+                shot_plan, job.ir or {}, self._preview_seed_count(job.quality_mode)
+            )
+            # Variants differ only by seed, so the first one stands for the shot
+            parent_keys = {
+                str(r["shot_id"]): r.get("cache_key") or ShotCache.key_for(ShotGenerationRequest(**r["request"]))
+                for r in (parent_job.shot_requests or [])
+                if r.get("stage", "preview") == "preview" and not r.get("variant")
+            }
+            revised_keys = {str(r["shot_id"]): r["cache_key"] for r in shot_requests if not r.get("variant")}
+            plan = self.revision_planner.plan(merged_shots, parent_keys, revised_keys)
+
+            logger.info(
+                "revision_planned",
+                job_id=job_id,
+                parent_job_id=parent_job.job_id,
+                invalidated=plan.invalidated,
+                reused=plan.reused,
+            )
+
+            # 3. Reuse parent assets (every rendered seed) for unchanged shots
+            parent_assets = {str(a.get("shot_id")): a for a in (parent_job.assets or [])}
+            for shot_request in shot_requests:
+                shot_id = shot_request["shot_id"]
+                parent_asset = parent_assets.get(str(shot_id))
+                if shot_id not in plan.reused or not parent_asset or parent_asset.get("status", "completed") != "completed":
+                    continue
+                file_id = shot_request.get("file_id") or str(shot_id)
+                reused = await asyncio.to_thread(
+                    self.storage.link_video, parent_job.job_id, file_id, job_id, file_id
+                )
+                if not reused:
+                    continue
+                shot_request["reused_from"] = parent_job.job_id
+                self._store_shot_asset(db, job_id, shot_request)
+
+            # 4. Render invalidated shots
+            await self._render_shots(db, job, shot_requests)
+
+            self._complete_preview(db, job_id, "revision_complete")
+
+        except Exception as e:
+            logger.error("revision_processing_failed", job_id=job_id, error=str(e))
+            JobDB.update_job_error(db, job_id, {"message": str(e)})
+            transition_state(db, job_id, "FAILED", str(e))
 
     async def execute_finalization_workflow(
         self,
@@ -282,7 +1067,11 @@ class JobManager:
         job = JobDB.get_job(db, job_id)
         if not job:
             raise ValueError(f"Job not found: {job_id}")
-            
+
+        # Reopening a finished job takes one of the client's job slots again
+        if job.state == "SUCCEEDED" and not settings.mock_mode:
+            self._check_concurrent_jobs(job.client_ip)
+
         JobDB.update_job_selected_seeds(db, job_id, selected_seeds)
         
         # MOCK MODE CHECK
@@ -301,5 +1090,141 @@ class JobManager:
             transition_state(db, job_id, "SUCCEEDED", "mock_finalization_complete")
             
             return job
-            
-        raise NotImplementedError("Live finalization not yet implemented")
+
+        await self._check_dependencies("dashscope")
+
+        # Picked while the preview is still rendering: the preview watcher
+        # cancels the other seeds, and the finalize is queued when it ends
+        if job.state == "RUNNING" and job.stage in ("preview", "revision"):
+            updated = (
+                db.query(JobModel)
+                .filter(JobModel.job_id == job_id, JobModel.state == "RUNNING")
+                .update(
+                    {JobModel.finalize_request: {"target_resolution": target_resolution}},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            db.refresh(job)
+            if updated:
+                logger.info("finalization_deferred", job_id=job_id)
+                return job
+
+        self._queue_finalization(db, job, target_resolution)
+        db.refresh(job)
+        return job
+
+    def _queue_finalization(self, db: Session, job: JobModel, target_resolution: str) -> None:
+        """
+        Queue a finalize pass in the finalize lane, ahead of previews
+
+        The reopened job counts against the client's concurrent job limit
+        again; the terminal listener releases the slot when the pass ends.
+        """
+        for shot_id in job.selected_seeds or {}:
+            JobDB.upsert_job_asset(db, job.job_id, {"shot_id": shot_id, "final_status": "queued"}, merge=True)
+        transition_state(db, job.job_id, "PENDING", "finalization_queued", reopen=True)
+        if job.client_ip:
+            self.rate_limiter.increment_concurrent_jobs(job.client_ip, job.job_id)
+
+        self.job_queue.enqueue(
+            job.job_id,
+            "finalize",
+            payload={"target_resolution": target_resolution},
+            priority=QUEUE_PRIORITY_FINALIZE,
+        )
+
+    async def _process_finalization_background(
+        self,
+        db: Session,
+        job_id: str,
+        target_resolution: str,
+    ):
+        """
+        Background finalization task: re-render selected seeds at full size
+
+        Each selected shot is re-rendered from its preview request with the
+        chosen seed and the target size. Shots whose current asset already
+        matches that seed and resolution are skipped. Per-shot progress is
+        tracked in each asset's `final_status`
+        (queued -> rendering -> completed | failed | skipped).
+        """
+        try:
+            self._enter_stage(db, job_id, "finalize", "finalization_started")
+
+            job = JobDB.get_job(db, job_id)
+            size = target_resolution.replace("x", "*")
+            resolution = size.replace("*", "x")
+
+            preview_requests = {
+                str(r["shot_id"]): r
+                for r in (job.shot_requests or [])
+                if r.get("stage", "preview") == "preview" and not r.get("variant")
+            }
+            assets = {str(a.get("shot_id")): a for a in (job.assets or [])}
+
+            final_requests = []
+            failed = []
+            for shot_key, seed in (job.selected_seeds or {}).items():
+                preview = preview_requests.get(str(shot_key))
+                if preview is None:
+                    JobDB.upsert_job_asset(db, job_id, {
+                        "shot_id": shot_key,
+                        "final_status": "failed",
+                        "final_error": "no_preview_request",
+                    }, merge=True)
+                    failed.append(shot_key)
+                    continue
+
+                shot_id = preview["shot_id"]
+                asset = assets.get(str(shot_id), {})
+                if (
+                    asset.get("status") == "completed"
+                    and asset.get("resolution") == resolution
+                    and asset.get("seed") == seed
+                ):
+                    JobDB.upsert_job_asset(db, job_id, {"shot_id": shot_id, "final_status": "skipped"}, merge=True)
+                    continue
+
+                request = ShotGenerationRequest(**{**preview["request"], "size": size, "seed": seed})
+                final_requests.append({
+                    "shot_id": shot_id,
+                    "stage": "finalize",
+                    "file_id": f"{shot_id}_final",
+                    "request": request.dict(),
+                    "cache_key": ShotCache.key_for(request),
+                    "task_id": None,
+                })
+                JobDB.upsert_job_asset(db, job_id, {
+                    "shot_id": shot_id,
+                    "final_status": "rendering",
+                    "preview_video_url": asset.get("preview_video_url") or asset.get("video_url"),
+                }, merge=True)
+
+            logger.info(
+                "finalization_planned",
+                job_id=job_id,
+                rendering=[r["shot_id"] for r in final_requests],
+                resolution=resolution,
+            )
+
+            await self._render_shots(db, job, final_requests)
+
+            db.refresh(job)
+            failed += [
+                a.get("shot_id") for a in (job.assets or []) if a.get("final_status") == "failed"
+            ]
+            if failed:
+                JobDB.update_job_error(db, job_id, {
+                    "message": "Some shots failed to finalize; their previews are kept",
+                    "failed_shots": sorted({str(shot_id) for shot_id in failed}),
+                })
+
+            job.resolution = resolution
+            db.commit()
+            transition_state(db, job_id, "SUCCEEDED", "finalization_complete")
+
+        except Exception as e:
+            logger.error("finalization_processing_failed", job_id=job_id, error=str(e))
+            JobDB.update_job_error(db, job_id, {"message": str(e)})
+            transition_state(db, job_id, "FAILED", str(e))
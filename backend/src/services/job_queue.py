@@ -0,0 +1,339 @@
+"""
+Job Queue Service - Durable queue with leases for out-of-process workers
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import or_, and_, func
+
+from src.models import SessionLocal
+from src.models.job import JobModel
+from src.models.job_queue import JobQueueEntryModel
+from src.config.settings import settings
+from src.config.constants import MAX_RETRY_ATTEMPTS
+from src.services.fair_scheduler import share_weight
+from src.services.job_state import transition_state
+from src.services.storage import JobDB
+from src.services.observability import logger
+
+
+class QueuedJob(BaseModel):
+    """A queue entry claimed by a worker"""
+
+    entry_id: int
+    job_id: str
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int = 0
+    attempts: int = 0
+
+
+class JobHandedOff(Exception):
+    """A claimed job was stopped so another worker can resume it"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        super().__init__(f"Job handed off: {job_id}")
+
+
+class JobQueue(ABC):
+    """
+    Queue backend interface
+
+    Workers claim entries with a time-bound lease and must heartbeat to keep
+    it. Entries whose lease expires are handed to the next worker, so a crashed
+    worker never loses a job.
+    """
+
+    @abstractmethod
+    def enqueue(self, job_id: str, kind: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0) -> int:
+        """Add an entry and return its id"""
+
+    @abstractmethod
+    def claim(
+        self,
+        worker_id: str,
+        lease_s: Optional[int] = None,
+        min_priority: Optional[int] = None,
+    ) -> Optional[QueuedJob]:
+        """Lease the highest-priority available entry (at least `min_priority`), or return None"""
+
+    @abstractmethod
+    def heartbeat(self, entry_id: int, worker_id: str, lease_s: Optional[int] = None) -> bool:
+        """Extend a lease; returns False if the worker no longer owns it"""
+
+    @abstractmethod
+    def complete(self, entry_id: int, worker_id: str) -> None:
+        """Mark an entry as done"""
+
+    @abstractmethod
+    def fail(self, entry_id: int, worker_id: str, error: str, retry: bool = True) -> None:
+        """Release an entry after an error, requeueing it while attempts remain"""
+
+    @abstractmethod
+    def release(self, entry_id: int, worker_id: str) -> None:
+        """Hand an entry back without counting the attempt (e.g. worker shutdown)"""
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> int:
+        """Cancel all unfinished entries for a job; returns the number cancelled"""
+
+    @abstractmethod
+    def depth(self) -> Dict[str, int]:
+        """Entry counts by state"""
+
+
+class SQLJobQueue(JobQueue):
+    """
+    Queue stored in the jobs database (SQLite by default)
+
+    Claims use a conditional UPDATE on the candidate row, so concurrent workers
+    in different processes can race safely: only one UPDATE matches.
+
+    With FAIR_SHARE_ENABLED, entries of the same priority are not taken FIFO
+    but from the client with the least weighted in-flight work across all
+    workers (leased entries / fair-share weight), oldest first within a
+    client. A client with a deep backlog then gets one job running while a
+    light client's first job is claimed by the next free worker, instead of
+    waiting behind the whole backlog.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def enqueue(self, job_id: str, kind: str, payload: Optional[Dict[str, Any]] = None, priority: int = 0) -> int:
+        with self.session_factory() as db:
+            entry = JobQueueEntryModel(
+                job_id=job_id,
+                kind=kind,
+                payload=payload or {},
+                priority=priority,
+                state="QUEUED",
+                max_attempts=MAX_RETRY_ATTEMPTS,
+            )
+            db.add(entry)
+            db.commit()
+            logger.info("job_enqueued", job_id=job_id, kind=kind, entry_id=entry.entry_id, priority=priority)
+            return entry.entry_id
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_s: Optional[int] = None,
+        min_priority: Optional[int] = None,
+    ) -> Optional[QueuedJob]:
+        lease_s = lease_s or settings.job_queue_lease_s
+
+        with self.session_factory() as db:
+            self._reap_exhausted(db)
+
+            for _ in range(5):
+                now = datetime.utcnow()
+                candidate = self._next_candidate(db, now, min_priority)
+                if candidate is None:
+                    return None
+
+                updated = (
+                    db.query(JobQueueEntryModel)
+                    .filter(JobQueueEntryModel.entry_id == candidate, self._claimable(now))
+                    .update(
+                        {
+                            JobQueueEntryModel.state: "LEASED",
+                            JobQueueEntryModel.lease_owner: worker_id,
+                            JobQueueEntryModel.lease_expires_at: now + timedelta(seconds=lease_s),
+                            JobQueueEntryModel.heartbeat_at: now,
+                            JobQueueEntryModel.attempts: JobQueueEntryModel.attempts + 1,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+
+                if updated == 1:
+                    entry = db.get(JobQueueEntryModel, candidate)
+                    logger.info("job_claimed", job_id=entry.job_id, entry_id=entry.entry_id, worker_id=worker_id, attempt=entry.attempts)
+                    return QueuedJob(
+                        entry_id=entry.entry_id,
+                        job_id=entry.job_id,
+                        kind=entry.kind,
+                        payload=entry.payload or {},
+                        priority=entry.priority,
+                        attempts=entry.attempts,
+                    )
+                # Lost the race to another worker, try the next candidate
+
+        return None
+
+    def heartbeat(self, entry_id: int, worker_id: str, lease_s: Optional[int] = None) -> bool:
+        lease_s = lease_s or settings.job_queue_lease_s
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            updated = (
+                db.query(JobQueueEntryModel)
+                .filter(
+                    JobQueueEntryModel.entry_id == entry_id,
+                    JobQueueEntryModel.lease_owner == worker_id,
+                    JobQueueEntryModel.state == "LEASED",
+                )
+                .update(
+                    {
+                        JobQueueEntryModel.lease_expires_at: now + timedelta(seconds=lease_s),
+                        JobQueueEntryModel.heartbeat_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return updated == 1
+
+    def complete(self, entry_id: int, worker_id: str) -> None:
+        self._finish(entry_id, worker_id, {JobQueueEntryModel.state: "DONE"})
+
+    def fail(self, entry_id: int, worker_id: str, error: str, retry: bool = True) -> None:
+        with self.session_factory() as db:
+            entry = db.get(JobQueueEntryModel, entry_id)
+            if entry is None or entry.lease_owner != worker_id or entry.state != "LEASED":
+                return
+            can_retry = retry and entry.attempts < entry.max_attempts
+            entry.state = "QUEUED" if can_retry else "FAILED"
+            entry.lease_owner = None
+            entry.lease_expires_at = None
+            entry.last_error = error
+            db.commit()
+            logger.warning("job_queue_entry_failed", job_id=entry.job_id, entry_id=entry_id, requeued=can_retry, error=error)
+
+    def release(self, entry_id: int, worker_id: str) -> None:
+        with self.session_factory() as db:
+            entry = db.get(JobQueueEntryModel, entry_id)
+            if entry is None or entry.lease_owner != worker_id or entry.state != "LEASED":
+                return
+            entry.state = "QUEUED"
+            entry.lease_owner = None
+            entry.lease_expires_at = None
+            entry.attempts = max(0, entry.attempts - 1)
+            db.commit()
+            logger.info("job_queue_entry_released", job_id=entry.job_id, entry_id=entry_id)
+
+    def cancel(self, job_id: str) -> int:
+        with self.session_factory() as db:
+            updated = (
+                db.query(JobQueueEntryModel)
+                .filter(
+                    JobQueueEntryModel.job_id == job_id,
+                    JobQueueEntryModel.state.in_(["QUEUED", "LEASED"]),
+                )
+                .update({JobQueueEntryModel.state: "CANCELLED"}, synchronize_session=False)
+            )
+            db.commit()
+            return updated
+
+    def depth(self) -> Dict[str, int]:
+        with self.session_factory() as db:
+            rows = (
+                db.query(JobQueueEntryModel.state, func.count(JobQueueEntryModel.entry_id))
+                .group_by(JobQueueEntryModel.state)
+                .all()
+            )
+            return {state: count for state, count in rows}
+
+    def _next_candidate(self, db, now: datetime, min_priority: Optional[int]) -> Optional[int]:
+        """Entry id to claim next: highest priority, then fairest client, then oldest"""
+        query = db.query(JobQueueEntryModel.entry_id, JobQueueEntryModel.priority).filter(self._claimable(now))
+        if min_priority is not None:
+            query = query.filter(JobQueueEntryModel.priority >= min_priority)
+        head = query.order_by(JobQueueEntryModel.priority.desc(), JobQueueEntryModel.entry_id).first()
+        if head is None or not settings.fair_share_enabled:
+            return head.entry_id if head is not None else None
+
+        # Oldest entry of each client (and quality mode, which scales the weight) at that priority
+        heads = (
+            db.query(func.min(JobQueueEntryModel.entry_id), JobModel.client_ip, JobModel.quality_mode)
+            .join(JobModel, JobModel.job_id == JobQueueEntryModel.job_id)
+            .filter(self._claimable(now), JobQueueEntryModel.priority == head.priority)
+            .group_by(JobModel.client_ip, JobModel.quality_mode)
+            .all()
+        )
+        if len(heads) < 2:
+            return head.entry_id
+
+        # Work every worker currently holds, per client
+        running = dict(
+            db.query(JobModel.client_ip, func.count(JobQueueEntryModel.entry_id))
+            .join(JobModel, JobModel.job_id == JobQueueEntryModel.job_id)
+            .filter(JobQueueEntryModel.state == "LEASED", JobQueueEntryModel.lease_expires_at >= now)
+            .group_by(JobModel.client_ip)
+            .all()
+        )
+        entry_id, _, _ = min(
+            heads,
+            key=lambda row: (running.get(row[1], 0) / share_weight(row[1] or "", row[2]), row[0]),
+        )
+        return entry_id
+
+    def _claimable(self, now: datetime):
+        return or_(
+            JobQueueEntryModel.state == "QUEUED",
+            and_(
+                JobQueueEntryModel.state == "LEASED",
+                JobQueueEntryModel.lease_expires_at < now,
+                JobQueueEntryModel.attempts < JobQueueEntryModel.max_attempts,
+            ),
+        )
+
+    def _finish(self, entry_id: int, worker_id: str, values: Dict[Any, Any]) -> None:
+        with self.session_factory() as db:
+            values[JobQueueEntryModel.lease_owner] = None
+            values[JobQueueEntryModel.lease_expires_at] = None
+            (
+                db.query(JobQueueEntryModel)
+                .filter(
+                    JobQueueEntryModel.entry_id == entry_id,
+                    JobQueueEntryModel.lease_owner == worker_id,
+                    JobQueueEntryModel.state == "LEASED",
+                )
+                .update(values, synchronize_session=False)
+            )
+            db.commit()
+
+    def _reap_exhausted(self, db) -> None:
+        """Fail entries whose lease expired after their last allowed attempt"""
+        now = datetime.utcnow()
+        exhausted = (
+            db.query(JobQueueEntryModel)
+            .filter(
+                JobQueueEntryModel.state == "LEASED",
+                JobQueueEntryModel.lease_expires_at < now,
+                JobQueueEntryModel.attempts >= JobQueueEntryModel.max_attempts,
+            )
+            .all()
+        )
+        for entry in exhausted:
+            entry.state = "FAILED"
+            entry.last_error = "lease expired after final attempt"
+            entry.lease_owner = None
+            db.commit()
+            JobDB.update_job_error(db, entry.job_id, {"message": "Worker lost the job too many times"})
+            transition_state(db, entry.job_id, "FAILED", "worker_lease_expired")
+            logger.error("job_queue_entry_exhausted", job_id=entry.job_id, entry_id=entry.entry_id)
+
+
+# Backend registry; additional backends register themselves here
+QUEUE_BACKENDS: Dict[str, Type[JobQueue]] = {
+    "sqlite": SQLJobQueue,
+    "sql": SQLJobQueue,
+}
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide queue for the configured backend"""
+    global _job_queue
+    if _job_queue is None:
+        backend = QUEUE_BACKENDS.get(settings.job_queue_backend)
+        if backend is None:
+            raise ValueError(f"Unknown job queue backend: {settings.job_queue_backend}")
+        _job_queue = backend()
+    return _job_queue
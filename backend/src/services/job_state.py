@@ -2,20 +2,43 @@
 Job State Service
 """
 
+from typing import Callable, List
 from sqlalchemy.orm import Session
 from src.services.storage import JobDB
+from src.services.observability import logger
 from datetime import datetime
 
-def transition_state(db: Session, job_id: str, new_state: str, reason: str = ""):
+# Called with the job after it enters a terminal state
+_terminal_listeners: List[Callable] = []
+
+
+def add_terminal_listener(listener: Callable) -> None:
+    """Register a callback for jobs reaching SUCCEEDED / FAILED / CANCELLED"""
+    if listener not in _terminal_listeners:
+        _terminal_listeners.append(listener)
+
+
+def transition_state(db: Session, job_id: str, new_state: str, reason: str = "", reopen: bool = False):
     """
     Transition job state and log transition
+
+    Terminal states are final: late transitions from background work (a
+    worker finishing after the watchdog failed the job, a retry after
+    cancellation) are dropped. Deliberate reopen paths, i.e. queueing a
+    finalize pass on a SUCCEEDED job, pass `reopen=True`; a CANCELLED job
+    is never reopened.
     """
     job = JobDB.get_job(db, job_id)
     if not job:
         return
         
     old_state = job.state
+    if is_terminal_state(old_state) and new_state != old_state and (not reopen or old_state == "CANCELLED"):
+        logger.info("state_transition_dropped", job_id=job_id, state=old_state, to=new_state, reason=reason)
+        return
+
     job.state = new_state
+    job.stage_started_at = datetime.utcnow()
     
     # Log transition
     transition = {
@@ -35,5 +58,12 @@ def transition_state(db: Session, job_id: str, new_state: str, reason: str = "")
     
     db.commit()
 
+    if is_terminal_state(new_state) and not is_terminal_state(old_state):
+        for listener in _terminal_listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error("terminal_listener_failed", job_id=job_id, error=str(e))
+
 def is_terminal_state(state: str) -> bool:
     return state in ["SUCCEEDED", "FAILED", "CANCELLED"]
@@ -0,0 +1,126 @@
+"""
+Job Watchdog - Fail jobs stuck in one stage past their deadline
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import settings
+from src.models import SessionLocal
+from src.models.job import JobModel
+from src.services.job_queue import JobQueue, get_job_queue
+from src.services.job_state import transition_state
+from src.services.observability import logger, metrics, log_failure_classification
+from src.services.storage import JobDB
+
+WATCHED_STATES = ("PENDING", "RUNNING")
+
+
+class JobWatchdog:
+    """
+    Periodically times out PENDING / RUNNING jobs
+
+    A job whose worker died or hung would otherwise stay RUNNING forever and
+    be polled indefinitely. Each stage (queued, preview, revision, finalize)
+    has its own deadline, measured from `stage_started_at`. A timed-out job
+    is moved to FAILED with a timeout classification and its queue entries
+    are cancelled; the terminal transition releases the client's slot, and
+    a worker still running the job notices and cancels its upstream tasks.
+    """
+
+    def __init__(self, job_queue: Optional[JobQueue] = None, session_factory=SessionLocal):
+        self.job_queue = job_queue or get_job_queue()
+        self.session_factory = session_factory
+
+    @staticmethod
+    def stage_of(job: JobModel) -> str:
+        if job.state == "PENDING":
+            return "queued"
+        return job.stage or "preview"
+
+    @staticmethod
+    def timeout_for(stage: str) -> timedelta:
+        minutes = settings.job_stage_timeouts_minutes.get(stage, settings.job_timeout_minutes)
+        return timedelta(minutes=minutes)
+
+    @staticmethod
+    def _stage_breakdown(job: JobModel, now: datetime) -> Dict[str, float]:
+        """Seconds spent in each state, from the transition log"""
+        breakdown: Dict[str, float] = {}
+        previous_state = "PENDING"
+        previous_at = job.created_at.replace(tzinfo=None) if job.created_at else None
+        for transition in job.state_transitions or []:
+            at = datetime.fromisoformat(transition["timestamp"])
+            if previous_at is not None:
+                breakdown[previous_state] = breakdown.get(previous_state, 0.0) + (at - previous_at).total_seconds()
+            previous_state, previous_at = transition["to"], at
+        if previous_at is not None:
+            breakdown[previous_state] = breakdown.get(previous_state, 0.0) + (now - previous_at).total_seconds()
+        return {state: round(seconds, 1) for state, seconds in breakdown.items()}
+
+    def scan(self) -> List[str]:
+        """Time out overdue jobs; returns their ids"""
+        timed_out = []
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            jobs = db.query(JobModel).filter(JobModel.state.in_(WATCHED_STATES)).all()
+            for job in jobs:
+                stage = self.stage_of(job)
+                started = job.stage_started_at or job.updated_at or job.created_at
+                if started is None:
+                    continue
+                elapsed = now - started.replace(tzinfo=None)
+                timeout = self.timeout_for(stage)
+                if elapsed < timeout:
+                    continue
+
+                db.refresh(job)
+                if job.state not in WATCHED_STATES or self.stage_of(job) != stage:
+                    continue
+                self._time_out(db, job, stage, elapsed, timeout, now)
+                timed_out.append(job.job_id)
+        return timed_out
+
+    def _time_out(
+        self,
+        db,
+        job: JobModel,
+        stage: str,
+        elapsed: timedelta,
+        timeout: timedelta,
+        now: datetime,
+    ) -> None:
+        error: Dict[str, Any] = {
+            "code": "JOB_TIMEOUT",
+            "message": f"Job exceeded the {stage} stage timeout ({timeout.total_seconds() / 60:g} min)",
+            "classification": "timeout",
+            "retryable": True,
+            "stage": stage,
+            "elapsed_s": round(elapsed.total_seconds(), 1),
+            "timeout_s": timeout.total_seconds(),
+            "stage_breakdown_s": self._stage_breakdown(job, now),
+        }
+        JobDB.update_job_error(db, job.job_id, error)
+        transition_state(db, job.job_id, "FAILED", f"timeout:{stage}")
+        cancelled = self.job_queue.cancel(job.job_id)
+
+        metrics.incr("jobs_timed_out", stage=stage)
+        log_failure_classification(job_id=job.job_id, classification="timeout", stage=stage)
+        logger.warning(
+            "job_timed_out",
+            job_id=job.job_id,
+            stage=stage,
+            elapsed_s=error["elapsed_s"],
+            queue_entries_cancelled=cancelled,
+        )
+
+    async def run(self) -> None:
+        """Scan every `job_watchdog_interval_s` until cancelled"""
+        logger.info("job_watchdog_started", interval_s=settings.job_watchdog_interval_s)
+        while True:
+            try:
+                await asyncio.to_thread(self.scan)
+            except Exception as e:
+                logger.error("job_watchdog_scan_failed", error=str(e))
+            await asyncio.sleep(settings.job_watchdog_interval_s)
@@ -0,0 +1,114 @@
+"""
+Metrics Publisher - Share per-process metrics snapshots through the database
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from src.config.settings import settings
+from src.models import SessionLocal
+from src.models.process_metrics import ProcessMetricsModel
+from src.services.observability import logger
+
+# Gauges that describe a state rather than a quantity: report the worst, don't add
+MAX_GAUGES = ("circuit_breaker_state",)
+
+
+def publish_snapshot(process_id: str, role: str, snapshot: Dict[str, Any]) -> None:
+    """Store a process's latest snapshot"""
+    with SessionLocal() as db:
+        row = db.query(ProcessMetricsModel).filter_by(process_id=process_id).first()
+        if row is None:
+            row = ProcessMetricsModel(process_id=process_id, role=role)
+            db.add(row)
+        row.snapshot = snapshot
+        row.updated_at = datetime.utcnow()
+        db.commit()
+
+
+def remove_snapshot(process_id: str) -> None:
+    with SessionLocal() as db:
+        db.query(ProcessMetricsModel).filter_by(process_id=process_id).delete()
+        db.commit()
+
+
+class MetricsPublisher:
+    """
+    Publish a process's metrics every `metrics_publish_interval_s`
+
+    Workers run the jobs, so their counters, AIMD limits, fair-share queues
+    and download pools only exist in their own memory; GET /metrics on the
+    API reads what they publish here.
+    """
+
+    def __init__(self, process_id: str, role: str, snapshot: Callable[[], Dict[str, Any]]):
+        self.process_id = process_id
+        self.role = role
+        self.snapshot = snapshot
+
+    async def run(self) -> None:
+        try:
+            while True:
+                try:
+                    await asyncio.to_thread(publish_snapshot, self.process_id, self.role, self.snapshot())
+                except Exception as e:
+                    logger.error("metrics_publish_failed", process_id=self.process_id, error=str(e))
+                await asyncio.sleep(settings.metrics_publish_interval_s)
+        finally:
+            # Stopped: drop the snapshot so the fleet view no longer counts this process
+            try:
+                await asyncio.shield(asyncio.to_thread(remove_snapshot, self.process_id))
+            except Exception as e:
+                logger.warning("metrics_unpublish_failed", process_id=self.process_id, error=str(e))
+
+
+def _gauge_name(key: str) -> str:
+    return key.split("{", 1)[0]
+
+
+def fleet_metrics(local: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge `local` snapshots (keyed by process id) with those workers published
+
+    Counters and summaries are added up across processes, gauges too (fleet
+    in-flight, limit, queue depth) except state gauges, which report the
+    highest value. Fair-share queues and download pools are per process.
+    Snapshots older than three publish intervals belong to processes that
+    died and are ignored.
+    """
+    snapshots = dict(local)
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.metrics_publish_interval_s * 3)
+    try:
+        with SessionLocal() as db:
+            rows = db.query(ProcessMetricsModel).filter(ProcessMetricsModel.updated_at >= cutoff).all()
+            for row in rows:
+                snapshots.setdefault(row.process_id, row.snapshot or {})
+    except Exception as e:
+        logger.error("metrics_read_failed", error=str(e))
+
+    merged: Dict[str, Any] = {
+        "processes": sorted(snapshots),
+        "counters": {},
+        "gauges": {},
+        "summaries": {},
+        "fair_share": {},
+        "download_pool": {},
+    }
+    for process_id, snapshot in snapshots.items():
+        for key, value in snapshot.get("counters", {}).items():
+            merged["counters"][key] = merged["counters"].get(key, 0) + value
+        for key, value in snapshot.get("gauges", {}).items():
+            if _gauge_name(key) in MAX_GAUGES:
+                merged["gauges"][key] = max(merged["gauges"].get(key, value), value)
+            else:
+                merged["gauges"][key] = merged["gauges"].get(key, 0) + value
+        for key, summary in snapshot.get("summaries", {}).items():
+            total = merged["summaries"].setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+            total["count"] += summary.get("count", 0)
+            total["sum"] += summary.get("sum", 0.0)
+            total["max"] = max(total["max"], summary.get("max", 0.0))
+        for section in ("fair_share", "download_pool"):
+            if snapshot.get(section) is not None:
+                merged[section][process_id] = snapshot[section]
+    return merged
@@ -2,33 +2,261 @@
 Rate Limiter Service
 """
 
-from typing import Dict, Any
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Type
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+from src.config.settings import settings
+from src.services.observability import logger, metrics
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for per-client limiter state
+
+    Request rate uses GCRA, which needs a single timestamp per client (the
+    theoretical arrival time), so state is O(1) per client. Concurrent jobs
+    are tracked as job id sets so they can be reconciled against the jobs
+    table if a release is ever missed.
+    """
+
+    @abstractmethod
+    def gcra(self, key: str, now: float, emission_s: float, tolerance_s: float) -> Tuple[bool, float]:
+        """Consume one request; returns (allowed, retry_after_s)"""
+
+    @abstractmethod
+    def add_job(self, key: str, job_id: str) -> None:
+        """Record a running job for a client"""
+
+    @abstractmethod
+    def remove_job(self, key: str, job_id: str) -> None:
+        """Forget a job for a client (idempotent)"""
+
+    @abstractmethod
+    def jobs(self, key: str) -> Set[str]:
+        """Job ids currently counted for a client"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process backend
+
+    Entries are kept in LRU order. A GCRA entry whose arrival time is in the
+    past carries no information, so idle clients are evicted as soon as they
+    have been quiet for `idle_ttl_s`; `max_clients` bounds memory even under
+    a flood of distinct clients.
+    """
+
+    def __init__(self, idle_ttl_s: Optional[float] = None, max_clients: Optional[int] = None):
+        self.idle_ttl_s = settings.rate_limit_idle_ttl_s if idle_ttl_s is None else idle_ttl_s
+        self.max_clients = max_clients or settings.rate_limit_max_clients
+        self._lock = threading.Lock()
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._jobs: Dict[str, Set[str]] = {}
+
+    def gcra(self, key: str, now: float, emission_s: float, tolerance_s: float) -> Tuple[bool, float]:
+        with self._lock:
+            self._evict(now)
+            tat = max(self._tat.get(key, now), now)
+            allow_at = tat - tolerance_s
+            if now < allow_at:
+                return False, allow_at - now
+            self._tat[key] = tat + emission_s
+            self._tat.move_to_end(key)
+            return True, 0.0
+
+    def _evict(self, now: float) -> None:
+        while self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat + self.idle_ttl_s > now and len(self._tat) < self.max_clients:
+                break
+            self._tat.popitem(last=False)
+        metrics.set_gauge("rate_limiter_clients", len(self._tat))
+
+    def add_job(self, key: str, job_id: str) -> None:
+        with self._lock:
+            self._jobs.setdefault(key, set()).add(job_id)
+
+    def remove_job(self, key: str, job_id: str) -> None:
+        with self._lock:
+            jobs = self._jobs.get(key)
+            if jobs is None:
+                return
+            jobs.discard(job_id)
+            if not jobs:
+                del self._jobs[key]
+
+    def jobs(self, key: str) -> Set[str]:
+        with self._lock:
+            return set(self._jobs.get(key, ()))
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Redis-protocol backend shared by every API process and worker
+
+    GCRA runs as one Lua script so check-and-update is atomic. Keys carry
+    TTLs, so idle clients expire on the server without a sweeper.
+    """
+
+    GCRA_SCRIPT = """
+local tat = tonumber(redis.call('GET', KEYS[1]))
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+if tat == nil or tat < now then
+    tat = now
+end
+local allow_at = tat - tolerance
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+local new_tat = tat + emission
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now + tolerance) * 1000) + 1)
+return {1, '0'}
+"""
+
+    KEY_PREFIX = "prism:ratelimit"
+
+    def __init__(self, client: Any = None, url: Optional[str] = None):
+        if client is None:
+            if redis is None:
+                raise ImportError("redis is required for RATE_LIMIT_BACKEND=redis")
+            client = redis.Redis.from_url(url or settings.redis_url, decode_responses=True)
+        self.client = client
+        self._gcra = client.register_script(self.GCRA_SCRIPT)
+
+    def gcra(self, key: str, now: float, emission_s: float, tolerance_s: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._gcra(
+            keys=[f"{self.KEY_PREFIX}:rate:{key}"],
+            args=[repr(now), repr(emission_s), repr(tolerance_s)],
+        )
+        return bool(int(allowed)), float(retry_after)
+
+    def _jobs_key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}:jobs:{key}"
+
+    def add_job(self, key: str, job_id: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.sadd(self._jobs_key(key), job_id)
+        # A client with no job updates for this long has nothing running
+        pipe.expire(self._jobs_key(key), settings.rate_limit_jobs_ttl_s)
+        pipe.execute()
+
+    def remove_job(self, key: str, job_id: str) -> None:
+        self.client.srem(self._jobs_key(key), job_id)
+
+    def jobs(self, key: str) -> Set[str]:
+        return set(self.client.smembers(self._jobs_key(key)))
+
+
+RATE_LIMIT_BACKENDS: Dict[str, Type[RateLimitBackend]] = {
+    "memory": MemoryRateLimitBackend,
+    "redis": RedisRateLimitBackend,
+}
+
+
+def _active_job_ids(job_ids: Iterable[str]) -> Set[str]:
+    """Subset of `job_ids` that are not in a terminal state"""
+    from src.models import SessionLocal
+    from src.models.job import JobModel
+
+    job_ids = list(job_ids)
+    if not job_ids:
+        return set()
+    with SessionLocal() as db:
+        rows = (
+            db.query(JobModel.job_id)
+            .filter(
+                JobModel.job_id.in_(job_ids),
+                JobModel.state.notin_(["SUCCEEDED", "FAILED", "CANCELLED"]),
+            )
+            .all()
+        )
+    return {row.job_id for row in rows}
+
 
 class RateLimiter:
     """
-    Simple in-memory rate limiter (Mock implementation)
-    In production, use Redis
+    Per-client request rate (GCRA) and concurrent job limits
+
+    The backend is chosen by RATE_LIMIT_BACKEND: `memory` keeps state in
+    this process, `redis` shares it across API processes and workers.
+    Concurrent job slots are released when a job reaches a terminal state;
+    counts are also reconciled against the jobs table on every check, so a
+    release that happened in another process (or never happened, after a
+    crash) cannot leak a slot.
     """
-    
-    def __init__(self):
-        self._requests = {}
-        self._concurrent_jobs = {}
-        
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        active_jobs: Optional[Callable[[Iterable[str]], Set[str]]] = None,
+    ):
+        if backend is None:
+            backend_cls = RATE_LIMIT_BACKENDS.get(settings.rate_limit_backend)
+            if backend_cls is None:
+                raise ValueError(f"Unknown rate limit backend: {settings.rate_limit_backend}")
+            backend = backend_cls()
+        self.backend = backend
+        self.active_jobs = active_jobs or _active_job_ids
+        self.max_concurrent_jobs = settings.max_concurrent_jobs_per_ip
+        self.emission_s = settings.rate_limit_window_s / max(1, settings.rate_limit_per_min)
+        self.tolerance_s = self.emission_s * max(0, settings.rate_limit_burst - 1)
+
     def check_rate_limit(self, client_ip: str) -> Dict[str, Any]:
-        """Check if request is allowed"""
-        return {"allowed": True, "reset_at": datetime.utcnow() + timedelta(minutes=1)}
-        
+        """Check if request is allowed (consumes one request when it is)"""
+        allowed, retry_after = self.backend.gcra(client_ip, time.time(), self.emission_s, self.tolerance_s)
+        if not allowed:
+            metrics.incr("rate_limited", reason="rate")
+            logger.warning("rate_limited", client_ip=client_ip, retry_after_s=round(retry_after, 2))
+        return {
+            "allowed": allowed,
+            "retry_after_s": retry_after,
+            "reset_at": datetime.utcnow() + timedelta(seconds=retry_after),
+        }
+
     def check_concurrent_jobs(self, client_ip: str) -> Dict[str, Any]:
         """Check concurrent job limit"""
-        current = self._concurrent_jobs.get(client_ip, 0)
-        return {"allowed": True, "current": current, "max": 5}
-        
-    def increment_concurrent_jobs(self, client_ip: str):
+        current = len(self._reconcile(client_ip))
+        allowed = current < self.max_concurrent_jobs
+        if not allowed:
+            metrics.incr("rate_limited", reason="concurrency")
+            logger.warning("concurrent_jobs_limited", client_ip=client_ip, current=current)
+        return {"allowed": allowed, "current": current, "max": self.max_concurrent_jobs}
+
+    def _reconcile(self, client_ip: str) -> Set[str]:
+        counted = self.backend.jobs(client_ip)
+        if not counted:
+            return counted
+        active = self.active_jobs(counted)
+        for job_id in counted - active:
+            self.backend.remove_job(client_ip, job_id)
+        return active
+
+    def increment_concurrent_jobs(self, client_ip: str, job_id: Optional[str] = None):
         """Increment concurrent job count"""
-        self._concurrent_jobs[client_ip] = self._concurrent_jobs.get(client_ip, 0) + 1
-        
-    def decrement_concurrent_jobs(self, client_ip: str):
+        self.backend.add_job(client_ip, job_id or uuid.uuid4().hex)
+
+    def decrement_concurrent_jobs(self, client_ip: str, job_id: Optional[str] = None):
         """Decrement concurrent job count"""
-        if client_ip in self._concurrent_jobs:
-            self._concurrent_jobs[client_ip] = max(0, self._concurrent_jobs[client_ip] - 1)
+        if job_id is None:
+            jobs = self.backend.jobs(client_ip)
+            if not jobs:
+                return
+            job_id = next(iter(jobs))
+        self.backend.remove_job(client_ip, job_id)
+
+    def on_job_terminal(self, job) -> None:
+        """Job state listener: release the job's slot"""
+        if job.client_ip:
+            self.decrement_concurrent_jobs(job.client_ip, job.job_id)
@@ -0,0 +1,110 @@
+"""
+Result Cache Service - Reuse recent successful jobs for identical prompts
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.asset_ref import AssetRefModel
+from src.models.job import JobModel
+from src.services.storage import JobDB
+
+CacheKey = Tuple[str, str, str]
+
+
+class ResultCache:
+    """
+    Look up a reusable job by (user_input_hash, quality_mode, resolution)
+
+    The indexed user_input_hash column is the source of truth. A small
+    in-process map remembers recent hits for `ttl_s` seconds so repeated
+    submissions skip the query; `max_age_s` bounds how old a reused job may be.
+    A job is only reused while every shot still has its stored video.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        ttl_s: Optional[int] = None,
+        max_age_s: Optional[int] = None,
+    ):
+        self.enabled = settings.result_cache_enabled if enabled is None else enabled
+        self.ttl_s = settings.result_cache_ttl_s if ttl_s is None else ttl_s
+        self.max_age_s = settings.result_cache_max_age_s if max_age_s is None else max_age_s
+        self._entries: Dict[CacheKey, Tuple[str, float]] = {}
+
+    def lookup(
+        self,
+        db: Session,
+        user_input_hash: str,
+        quality_mode: str,
+        resolution: str,
+    ) -> Optional[JobModel]:
+        """Return a reusable SUCCEEDED job, or None"""
+        if not self.enabled:
+            return None
+
+        key = (user_input_hash, quality_mode, resolution)
+        cached = self._entries.get(key)
+        if cached is not None:
+            job_id, expires_at = cached
+            job = JobDB.get_job(db, job_id) if expires_at > time.monotonic() else None
+            if job is not None and self._is_reusable(job) and self._has_videos(db, job):
+                return job
+            self._entries.pop(key, None)
+
+        job = (
+            db.query(JobModel)
+            .filter(
+                JobModel.user_input_hash == user_input_hash,
+                JobModel.quality_mode == quality_mode,
+                JobModel.resolution == resolution,
+                JobModel.state == "SUCCEEDED",
+                JobModel.revision_of.is_(None),
+                JobModel.created_at >= datetime.utcnow() - timedelta(seconds=self.max_age_s),
+            )
+            .order_by(JobModel.created_at.desc())
+            .first()
+        )
+        if job is None or not self._is_reusable(job) or not self._has_videos(db, job):
+            return None
+
+        self._entries[key] = (job.job_id, time.monotonic() + self.ttl_s)
+        return job
+
+    def _is_reusable(self, job: JobModel) -> bool:
+        if job.state != "SUCCEEDED" or not job.assets or not job.shot_plan:
+            return False
+        if job.created_at is not None and job.created_at.replace(tzinfo=None) < datetime.utcnow() - timedelta(seconds=self.max_age_s):
+            return False
+        # Only reuse jobs whose every shot rendered and still has its videos
+        for asset in job.assets:
+            if asset.get("status", "completed") != "completed":
+                return False
+            if asset.get("expired") or asset.get("preview_expired"):
+                return False
+            if any(variant.get("expired") for variant in asset.get("variants", [])):
+                return False
+        return True
+
+    @staticmethod
+    def _has_videos(db: Session, job: JobModel) -> bool:
+        """Every rendered shot still has its blob ref (or legacy file) to link the clone to"""
+        refs = {row.file_id for row in db.query(AssetRefModel.file_id).filter(AssetRefModel.job_id == job.job_id)}
+        for shot_request in job.shot_requests or []:
+            file_id = shot_request.get("file_id") or str(shot_request["shot_id"])
+            if file_id in refs:
+                continue
+            if not os.path.exists(os.path.join(settings.static_video_dir, f"{job.job_id}_{file_id}.mp4")):
+                return False
+        return True
+
+    def forget(self, job_id: str) -> None:
+        """Drop remembered hits on a job (e.g. its videos were garbage collected)"""
+        for key in [k for k, (cached_id, _) in self._entries.items() if cached_id == job_id]:
+            self._entries.pop(key, None)
@@ -0,0 +1,195 @@
+"""
+Shot Cache Service - Content-addressed cache of rendered shots across jobs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from src.config.settings import settings
+from src.core.wan26_adapter import ShotGenerationRequest
+from src.models import SessionLocal
+from src.models.asset_ref import AssetRefModel
+from src.models.shot_cache import ShotCacheEntryModel
+from src.services.observability import logger, metrics
+
+
+class ShotCache:
+    """
+    Map a canonical hash of a ShotGenerationRequest to a stored video file
+
+    A shot is fully determined by its request (prompt, negative prompt, size,
+    duration, seed, prompt_extend, watermark), so identical requests from
+    different jobs or revisions can reuse the same file.
+
+    With content-addressed storage (any backend, including S3) an entry is a
+    row mapping the key to the shot's blob digest (`put_blob` / `get_blob`):
+    a hit adds a ref to the existing blob, no bytes are copied, and the blob
+    lives as long as some job refers to it. Otherwise files are hardlinked
+    in and out of `cache_dir` (`put` / `get`), evicted LRU within
+    `max_bytes`; the directory itself is the shared index, so workers in
+    other processes see each other's entries.
+    """
+
+    SUFFIX = ".mp4"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        session_factory=SessionLocal,
+    ):
+        self.session_factory = session_factory
+        self.cache_dir = cache_dir or settings.shot_cache_dir
+        self.max_bytes = settings.shot_cache_max_bytes if max_bytes is None else max_bytes
+        self.enabled = settings.shot_cache_enabled if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load()
+
+    @staticmethod
+    def key_for(request: ShotGenerationRequest) -> str:
+        """Canonical hash of the compiled request"""
+        canonical = json.dumps(request.dict(), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.SUFFIX}")
+
+    def _load(self) -> None:
+        """Rebuild the LRU index from the directory (oldest access first)"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, name[: -len(self.SUFFIX)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("shot_cache_bytes", self._total_bytes)
+        metrics.set_gauge("shot_cache_entries", len(self._index))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file path for `key`, or None"""
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        with self._lock:
+            if os.path.exists(path):
+                if key not in self._index:
+                    # Added by another process
+                    size = os.path.getsize(path)
+                    self._index[key] = size
+                    self._total_bytes += size
+                self._index.move_to_end(key)
+                os.utime(path)
+                metrics.incr("shot_cache_hits")
+                return path
+
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+                self._publish()
+
+        metrics.incr("shot_cache_misses")
+        return None
+
+    def put(self, key: str, source_path: str) -> None:
+        """Add a rendered shot to the cache"""
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            _link_or_copy(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("shot_cache_put_failed", key=key, error=str(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._index.get(key, 0)
+            self._index[key] = size
+            self._index.move_to_end(key)
+            self._evict()
+            self._publish()
+
+    def get_blob(self, key: str) -> Optional[Tuple[str, int]]:
+        """Return (sha256, size) of the blob cached for `key`, or None"""
+        if not self.enabled:
+            return None
+
+        with self.session_factory() as db:
+            entry = db.get(ShotCacheEntryModel, key)
+            if entry is None:
+                metrics.incr("shot_cache_misses")
+                return None
+            entry.last_used_at = datetime.utcnow()
+            db.commit()
+            metrics.incr("shot_cache_hits")
+            return entry.sha256, entry.size or 0
+
+    def put_blob(self, key: str, job_id: str, file_id: str) -> None:
+        """Record the blob a job's shot was just stored as"""
+        if not self.enabled:
+            return
+
+        with self.session_factory() as db:
+            ref = (
+                db.query(AssetRefModel)
+                .filter(AssetRefModel.job_id == job_id, AssetRefModel.file_id == str(file_id))
+                .first()
+            )
+            if ref is None:
+                return
+            entry = db.get(ShotCacheEntryModel, key)
+            if entry is None:
+                entry = ShotCacheEntryModel(cache_key=key)
+                db.add(entry)
+            entry.sha256 = ref.sha256
+            entry.size = ref.size
+            entry.last_used_at = datetime.utcnow()
+            db.commit()
+
+    def forget(self, key: str) -> None:
+        """Drop an entry whose blob is gone"""
+        with self.session_factory() as db:
+            db.query(ShotCacheEntryModel).filter(ShotCacheEntryModel.cache_key == key).delete()
+            db.commit()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            metrics.incr("shot_cache_evictions")
+            logger.info("shot_cache_evicted", key=key, size=size)
+
+
+def _link_or_copy(source: str, dest: str) -> None:
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
@@ -27,6 +27,10 @@ class JobDB:
         db.refresh(job)
         return job
         
+    @staticmethod
+    def get_job_state(db: Session, job_id: str) -> Optional[str]:
+        return db.query(JobModel.state).filter(JobModel.job_id == job_id).scalar()
+
     @staticmethod
     def update_job_assets(db: Session, job_id: str, assets: List[Dict[str, Any]]) -> None:
         job = JobDB.get_job(db, job_id)
@@ -34,6 +38,22 @@ class JobDB:
             job.assets = assets
             db.commit()
             
+    @staticmethod
+    def upsert_job_asset(db: Session, job_id: str, asset: Dict[str, Any], merge: bool = False) -> None:
+        """Insert or replace (or with `merge`, update) the asset entry for asset['shot_id']"""
+        job = JobDB.get_job(db, job_id)
+        if job:
+            # SQLAlchemy JSON mutation tracking requires reassignment
+            assets = list(job.assets or [])
+            for i, existing in enumerate(assets):
+                if str(existing.get("shot_id")) == str(asset["shot_id"]):
+                    assets[i] = {**existing, **asset} if merge else asset
+                    break
+            else:
+                assets.append(asset)
+            job.assets = assets
+            db.commit()
+            
     @staticmethod
     def update_job_error(db: Session, job_id: str, error_details: Dict[str, Any]) -> None:
         job = JobDB.get_job(db, job_id)
@@ -0,0 +1,213 @@
+"""
+Task Poller Service - One shared loop that tracks every outstanding DashScope task
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.config.settings import settings
+from src.core.wan26_adapter import ShotGenerationResponse
+from src.services.observability import logger
+
+FetchFn = Callable[[str], Awaitable[ShotGenerationResponse]]
+
+
+class _TrackedTask:
+    """Polling state for one upstream task"""
+
+    def __init__(self, task_id: str, profile: str, future: asyncio.Future, now: float):
+        self.task_id = task_id
+        self.profile = profile
+        self.future = future
+        self.started_at = now
+        self.next_poll_at = now
+        self.consecutive_errors = 0
+        self.waiters = 0
+
+
+class TaskPoller:
+    """
+    Resolve per-task futures from a single background polling loop
+
+    Polling is adaptive: young tasks are checked rarely, tasks approaching
+    their expected completion time are checked often, and overdue tasks back
+    off again. Expected completion time is learned per render profile from
+    tasks that already finished (EWMA), seeded by settings.
+    """
+
+    EWMA_ALPHA = 0.3
+    MAX_CONSECUTIVE_ERRORS = 5
+
+    def __init__(self, fetch: FetchFn):
+        self.fetch = fetch
+        self._tasks: Dict[str, _TrackedTask] = {}
+        self._expected_s: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fetch_semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous loop is gone (e.g. a new asyncio.run)
+            self._loop = loop
+            self._tasks = {}
+            self._wakeup = asyncio.Event()
+            self._fetch_semaphore = asyncio.Semaphore(settings.task_poller_max_concurrent_fetches)
+            self._runner = None
+        if self._runner is None or self._runner.done():
+            self._runner = loop.create_task(self._run())
+
+    def watch(self, task_id: str, profile: Optional[str] = None) -> asyncio.Future:
+        """Start tracking a task; returns a future resolved with its final response"""
+        self._ensure_running()
+
+        tracked = self._tasks.get(task_id)
+        if tracked is None:
+            tracked = _TrackedTask(
+                task_id,
+                profile or "default",
+                self._loop.create_future(),
+                time.monotonic(),
+            )
+            tracked.next_poll_at = tracked.started_at + self._interval_for(tracked, tracked.started_at)
+            self._tasks[task_id] = tracked
+            self._wakeup.set()
+        return tracked.future
+
+    async def wait(self, task_id: str, profile: Optional[str] = None) -> ShotGenerationResponse:
+        """
+        Wait for a task
+
+        Waiters of the same task share one tracked future; cancelling a
+        waiter only stops tracking the task when it was the last one.
+        """
+        future = self.watch(task_id, profile)
+        tracked = self._tasks[task_id]
+        tracked.waiters += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if tracked.waiters == 1 and self._tasks.get(task_id) is tracked:
+                self.unwatch(task_id)
+            raise
+        finally:
+            tracked.waiters -= 1
+
+    def unwatch(self, task_id: str) -> None:
+        """Stop tracking a task"""
+        tracked = self._tasks.pop(task_id, None)
+        if tracked is not None and not tracked.future.done():
+            tracked.future.cancel()
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._tasks)
+
+    def expected_duration(self, profile: str) -> float:
+        return self._expected_s.get(profile, settings.task_poller_expected_s)
+
+    def _interval_for(self, tracked: _TrackedTask, now: float) -> float:
+        """Adaptive polling interval based on task age vs expected completion"""
+        age = now - tracked.started_at
+        expected = self.expected_duration(tracked.profile)
+        near_start = expected * settings.task_poller_near_ratio
+
+        if age < near_start:
+            # Young task: poll slowly, but don't sleep past the "near" window
+            return max(settings.task_poller_fast_interval_s, min(settings.task_poller_slow_interval_s, near_start - age))
+        if age < expected * 2:
+            return settings.task_poller_fast_interval_s
+        return settings.task_poller_slow_interval_s
+
+    def _record_completion(self, tracked: _TrackedTask, now: float) -> None:
+        elapsed = now - tracked.started_at
+        previous = self._expected_s.get(tracked.profile)
+        if previous is None:
+            self._expected_s[tracked.profile] = elapsed
+        else:
+            self._expected_s[tracked.profile] = (1 - self.EWMA_ALPHA) * previous + self.EWMA_ALPHA * elapsed
+
+    async def _run(self) -> None:
+        while True:
+            if not self._tasks:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = [t for t in self._tasks.values() if t.next_poll_at <= now]
+            if due:
+                await asyncio.gather(*[self._poll_one(t) for t in due])
+                continue
+
+            delay = min(t.next_poll_at for t in self._tasks.values()) - now
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_one(self, tracked: _TrackedTask) -> None:
+        async with self._fetch_semaphore:
+            try:
+                result = await self.fetch(tracked.task_id)
+                tracked.consecutive_errors = 0
+            except Exception as e:
+                tracked.consecutive_errors += 1
+                logger.warning("task_poll_error", task_id=tracked.task_id, attempt=tracked.consecutive_errors, error=str(e))
+                if tracked.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                    self._resolve(tracked, ShotGenerationResponse(task_id=tracked.task_id, status="failed", error=str(e)))
+                    return
+                result = None
+
+        now = time.monotonic()
+        if tracked.task_id not in self._tasks:
+            return
+
+        if result is not None and result.status in ("succeeded", "failed"):
+            if result.status == "succeeded":
+                self._record_completion(tracked, now)
+            self._resolve(tracked, result)
+            return
+
+        if now - tracked.started_at > settings.task_poller_timeout_s:
+            self._resolve(
+                tracked,
+                ShotGenerationResponse(task_id=tracked.task_id, status="failed", error="poll_timeout"),
+            )
+            return
+
+        tracked.next_poll_at = now + self._interval_for(tracked, now)
+
+    def _resolve(self, tracked: _TrackedTask, result: ShotGenerationResponse) -> None:
+        self._tasks.pop(tracked.task_id, None)
+        if not tracked.future.done():
+            tracked.future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the loop and cancel all outstanding waits"""
+        for task_id in list(self._tasks):
+            self.unwatch(task_id)
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._runner = None
+
+
+_task_poller: Optional[TaskPoller] = None
+
+
+def get_task_poller(fetch: Optional[FetchFn] = None) -> TaskPoller:
+    """Return the process-wide poller, creating it with `fetch` on first use"""
+    global _task_poller
+    if _task_poller is None:
+        if fetch is None:
+            raise RuntimeError("TaskPoller has not been initialized with a fetch function")
+        _task_poller = TaskPoller(fetch)
+    return _task_poller
@@ -2,38 +2,388 @@
 Wan2.6 Downloader Service
 """
 
-import aiofiles
-import httpx
+import asyncio
+import hashlib
 import os
-import uuid
 import tempfile
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiofiles
+import httpx
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+from src.config.settings import settings
+from src.services.observability import logger, metrics
+
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    """Download failed; `retryable` marks transient upstream failures"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class DownloadIntegrityError(DownloadError):
+    """Downloaded bytes do not match the expected size or checksum"""
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Total size from a `bytes start-end/total` header (None if unknown)"""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _redact(url: str) -> str:
+    """URL without its query string (signed URLs carry credentials)"""
+    return url.split("?", 1)[0]
+
 
 class Wan26Downloader:
     """
     Download generated videos from Wan2.6 URL
+
+    All downloads share one long-lived httpx.AsyncClient, so the shots of a
+    job (which live on the same OSS host) reuse keep-alive connections, or a
+    single multiplexed HTTP/2 connection, instead of a TLS handshake each.
+    Concurrent requests per host are capped separately from the pool size
+    so one slow host cannot take every connection. Large files are fetched
+    as parallel byte ranges, and interrupted ranges resume from the last
+    byte received.
     """
-    
-    async def download_video(self, url: str) -> str:
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+        self._owns_client = client is None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Counter = Counter()
+        self._connections_opened = 0
+        self._downloads = 0
+        self.http2 = settings.download_http2 and h2 is not None
+        if settings.download_http2 and h2 is None:
+            logger.warning("downloader_http2_unavailable", reason="h2 package not installed")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._owns_client and (self._client is None or self._loop is not loop):
+            # Connections (and host semaphores) are bound to the loop that created them
+            self._loop = loop
+            self._host_slots = {}
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                follow_redirects=True,
+                max_redirects=settings.download_http_max_redirects,
+                limits=httpx.Limits(
+                    max_connections=settings.download_http_max_connections,
+                    max_keepalive_connections=settings.download_http_max_keepalive,
+                    keepalive_expiry=settings.download_http_keepalive_expiry_s,
+                ),
+                timeout=httpx.Timeout(
+                    settings.download_http_read_timeout_s,
+                    connect=settings.download_http_connect_timeout_s,
+                ),
+            )
+        return self._client
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(settings.download_http_max_per_host)
+        return slot
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook: count new connections (pool churn)"""
+        if event == "connection.connect_tcp.complete":
+            self._connections_opened += 1
+            metrics.incr("download_connections_opened")
+
+    async def download_video(
+        self,
+        url: str,
+        dest_path: str,
+        checksum: Optional[str] = None,
+        partial_dir: Optional[str] = None,
+    ) -> str:
         """
-        Download video to temp file
-        
+        Download video straight into its final location
+
+        Bytes are written to a partial file in `partial_dir` (by default the
+        static volume's partial directory, which is never served) and renamed
+        onto `dest_path` once complete and verified. The rename is atomic
+        because both live on the same filesystem, so readers never see a
+        truncated video and nothing is copied twice.
+
         Args:
             url: Video URL
-            
+            dest_path: Final path of the video
+            checksum: Optional expected digest as "<algorithm>:<hex>", e.g. "sha256:ab12..."
+            partial_dir: Directory for the in-progress file (same filesystem as `dest_path`)
+
         Returns:
-            Path to temporary file
+            `dest_path`
         """
-        # Create temp file
-        fd, path = tempfile.mkstemp(suffix=".mp4")
+        partial_dir = partial_dir or settings.static_partial_dir
+        os.makedirs(partial_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=f"{os.path.basename(dest_path)}.", suffix=".part", dir=partial_dir)
         os.close(fd)
-        
-        async with httpx.AsyncClient() as client:
-            async with client.stream("GET", url) as response:
-                if response.status_code != 200:
-                    raise Exception(f"Failed to download video: {response.status_code}")
-                    
-                async with aiofiles.open(path, "wb") as f:
-                    async for chunk in response.aiter_bytes():
-                        await f.write(chunk)
-                        
-        return path
+
+        started = time.monotonic()
+        try:
+            for attempt in range(settings.download_max_retries + 1):
+                try:
+                    await self._download(url, path)
+                    if checksum:
+                        await asyncio.to_thread(self._verify_checksum, path, checksum)
+                    break
+                except DownloadIntegrityError as e:
+                    metrics.incr("download_retries", reason="integrity")
+                    if attempt >= settings.download_max_retries:
+                        raise
+                    logger.warning("download_integrity_failed", url=_redact(url), attempt=attempt + 1, error=str(e))
+                    await asyncio.to_thread(os.truncate, path, 0)
+            os.chmod(path, 0o644)
+            os.replace(path, dest_path)
+        except BaseException:
+            # Failed or cancelled: don't leave partial files behind
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+        self._downloads += 1
+        metrics.observe("download_s", time.monotonic() - started)
+        return dest_path
+
+    async def _download(self, url: str, path: str) -> None:
+        """
+        Fetch `url` into `path` as one or more byte ranges
+
+        The first request asks for the first chunk. If the server answers 206
+        and the file is larger than one chunk, the remaining chunks are
+        fetched in parallel (at most `download_parallel_chunks` at a time)
+        while the first one is still streaming. A server that ignores Range
+        answers 200 and the whole body is streamed from that response.
+        """
+        chunk_size = settings.download_chunk_size_mb * 1024 * 1024
+        parallel = asyncio.Semaphore(max(1, settings.download_parallel_chunks))
+        tasks: List[asyncio.Task] = []
+        total: Optional[int] = None
+
+        async def fetch_chunk(start: int, end: int) -> None:
+            async with parallel:
+                await self._fetch_range(url, path, start, end)
+
+        def on_size(size: Optional[int], ranged: bool) -> None:
+            nonlocal total
+            total = size
+            if ranged and size is not None:
+                tasks.extend(
+                    asyncio.create_task(fetch_chunk(start, min(start + chunk_size, size) - 1))
+                    for start in range(chunk_size, size, chunk_size)
+                )
+
+        try:
+            await self._fetch_range(url, path, 0, chunk_size - 1, on_size=on_size)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if total is not None:
+            size = os.path.getsize(path)
+            if size != total:
+                raise DownloadIntegrityError(f"Downloaded {size} bytes, expected {total}")
+
+    async def _fetch_range(
+        self,
+        url: str,
+        path: str,
+        start: int,
+        end: Optional[int],
+        on_size: Optional[Callable[[Optional[int], bool], None]] = None,
+    ) -> None:
+        """
+        Write bytes `start..end` of `url` at the same offsets of `path`
+
+        Transient failures (connection errors, timeouts, 5xx, 429, short
+        reads) are retried up to `download_max_retries` times, resuming from
+        the last byte written rather than the start of the range.
+        """
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        position = start
+        attempt = 0
+        ranged = False
+        while True:
+            headers = {"Accept-Encoding": "identity"}
+            if end is None:
+                headers["Range"] = f"bytes={position}-"
+            else:
+                headers["Range"] = f"bytes={position}-{end}"
+            try:
+                async with self._host_slot(host):
+                    self._in_flight[host] += 1
+                    try:
+                        async with client.stream(
+                            "GET", url, headers=headers, extensions={"trace": self._trace}
+                        ) as response:
+                            if response.status_code == 206:
+                                ranged = True
+                                total = _content_range_total(response.headers.get("content-range"))
+                                if on_size is not None:
+                                    on_size(total, True)
+                                    on_size = None
+                                    if total is not None and (end is None or end >= total):
+                                        end = total - 1
+                            elif response.status_code == 200:
+                                # Range ignored: the body is the whole file, from byte 0
+                                if ranged or start > 0:
+                                    raise DownloadError("Server stopped honouring Range requests", retryable=False)
+                                length = response.headers.get("content-length")
+                                total = int(length) if length is not None else None
+                                if on_size is not None:
+                                    on_size(total, False)
+                                    on_size = None
+                                start = position = 0
+                                end = total - 1 if total is not None else None
+                                await asyncio.to_thread(os.truncate, path, 0)
+                            else:
+                                raise DownloadError(
+                                    f"Failed to download video: {response.status_code}",
+                                    retryable=response.status_code in RETRYABLE_STATUSES,
+                                )
+
+                            async with aiofiles.open(path, "r+b") as f:
+                                await f.seek(position)
+                                async for chunk in response.aiter_raw():
+                                    await f.write(chunk)
+                                    position += len(chunk)
+                    finally:
+                        self._in_flight[host] -= 1
+                        if not self._in_flight[host]:
+                            del self._in_flight[host]
+
+                if end is None or position > end:
+                    return
+                raise DownloadError(f"Connection closed after {position - start} bytes of range {start}-{end}")
+            except (httpx.TransportError, DownloadError) as e:
+                attempt += 1
+                await self._backoff(e, attempt, url, position, end)
+
+    async def stream_video(self, url: str) -> AsyncIterator[bytes]:
+        """
+        Yield the video's bytes in order, without touching local disk
+
+        Used to pipe a download straight into an object-store upload. An
+        interrupted transfer is resumed with a Range request from the last
+        byte yielded; the total is checked against Content-Length.
+        """
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        position = 0
+        total: Optional[int] = None
+        attempt = 0
+        started = time.monotonic()
+        while True:
+            headers = {"Accept-Encoding": "identity"}
+            if position:
+                headers["Range"] = f"bytes={position}-"
+            try:
+                async with self._host_slot(host):
+                    self._in_flight[host] += 1
+                    try:
+                        async with client.stream(
+                            "GET", url, headers=headers, extensions={"trace": self._trace}
+                        ) as response:
+                            if position and response.status_code != 206:
+                                raise DownloadError("Server does not support resuming (no Range)", retryable=False)
+                            if response.status_code not in (200, 206):
+                                raise DownloadError(
+                                    f"Failed to download video: {response.status_code}",
+                                    retryable=response.status_code in RETRYABLE_STATUSES,
+                                )
+                            if total is None:
+                                length = response.headers.get("content-length")
+                                total = int(length) if length is not None else None
+                            async for chunk in response.aiter_raw():
+                                position += len(chunk)
+                                yield chunk
+                    finally:
+                        self._in_flight[host] -= 1
+                        if not self._in_flight[host]:
+                            del self._in_flight[host]
+
+                if total is None or position >= total:
+                    break
+                raise DownloadError(f"Connection closed after {position} of {total} bytes")
+            except (httpx.TransportError, DownloadError) as e:
+                attempt += 1
+                await self._backoff(e, attempt, url, position, total)
+
+        if total is not None and position != total:
+            raise DownloadIntegrityError(f"Downloaded {position} bytes, expected {total}")
+        self._downloads += 1
+        metrics.observe("download_s", time.monotonic() - started)
+
+    async def _backoff(self, error: Exception, attempt: int, url: str, position: int, end: Optional[int]) -> None:
+        """Re-raise `error` if it is permanent or retries are used up, else wait before resuming"""
+        if not getattr(error, "retryable", True) or attempt > settings.download_max_retries:
+            raise error
+        metrics.incr("download_retries", reason="transfer")
+        logger.warning(
+            "download_range_retry",
+            url=_redact(url),
+            resume_from=position,
+            end=end,
+            attempt=attempt,
+            error=str(error) or type(error).__name__,
+        )
+        await asyncio.sleep(settings.download_retry_backoff_s * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _verify_checksum(path: str, checksum: str) -> None:
+        algorithm, sep, expected = checksum.partition(":")
+        if not sep:
+            algorithm, expected = "sha256", checksum
+        digest = hashlib.new(algorithm)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        if digest.hexdigest() != expected.lower():
+            raise DownloadIntegrityError(f"{algorithm} mismatch: got {digest.hexdigest()}, expected {expected}")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool state and reuse counters"""
+        connections = []
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = list(pool.connections)
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "http2": self.http2,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "connections_opened": self._connections_opened,
+            "downloads": self._downloads,
+            "in_flight": dict(self._in_flight),
+        }
+
+    async def close(self) -> None:
+        if self._owns_client and self._client is not None:
+            logger.info("downloader_closed", **self.pool_stats())
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,242 @@
+"""
+Prism Worker - Runs queued generation jobs outside the API process
+
+Usage:
+    python -m src.worker --processes 4 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Dict, Optional
+
+from src.config.settings import settings
+from src.config.constants import QUEUE_PRIORITY_FINALIZE
+from src.models import SessionLocal, init_db
+from src.services.job_queue import JobHandedOff, JobQueue, QueuedJob, get_job_queue
+from src.services.job_state import is_terminal_state
+from src.services.metrics_publisher import MetricsPublisher
+from src.services.observability import logger
+from src.services.storage import JobDB
+
+
+class Worker:
+    """
+    Claims queue entries and executes them with bounded concurrency
+
+    Each claimed entry gets a heartbeat task that renews its lease; if the
+    worker dies the lease lapses and another worker picks the entry up. A
+    worker that finds its lease gone (it stalled past the lease and the
+    entry was re-claimed) stops its run, so two workers never drive the
+    same job.
+    The last `worker_priority_slots` slots only take finalize-priority
+    entries, so a finalize never waits for a worker full of previews.
+    On shutdown, jobs still running after `worker_drain_timeout_s` are
+    handed back to the queue without losing their upstream renders.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        job_queue: Optional[JobQueue] = None,
+        job_manager=None,
+        concurrency: Optional[int] = None,
+    ):
+        self.worker_id = worker_id
+        self.job_queue = job_queue or get_job_queue()
+        self.job_manager = job_manager
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.priority_slots = max(0, min(settings.worker_priority_slots, self.concurrency - 1))
+        self.services = None
+        self._active: Dict[int, asyncio.Task] = {}
+        self._entries: Dict[int, QueuedJob] = {}
+        self._stopping = asyncio.Event()
+
+    def _ensure_job_manager(self) -> None:
+        if self.job_manager is None:
+            from src.services.container import ServiceContainer
+            self.services = ServiceContainer(job_queue=self.job_queue)
+            self.services.warm()
+            self.job_manager = self.services.job_manager
+
+    def stop(self) -> None:
+        """Stop claiming new entries; running entries are allowed to finish"""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Claim loop"""
+        self._ensure_job_manager()
+        logger.info("worker_started", worker_id=self.worker_id, concurrency=self.concurrency)
+
+        # The API's /metrics only sees this process's counters and limits through the DB
+        publisher = None
+        if self.services is not None:
+            publisher = asyncio.create_task(
+                MetricsPublisher(self.worker_id, "worker", self.services.metrics_snapshot).run()
+            )
+
+        while not self._stopping.is_set():
+            entry = None
+            if len(self._active) < self.concurrency:
+                min_priority = None
+                if len(self._active) >= self.concurrency - self.priority_slots:
+                    min_priority = QUEUE_PRIORITY_FINALIZE
+                try:
+                    entry = await asyncio.to_thread(
+                        self.job_queue.claim, self.worker_id, min_priority=min_priority
+                    )
+                except Exception as e:
+                    logger.error("worker_claim_failed", worker_id=self.worker_id, error=str(e))
+
+            if entry is not None:
+                task = asyncio.create_task(self._execute(entry))
+                self._active[entry.entry_id] = task
+                self._entries[entry.entry_id] = entry
+                task.add_done_callback(lambda _t, entry_id=entry.entry_id: self._forget(entry_id))
+                continue
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.job_queue_poll_interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+        if self._active:
+            logger.info("worker_draining", worker_id=self.worker_id, active=len(self._active))
+            _, unfinished = await asyncio.wait(
+                list(self._active.values()), timeout=settings.worker_drain_timeout_s
+            )
+            if unfinished:
+                # Hand the rest back: their upstream tasks keep rendering and the
+                # next worker re-attaches to them from the persisted shot requests
+                for entry in self._entries.values():
+                    self.job_manager.hand_off(entry.job_id)
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        if publisher is not None:
+            publisher.cancel()
+            await asyncio.gather(publisher, return_exceptions=True)
+        if self.services is not None:
+            await self.services.close()
+
+        logger.info("worker_stopped", worker_id=self.worker_id)
+
+    def _forget(self, entry_id: int) -> None:
+        self._active.pop(entry_id, None)
+        self._entries.pop(entry_id, None)
+
+    async def _execute(self, entry: QueuedJob) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(entry))
+        db = SessionLocal()
+        try:
+            await self.job_manager.run_queued_job(db, entry)
+            await asyncio.to_thread(self.job_queue.complete, entry.entry_id, self.worker_id)
+        except JobHandedOff:
+            await asyncio.to_thread(self.job_queue.release, entry.entry_id, self.worker_id)
+        except Exception as e:
+            logger.error("worker_entry_failed", worker_id=self.worker_id, job_id=entry.job_id, error=str(e))
+            await asyncio.to_thread(self.job_queue.fail, entry.entry_id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+            db.close()
+
+    async def _heartbeat(self, entry: QueuedJob) -> None:
+        while True:
+            await asyncio.sleep(settings.job_queue_heartbeat_s)
+            try:
+                owned = await asyncio.to_thread(self.job_queue.heartbeat, entry.entry_id, self.worker_id)
+            except Exception as e:
+                logger.error("worker_heartbeat_failed", worker_id=self.worker_id, job_id=entry.job_id, error=str(e))
+                continue
+            if not owned:
+                logger.warning("worker_lease_lost", worker_id=self.worker_id, job_id=entry.job_id)
+                await self._abandon(entry)
+                return
+
+    async def _abandon(self, entry: QueuedJob) -> None:
+        """
+        Stop running an entry this worker no longer owns
+
+        A cancelled or timed-out job is left to the job manager's watcher,
+        which also cancels its upstream tasks. Otherwise another worker has
+        the entry now: the job is handed off, keeping its upstream renders
+        for the new owner to re-attach to.
+        """
+        def _job_state() -> Optional[str]:
+            with SessionLocal() as db:
+                return JobDB.get_job_state(db, entry.job_id)
+
+        try:
+            state = await asyncio.to_thread(_job_state)
+        except Exception as e:
+            logger.error("worker_lease_check_failed", worker_id=self.worker_id, job_id=entry.job_id, error=str(e))
+            state = None
+        if state is not None and is_terminal_state(state):
+            return
+        if not self.job_manager.hand_off(entry.job_id):
+            # Not started yet (or already finishing): just stop the entry
+            task = self._active.get(entry.entry_id)
+            if task is not None:
+                task.cancel()
+
+
+def _worker_id(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def run_worker_process(index: int, concurrency: int) -> None:
+    """Entry point for a single worker process"""
+
+    async def _main():
+        worker = Worker(_worker_id(index), concurrency=concurrency)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    init_db()
+    asyncio.run(_main())
+
+
+def main(argv=None) -> None:
+    """prism-worker: start N worker processes"""
+    parser = argparse.ArgumentParser(prog="prism-worker", description="Run Prism generation workers")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes, help="Number of worker processes")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency, help="Concurrent jobs per process")
+    args = parser.parse_args(argv)
+
+    # Each process's DashScope concurrency share is derived from the process
+    # count; spawned processes re-read settings from the environment
+    os.environ["WORKER_PROCESSES"] = str(max(1, args.processes))
+    settings.worker_processes = max(1, args.processes)
+
+    init_db()
+
+    if args.processes <= 1:
+        run_worker_process(0, args.concurrency)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=run_worker_process, args=(i, args.concurrency), name=f"prism-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def _forward(signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()